@@ -10,6 +10,11 @@
 # 6. 初始化 Redis 分布式限流器（Flask-Limiter）
 # 7. 设备绑定验证中间件
 # 8. 注册所有路由蓝图
+# 9. 初始化文件存储（本地 / S3 兼容对象存储）
+# 10. 静态资源指纹（asset_url）与长期缓存
+# 11. 响应压缩（gzip / brotli）与 orjson 序列化
+# 12. 数据库引擎调优（SQLite WAL / PRAGMA，服务端数据库连接池）
+# 13. 读写分离（只读路由查询从库，写入及写后读走主库）
 # 
 # 核心函数：
 # - create_app(): Flask 应用工厂函数
@@ -64,10 +69,72 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME') or ''
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD') or ''
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or MAIL_USERNAME or ''
+    
+    # 文件存储配置（local-本地文件系统，s3-S3兼容对象存储）
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    STORAGE_LOCAL_ROOT = os.environ.get('STORAGE_LOCAL_ROOT') or None
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL') or None
+    S3_BUCKET = os.environ.get('S3_BUCKET') or None
+    S3_ACCESS_KEY = os.environ.get('S3_ACCESS_KEY') or None
+    S3_SECRET_KEY = os.environ.get('S3_SECRET_KEY') or None
+    S3_REGION = os.environ.get('S3_REGION') or None
+    S3_PUBLIC_URL = os.environ.get('S3_PUBLIC_URL') or None
+    S3_PREFIX = os.environ.get('S3_PREFIX', '')
+    
+    # 响应压缩（gzip / brotli）与 JSON 序列化快速通道（orjson）
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'True').lower() in ['true', 'on', '1']
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    JSON_FAST_PROVIDER = os.environ.get('JSON_FAST_PROVIDER', 'True').lower() in ['true', 'on', '1']
+    
+    # 读写分离：从库地址（逗号分隔），不配置则所有查询走主库
+    DATABASE_REPLICA_URLS = os.environ.get('DATABASE_REPLICA_URLS', '')
+    # 写入后多少秒内同一用户的请求仍读主库
+    DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', 5))
+    
+    # SQLite 调优（WAL / busy_timeout 等，详见 app/utils/db_engine.py）
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    # PostgreSQL / MySQL 连接池
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    
+    # 素材批量导入的分块上传目录（需 Web 进程与 Celery worker 共享），默认 instance/imports
+    MATERIAL_IMPORT_DIR = os.environ.get('MATERIAL_IMPORT_DIR') or None
+    
+    # DeepSeek 接口熔断：最近窗口内错误率达到阈值后打开，冷却后半开探测
+    LLM_BREAKER_FAILURE_RATE = float(os.environ.get('LLM_BREAKER_FAILURE_RATE', 0.5))
+    LLM_BREAKER_COOLDOWN = int(os.environ.get('LLM_BREAKER_COOLDOWN', 30))
+    # 单次调用的超时上下限（秒），实际超时按最近耗时的 p95 自适应
+    LLM_TIMEOUT_MIN = float(os.environ.get('LLM_TIMEOUT_MIN', 5))
+    LLM_TIMEOUT_MAX = float(os.environ.get('LLM_TIMEOUT_MAX', 30))
+    
+    # 二创令牌桶（按用户）：容量为最大连续提交次数，每分钟补充的次数；会员使用 MEMBER 配置
+    REMIX_BUCKET_CAPACITY = int(os.environ.get('REMIX_BUCKET_CAPACITY', 5))
+    REMIX_REFILL_PER_MINUTE = float(os.environ.get('REMIX_REFILL_PER_MINUTE', 5))
+    REMIX_MEMBER_BUCKET_CAPACITY = int(os.environ.get('REMIX_MEMBER_BUCKET_CAPACITY', 20))
+    REMIX_MEMBER_REFILL_PER_MINUTE = float(os.environ.get('REMIX_MEMBER_REFILL_PER_MINUTE', 20))
+    # 全局同时进行的 AI 调用数，超出后排队，排队超过 LLM_QUEUE_MAX_WAIT 秒走本地改写
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+    LLM_QUEUE_MAX_WAIT = int(os.environ.get('LLM_QUEUE_MAX_WAIT', 60))
+    
+    # 二创去重：同一用户同一素材的任务处理期间（最长秒数）、同一 Idempotency-Key 的有效秒数
+    # 默认（0）为 LLM_QUEUE_MAX_WAIT + LLM_TIMEOUT_MAX + 120 秒，任务每次开始执行时续期
+    REMIX_DEDUP_SECONDS = int(os.environ.get('REMIX_DEDUP_SECONDS', 0))
+    
+    # 后台列表统计数字的缓存秒数（0 表示不缓存）
+    ADMIN_STATS_CACHE_SECONDS = int(os.environ.get('ADMIN_STATS_CACHE_SECONDS', 30))
+
+    # 限流开关（压测时可关闭）
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True').lower() in ['true', 'on', '1']
 
 
-# 初始化数据库对象
-db = SQLAlchemy()
+# 初始化数据库对象（RoutingSession：只读查询可发往从库）
+from app.utils.db_routing import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # 初始化邮件对象
 mail = Mail()
@@ -115,12 +182,30 @@ def create_app(config_class=Config):
     # 加载配置
     app.config.from_object(config_class)
     
-    # 初始化数据库
+    # JSON 序列化快速通道
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
+    # 响应压缩（最先注册：after_request 按注册的逆序执行，保证压缩在最后进行）
+    from app.utils.compression import init_compression
+    init_compression(app)
+    
+    # 初始化数据库（引擎参数需在 init_app 之前确定，PRAGMA 事件在引擎创建之后注册）
+    from app.utils.db_engine import configure_engine_options, init_db_engine, build_engine_options
+    from app.utils.db_routing import configure_replicas, init_db_routing
+    configure_engine_options(app)
+    configure_replicas(app, build_options=build_engine_options)
     db.init_app(app)
+    init_db_engine(app, db)
+    init_db_routing(app)
     
     # 初始化邮件
     mail.init_app(app)
     
+    # 初始化文件存储
+    from app.utils.storage import init_storage
+    init_storage(app)
+    
     # 初始化 Celery
     global celery_app
     celery_app = init_celery(app)
@@ -212,6 +297,14 @@ def create_app(config_class=Config):
             'customer_service_qrcode': customer_service_qrcode
         }
     
+    # 静态资源指纹与缓存策略
+    from app.utils.assets import init_assets
+    init_assets(app)
+    
+    # 注册命令行命令
+    from app.commands import register_commands
+    register_commands(app)
+    
     # 配置日志系统
     from app.utils.logger import setup_logging
     setup_logging(app)
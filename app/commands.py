@@ -0,0 +1,69 @@
+# ============================================================
+# commands.py
+#
+# Flask 命令行命令模块
+# 功能说明：
+# 1. flask assets-manifest: 生成静态资源指纹清单（部署时执行）
+# 2. flask stats-backfill: 回填每日统计汇总表 daily_stats
+# 3. flask import-materials: 离线导入本地素材库目录（已导入的目录按内容哈希跳过）
+#
+# 使用方式：
+#   flask --app run.py assets-manifest
+#   flask --app run.py stats-backfill            # 从最早的数据开始回填
+#   flask --app run.py stats-backfill --days 30  # 只回填最近 30 天
+#   flask --app run.py import-materials /data/素材库 --workers 8
+# ============================================================
+
+import os
+import json
+import click
+from flask import current_app
+
+
+def register_commands(app):
+    """注册所有命令行命令"""
+
+    @app.cli.command('assets-manifest')
+    def assets_manifest():
+        """生成静态资源指纹清单 static/manifest.json"""
+        from app.utils.assets import build_manifest, MANIFEST_FILENAME
+
+        manifest = build_manifest(current_app.static_folder)
+        manifest_path = os.path.join(current_app.static_folder, MANIFEST_FILENAME)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+        click.echo(f'已生成 {manifest_path}，共 {len(manifest)} 个文件')
+
+    @app.cli.command('stats-backfill')
+    @click.option('--days', type=int, default=None, help='只回填最近 N 天（默认从最早的数据开始）')
+    def stats_backfill(days):
+        """回填每日统计汇总表 daily_stats"""
+        from app import db
+        from app.models import DailyStat
+        from app.utils.statistics import backfill
+
+        DailyStat.__table__.create(bind=db.engine, checkfirst=True)
+        total = backfill(days=days, echo=click.echo)
+        click.echo(f'回填完成，共汇总 {total} 天')
+
+    @app.cli.command('import-materials')
+    @click.argument('directory', type=click.Path(exists=True, file_okay=False))
+    @click.option('--workers', type=int, default=None, help='复制图片的进程数（默认 CPU 核数）')
+    @click.option('--batch-size', type=int, default=500, show_default=True, help='每批插入的素材数')
+    @click.option('--category', default='副业', show_default=True, help='素材分类名称（不存在时创建）')
+    def import_materials(directory, workers, batch_size, category):
+        """导入本地素材库目录（每个包含图片的子目录是一个素材，文案.txt 为标题和文案）"""
+        from app.utils.material_import import import_directory
+
+        summary = import_directory(directory, workers=workers, batch_size=batch_size,
+                                   category=category, echo=click.echo)
+
+        rate = summary['created'] / summary['seconds'] if summary['seconds'] else 0
+        click.echo('')
+        click.echo(f'目录总数:   {summary["total"]}')
+        click.echo(f'新增素材:   {summary["created"]}（图片 {summary["images"]} 张）')
+        click.echo(f'已导入跳过: {summary["exists"]}')
+        click.echo(f'无图片跳过: {summary["empty"]}')
+        click.echo(f'失败:       {summary["failed"]}')
+        click.echo(f'耗时:       {summary["seconds"]} 秒（{rate:.1f} 个素材/秒）')
@@ -6,15 +6,17 @@
 # 1. @admin_required: 管理员权限验证
 # 2. @device_required: 设备绑定验证（从Header获取X-Device-ID）
 # 3. @permission_required: 细粒度权限检查
+# 4. @etag_cached: JSON 列表接口的 ETag / If-None-Match 协商缓存
 # 
 # 使用场景：
 # - 管理后台接口使用 @admin_required
 # - 敏感操作API使用 @device_required
 # - 特定功能权限使用 @permission_required('权限名')
+# - 只读列表API使用 @etag_cached
 # ============================================================
 
 from functools import wraps
-from flask import request, jsonify, redirect, url_for, flash
+from flask import request, jsonify, redirect, url_for, flash, make_response
 from flask_login import current_user
 from app.utils.logger import get_logger
 
@@ -170,3 +172,31 @@ def permission_required(permission_name):
         return decorated_function
     return decorator
 
+
+def etag_cached(f):
+    """
+    ETag 协商缓存装饰器 - 为只读 JSON 接口生成 ETag
+    
+    客户端携带 If-None-Match 且内容未变化时返回 304，不再传输响应体。
+    响应标记为 private, no-cache：浏览器每次都会校验，但只需要交换 ETag。
+    
+    使用示例：
+        @bp.route('/api/some-list')
+        @login_required
+        @etag_cached
+        def some_list():
+            return jsonify(...)
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            response.add_etag()
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.make_conditional(request)
+        
+        return response
+    
+    return decorated_function
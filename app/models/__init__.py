@@ -22,6 +22,8 @@ from app.models.config import Config
 from app.models.permission import Permission, UserPermission, init_permissions
 # 导入公告模型
 from app.models.announcement import Announcement
+# 导入每日统计模型
+from app.models.daily_stat import DailyStat
 
 # 导出模型，方便其他模块使用
-__all__ = ['User', 'RegisterSecret', 'TerminalSecret', 'MaterialType', 'Material', 'MaterialImage', 'UserMaterial', 'UserMaterialImage', 'UserFavorite', 'UserDownload', 'Config', 'Permission', 'UserPermission', 'init_permissions', 'Announcement']
+__all__ = ['User', 'RegisterSecret', 'TerminalSecret', 'MaterialType', 'Material', 'MaterialImage', 'UserMaterial', 'UserMaterialImage', 'UserFavorite', 'UserDownload', 'Config', 'Permission', 'UserPermission', 'init_permissions', 'Announcement', 'DailyStat']
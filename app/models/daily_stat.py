@@ -0,0 +1,42 @@
+# ============================================================
+# daily_stat.py
+#
+# 每日统计汇总模型
+# 功能说明：
+# 1. DailyStat 表：按天汇总的运营数据（新增用户、创作、下载、收藏、卡密激活）
+# 2. 由定时任务增量维护（app/tasks.py rollup_daily_stats），
+#    历史数据用 flask stats-backfill 回填
+# 3. 后台首页一条查询即可读取最近 N 天的趋势数据
+# ============================================================
+
+# 导入日期时间模块
+from datetime import datetime
+# 导入数据库对象
+from app import db
+
+
+# 每日统计模型类
+class DailyStat(db.Model):
+    # 数据库表名
+    __tablename__ = 'daily_stats'
+
+    # 主键
+    id = db.Column(db.Integer, primary_key=True)
+    # 统计日期（UTC），唯一
+    date = db.Column(db.Date, unique=True, nullable=False, index=True)
+    # 当天新增用户数
+    new_users = db.Column(db.Integer, default=0, nullable=False)
+    # 当天二创素材数
+    remixes = db.Column(db.Integer, default=0, nullable=False)
+    # 当天下载记录数
+    downloads = db.Column(db.Integer, default=0, nullable=False)
+    # 当天收藏数
+    favorites = db.Column(db.Integer, default=0, nullable=False)
+    # 当天激活的卡密数（注册卡密 + 终端卡密）
+    secrets_activated = db.Column(db.Integer, default=0, nullable=False)
+    # 最后汇总时间
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # 打印时的显示格式
+    def __repr__(self):
+        return f'<DailyStat {self.date}>'
@@ -34,9 +34,11 @@ class Material(db.Model):
     # 下载次数，默认为0
     download_count = db.Column(db.Integer, default=0, nullable=False)
     # 是否上架，默认为是
-    is_published = db.Column(db.Boolean, default=True, nullable=False)
+    is_published = db.Column(db.Boolean, default=True, nullable=False, index=True)
     # 排序权重，数值越小越靠前
     sort_order = db.Column(db.Integer, default=0, nullable=False)
+    # 批量导入时的内容哈希（图片 + 文案的 SHA-256），用于跳过已导入的目录；手动添加的素材为空
+    content_hash = db.Column(db.String(64), unique=True, nullable=True, index=True)
     # 创建时间，默认为当前时间
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     # 最后修改时间，自动更新
@@ -12,7 +12,7 @@ class MaterialImage(db.Model):
     # 图片ID，主键
     id = db.Column(db.Integer, primary_key=True)
     # 关联的素材ID，外键
-    material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), nullable=False)
+    material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), nullable=False, index=True)
     # 图片URL或路径
     image_url = db.Column(db.String(500), nullable=False)
     # 图片排序，数值越小越靠前
@@ -24,7 +24,7 @@ class RegisterSecret(db.Model):
     # 是否已使用，默认为否
     is_used = db.Column(db.Boolean, default=False, nullable=False)
     # 绑定的用户ID，外键
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     # 创建时间，默认为当前时间
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     # 使用时间，可以为空
@@ -33,6 +33,16 @@ class RegisterSecret(db.Model):
     duration_type = db.Column(db.String(20), nullable=False, default='permanent')
     # 过期时间（可选，只有有时长的卡密才有）
     expires_at = db.Column(db.DateTime, nullable=True)
+    # 生成批次号（批量生成时写入，用于按批次导出）
+    batch_id = db.Column(db.String(32), nullable=True, index=True)
+
+    # 卡密是否在有效期内（已使用且为永久卡或未过期）
+    def is_active(self, now=None):
+        if not self.is_used:
+            return False
+        if self.duration_type == 'permanent':
+            return True
+        return bool(self.expires_at and (now or datetime.utcnow()) <= self.expires_at)
 
     # 打印时的显示格式
     def __repr__(self):
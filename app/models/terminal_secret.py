@@ -16,11 +16,13 @@ class TerminalSecret(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     secret = db.Column(db.String(100), unique=True, nullable=False, index=True)
     is_used = db.Column(db.Boolean, default=False, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     used_at = db.Column(db.DateTime, nullable=True)
     duration_type = db.Column(db.String(20), nullable=False, default='permanent')
     expires_at = db.Column(db.DateTime, nullable=True)
+    # 生成批次号（批量生成时写入，用于按批次导出）
+    batch_id = db.Column(db.String(32), nullable=True, index=True)
 
     def __repr__(self):
         return f'<TerminalSecret {self.secret}>'
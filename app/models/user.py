@@ -6,6 +6,7 @@
 # 1. User 表：用户基本信息、密码、角色、设备绑定
 # 2. 密码加密存储（使用 Werkzeug）
 # 3. 权限检查方法（has_permission）
+# 4. 会员有效性检查（has_valid_membership，以最新一张卡密为准）
 # ============================================================
 
 # 导入日期时间模块
@@ -36,7 +37,7 @@ class User(UserMixin, db.Model):
     # 是否为超级管理员，默认为否
     is_super_admin = db.Column(db.Boolean, default=False, nullable=False)
     # 创建时间，默认为当前时间
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     # 头像URL
     avatar = db.Column(db.String(500), nullable=True)
     # 个性签名
@@ -95,6 +96,14 @@ class User(UserMixin, db.Model):
         """获取用户的所有权限code列表"""
         return [up.permission.code for up in self.user_permissions]
 
+    # 检查会员是否有效
+    def has_valid_membership(self, now=None):
+        """最新使用的一张注册卡密是否仍在有效期内"""
+        if not self.register_secrets:
+            return False
+        latest = max(self.register_secrets, key=lambda s: s.used_at or s.created_at)
+        return latest.is_active(now)
+
     # 打印时的显示格式
     def __repr__(self):
         return f'<User {self.username}>'
@@ -14,11 +14,11 @@ class UserDownload(db.Model):
     __tablename__ = 'user_downloads'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     # 可以是原始素材或用户二创素材，二选一即可
-    material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), nullable=True)
-    user_material_id = db.Column(db.Integer, db.ForeignKey('user_materials.id'), nullable=True)
+    material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), nullable=True, index=True)
+    user_material_id = db.Column(db.Integer, db.ForeignKey('user_materials.id'), nullable=True, index=True)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
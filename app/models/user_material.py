@@ -5,12 +5,17 @@
 # 功能说明：
 # 1. UserMaterial 表：用户二创的素材记录
 # 2. UserMaterialImage 表：用户二创素材的图片
+#    - CSS 配方存配方 ID（见 recipe_engine.py），css_style 返回缓存的 CSS 字符串
 # ============================================================
 
 # 导入日期时间模块
 from datetime import datetime
+# 导入 JSON 模块（旧数据的配方解析）
+import json
 # 导入数据库对象
 from app import db
+# 导入配方表
+from app.utils.recipe_engine import recipe_css, recipe_style
 
 
 # 用户二创素材模型类
@@ -21,7 +26,7 @@ class UserMaterial(db.Model):
     # 二创素材ID，主键
     id = db.Column(db.Integer, primary_key=True)
     # 关联的用户ID，外键
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     # 原始素材ID，外键（可空，如果用户自己创建的素材没有原始素材）
     original_material_id = db.Column(db.Integer, db.ForeignKey('materials.id'), nullable=True)
     # 二创标题（与原素材相同）
@@ -59,7 +64,7 @@ class UserMaterialImage(db.Model):
     # 图片ID，主键
     id = db.Column(db.Integer, primary_key=True)
     # 关联的二创素材ID，外键
-    user_material_id = db.Column(db.Integer, db.ForeignKey('user_materials.id'), nullable=False)
+    user_material_id = db.Column(db.Integer, db.ForeignKey('user_materials.id'), nullable=False, index=True)
     # 图片URL或路径
     image_url = db.Column(db.String(500), nullable=False)
     # 图片排序，数值越小越靠前
@@ -68,11 +73,25 @@ class UserMaterialImage(db.Model):
     is_cover = db.Column(db.Boolean, default=False, nullable=False)
     # 原始图片URL（备份）
     original_image_url = db.Column(db.String(500), nullable=True)
-    # CSS混合配方（记录用于复现）
+    # CSS混合配方ID（代码内配方表的编号，见 recipe_engine.py）
+    css_recipe_id = db.Column(db.BigInteger, nullable=True)
+    # CSS混合配方JSON（旧数据，迁移脚本转换为 css_recipe_id 后清空；不在配方表中的保留）
     css_recipe = db.Column(db.Text, nullable=True)
     # 创建时间
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # 渲染用的 CSS（{"filter", "overlay"}），没有配方时为 None
+    @property
+    def css_style(self):
+        if self.css_recipe_id is not None:
+            return recipe_css(self.css_recipe_id)
+        if self.css_recipe:
+            try:
+                return recipe_style(json.loads(self.css_recipe))
+            except (ValueError, KeyError, TypeError):
+                return None
+        return None
+
     # 打印时的显示格式
     def __repr__(self):
         return f'<UserMaterialImage {self.id}>'
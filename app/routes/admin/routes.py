@@ -14,7 +14,25 @@ from flask import Blueprint, render_template, redirect, url_for, flash, current_
 # 导入登录相关模块
 from flask_login import login_required, current_user
 # 导入装饰器
-from app.decorators import admin_required, permission_required
+from app.decorators import admin_required, permission_required, etag_cached
+from app.utils.db_routing import read_only
+# 导入游标分页与短时缓存
+from app.utils.pagination import apply_keyset, fetch_page
+from app.utils.cache import cache
+# 导入统计模块
+from app.utils.statistics import get_daily_stats, get_dashboard_totals
+# 导入卡密批量生成与流式导出
+from app.utils.secret_generator import (bulk_create_secrets, new_batch_id, DURATION_NAMES,
+                                        SYNC_GENERATE_LIMIT, MAX_GENERATE_COUNT)
+from app.utils.export import (iter_csv, iter_lines, iter_xlsx, xlsx_available, export_filename,
+                              stream_download, EXPORT_YIELD_PER, MIMETYPES)
+# 导入素材批量导入（分块上传会话）
+from app.utils.material_import import (parse_copy_text, get_import_category, MaterialImportError, OffsetMismatch,
+                                       IMPORT_CHUNK_SIZE, create_session as create_import_session,
+                                       load_meta as load_import_meta,
+                                       received_files as received_import_files,
+                                       append_chunk as append_import_chunk,
+                                       claim_task as claim_import_task, release_task as release_import_task)
 # 导入数据库模块
 from app import db
 # 导入表单
@@ -26,12 +44,11 @@ from app.models import Material, MaterialType, MaterialImage, RegisterSecret, Us
 from app.utils.logger import get_logger
 # 导入限流器
 from app.utils.rate_limit import limiter
-# 导入文件处理模块
-import os
-import re
-from werkzeug.utils import secure_filename
+# 导入文件存储
+from app.utils.storage import get_storage, generate_upload_key
 from datetime import datetime
-from sqlalchemy.orm import joinedload  # 导入joinedload用于预加载关联数据
+from sqlalchemy import func, case, and_, or_
+from sqlalchemy.orm import joinedload, contains_eager  # 导入joinedload用于预加载关联数据
 
 logger = get_logger(__name__)
 
@@ -45,6 +62,9 @@ ALLOWED_EXTENSIONS = {
 }
 ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp'}
 
+# 后台首页趋势图的天数
+DASHBOARD_TREND_DAYS = 7
+
 
 def allowed_file(filename, allowed_extensions=None):
     """检查文件扩展名是否在白名单中"""
@@ -87,27 +107,12 @@ def validate_file(file, allowed_extensions=None):
 
 
 def save_image(file):
-    """保存图片到本地并返回相对路径"""
+    """保存图片到存储并返回访问路径"""
     if not file:
         return None
     
-    # 生成安全的文件名
-    filename = secure_filename(file.filename)
-    # 添加时间戳避免重名
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-    filename = timestamp + filename
-    
-    # 构建保存路径
-    upload_folder = os.path.join(current_app.root_path, 'static', 'uploads')
-    if not os.path.exists(upload_folder):
-        os.makedirs(upload_folder)
-    
-    # 保存文件
-    file_path = os.path.join(upload_folder, filename)
-    file.save(file_path)
-    
-    # 返回相对路径（用于数据库存储）
-    return f'/static/uploads/{filename}'
+    # 添加时间戳避免重名，保存到存储（本地或对象存储）
+    return get_storage().save(file, generate_upload_key(file.filename))
 
 
 # 创建管理后台路由蓝图
@@ -117,36 +122,16 @@ bp = Blueprint('admin', __name__, url_prefix='/admin')
 @bp.route('/')
 @login_required
 @admin_required
+@read_only
 def index():
     """管理后台首页"""
-    # 统计数据
-    total_materials = Material.query.count()
-    unused_secrets = RegisterSecret.query.filter_by(is_used=False).count()
-    total_users = User.query.count()
-    
-    # 新增统计数据 - 直接从表中统计更准确
-    from app.models import UserMaterial
-    total_remix_count = UserMaterial.query.count()
-    total_download_count = 0
-    
-    # 用户增长数据统计（最近7天）
-    from datetime import datetime, timedelta
-    user_growth_data = []
-    user_growth_dates = []
-    
-    # 获取最近7天的日期
-    for i in range(6, -1, -1):
-        date = datetime.utcnow() - timedelta(days=i)
-        date_str = date.strftime('%Y-%m-%d')
-        user_growth_dates.append(date_str)
-        
-        # 统计当天注册的用户数
-        next_day = date + timedelta(days=1)
-        daily_count = User.query.filter(
-            User.created_at >= date,
-            User.created_at < next_day
-        ).count()
-        user_growth_data.append(daily_count)
+    # 统计数据（各表总数合并为一条查询）
+    totals = get_dashboard_totals()
+    
+    # 用户增长数据统计（最近7天，读取每日汇总表，未汇总的日期实时统计）
+    daily_stats = get_daily_stats(DASHBOARD_TREND_DAYS)
+    user_growth_dates = [stat['date'] for stat in daily_stats]
+    user_growth_data = [stat['new_users'] for stat in daily_stats]
     
     # 最新更新的素材（前3个，按updated_at倒序）
     latest_materials = Material.query.order_by(Material.updated_at.desc()).limit(3).all()
@@ -158,12 +143,14 @@ def index():
     customer_service_wechat = Config.get_value('customer_service_wechat', 'your_kefu_wechat')
     
     return render_template('admin/admin_index.html', 
-                          total_materials=total_materials,
-                          unused_secrets=unused_secrets,
-                          total_users=total_users,
-                          total_remix_count=total_remix_count,
+                          total_materials=totals['total_materials'],
+                          unused_secrets=totals['unused_secrets'],
+                          total_users=totals['total_users'],
+                          total_remix_count=totals['total_remix_count'],
+                          total_download_count=totals['total_download_count'],
                           user_growth_dates=user_growth_dates,
                           user_growth_data=user_growth_data,
+                          daily_stats=daily_stats,
                           latest_materials=latest_materials,
                           latest_secrets=latest_secrets,
                           customer_service_wechat=customer_service_wechat)
@@ -214,12 +201,7 @@ def delete_wechat_qrcode():
         old_qrcode = Config.get_value('customer_service_qrcode', '')
         if old_qrcode:
             # 删除文件
-            old_path = os.path.join(current_app.root_path, old_qrcode.lstrip('/'))
-            if os.path.exists(old_path):
-                try:
-                    os.remove(old_path)
-                except:
-                    pass
+            get_storage().delete_url(old_qrcode)
         
         # 更新配置
         Config.set_value('customer_service_qrcode', '', '客服微信二维码')
@@ -233,6 +215,7 @@ def delete_wechat_qrcode():
 @login_required
 @admin_required
 @permission_required('material_manage')
+@read_only
 def materials():
     """素材库管理页面"""
     material_types = MaterialType.query.order_by(MaterialType.created_at.desc()).all()
@@ -242,15 +225,8 @@ def materials():
     return render_template('admin/admin_materials.html', material_types=material_types, materials=materials, total_count=total_count)
 
 
-@bp.route('/api/materials')
-@login_required
-@admin_required
-@permission_required('material_manage')
-def api_get_materials():
-    """分页获取素材API"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-    
+def _get_material_filters():
+    """解析素材列表的筛选参数，返回 (分类ID, 搜索关键词)"""
     # 获取分类ID，处理空字符串的情况
     material_type_id_str = request.args.get('material_type_id', '')
     material_type_id = None
@@ -262,21 +238,41 @@ def api_get_materials():
     
     # 获取搜索关键词
     search_keyword = request.args.get('search', '').strip()
+    return material_type_id, search_keyword
+
+
+def _build_material_query(material_type_id, search_keyword):
+    """按分类和标题筛选素材（不含排序）"""
+    query = Material.query
+    if material_type_id is not None:
+        query = query.filter_by(material_type_id=material_type_id)
+    
+    # 添加搜索条件（按标题搜索）
+    if search_keyword:
+        query = query.filter(Material.title.contains(search_keyword))
+    return query
+
+
+@bp.route('/api/materials')
+@login_required
+@admin_required
+@permission_required('material_manage')
+@etag_cached
+@read_only
+def api_get_materials():
+    """分页获取素材API"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    material_type_id, search_keyword = _get_material_filters()
     
     # 计算偏移量
     offset = (page - 1) * per_page
     
     # 查询素材 - 使用joinedload预加载关联数据，避免N+1查询
-    query = Material.query.options(
+    query = _build_material_query(material_type_id, search_keyword).options(
         joinedload(Material.images),
         joinedload(Material.material_type)
     )
-    if material_type_id is not None:
-        query = query.filter_by(material_type_id=material_type_id)
-    
-    # 添加搜索条件（按标题搜索）
-    if search_keyword:
-        query = query.filter(Material.title.contains(search_keyword))
     
     materials = query.order_by(Material.created_at.desc()).offset(offset).limit(per_page).all()
     total_count = query.count()
@@ -427,12 +423,7 @@ def material_edit(material_id):
             if cover_file and cover_file.filename:
                 # 删除旧封面图
                 if cover_image:
-                    old_path = os.path.join(current_app.root_path, cover_image.image_url.lstrip('/'))
-                    if os.path.exists(old_path):
-                        try:
-                            os.remove(old_path)
-                        except:
-                            pass
+                    get_storage().delete_url(cover_image.image_url)
                     db.session.delete(cover_image)
                 
                 # 保存新封面图
@@ -450,12 +441,7 @@ def material_edit(material_id):
             keep_key = f'keep_image_{img.id}'
             if keep_key not in request.form:
                 # 没有勾选，删除这个图片
-                img_path = os.path.join(current_app.root_path, img.image_url.lstrip('/'))
-                if os.path.exists(img_path):
-                    try:
-                        os.remove(img_path)
-                    except:
-                        pass
+                get_storage().delete_url(img.image_url)
                 db.session.delete(img)
         
         # 处理新增的其他图片
@@ -495,63 +481,164 @@ def material_edit(material_id):
                            other_images=other_images)
 
 
-@bp.route('/secrets')
-@login_required
-@admin_required
-@permission_required('secret_manage')
-def secrets():
-    """卡密管理页面"""
-    from datetime import datetime
-    now = datetime.utcnow()
-    
-    # 获取卡密类型参数，默认为注册卡密
-    secret_type = request.args.get('type', 'register')
-    if secret_type not in ['register', 'terminal']:
-        secret_type = 'register'
-    
-    # 获取搜索关键词和筛选状态
-    search_keyword = request.args.get('search', '').strip()
-    status_filter = request.args.get('status', '').strip()
-    
-    # 根据卡密类型选择模型
-    if secret_type == 'register':
-        SecretModel = RegisterSecret
-    else:
-        SecretModel = TerminalSecret
-    
-    # 查询卡密
-    query = SecretModel.query
-    
+# 后台卡密 / 用户列表每页条数
+ADMIN_LIST_PAGE_SIZE = 30
+
+# 卡密类型与模型的对应关系
+SECRET_MODELS = {
+    'register': RegisterSecret,
+    'terminal': TerminalSecret
+}
+
+
+def _get_secret_type(value):
+    """规范化卡密类型参数，默认为注册卡密"""
+    return value if value in SECRET_MODELS else 'register'
+
+
+def _get_list_limit():
+    """列表接口每页条数（1-100）"""
+    limit = request.args.get('limit', ADMIN_LIST_PAGE_SIZE, type=int) or ADMIN_LIST_PAGE_SIZE
+    return max(1, min(limit, 100))
+
+
+def _stats_cache_seconds():
+    return current_app.config.get('ADMIN_STATS_CACHE_SECONDS', 30)
+
+
+def _build_secret_query(SecretModel, search_keyword, status_filter, now):
+    """按搜索关键词和状态筛选卡密（不含排序，已外连接使用者 User）"""
+    query = SecretModel.query.outerjoin(User, SecretModel.user_id == User.id)
+
     if search_keyword:
         # 搜索卡密文本 或 搜索关联用户的昵称
-        query = query.outerjoin(User).filter(
-            (SecretModel.secret.contains(search_keyword)) | 
+        query = query.filter(
+            (SecretModel.secret.contains(search_keyword)) |
             (User.username.contains(search_keyword))
         )
-    
+
     # 状态筛选
     if status_filter == 'unused':
         # 未使用：is_used = False
-        query = query.filter_by(is_used=False)
+        query = query.filter(SecretModel.is_used == False)
     elif status_filter == 'used':
         # 已使用：is_used = True 且 user_id 不为 None
         query = query.filter(SecretModel.is_used == True, SecretModel.user_id != None)
     elif status_filter == 'expired':
         # 已失效：已过期 或 已释放
         query = query.filter(
-            ((SecretModel.is_used == True) & (SecretModel.expires_at != None) & (now > SecretModel.expires_at)) |
+            ((SecretModel.is_used == True) & (SecretModel.expires_at != None) & (SecretModel.expires_at < now)) |
             ((SecretModel.is_used == True) & (SecretModel.user_id == None))
         )
+
+    return query
+
+
+def _secret_status_counts(secret_type):
+    """卡密各状态数量（一条聚合查询，结果短时缓存）"""
+    SecretModel = SECRET_MODELS[secret_type]
+
+    def compute():
+        total, unused, used, released = db.session.query(
+            func.count(SecretModel.id),
+            func.sum(case((SecretModel.is_used == False, 1), else_=0)),
+            func.sum(case((and_(SecretModel.is_used == True, SecretModel.user_id != None), 1), else_=0)),
+            func.sum(case((and_(SecretModel.is_used == True, SecretModel.user_id == None), 1), else_=0))
+        ).one()
+        return {
+            'total': total or 0,
+            'unused': unused or 0,
+            'used': used or 0,
+            'released': released or 0
+        }
+
+    return cache.get_or_set(f'secret_counts:{secret_type}', compute, _stats_cache_seconds())
+
+
+def _invalidate_secret_counts(secret_type=None):
+    """卡密变更后清除统计缓存（不指定类型时清除全部）"""
+    if secret_type:
+        cache.delete(f'secret_counts:{secret_type}')
+    else:
+        cache.delete_prefix('secret_counts:')
+
+
+def _fetch_secret_page(secret_type, search_keyword, status_filter, now, cursor, limit):
+    """按 (created_at, id) 游标取一页卡密"""
+    SecretModel = SECRET_MODELS[secret_type]
+    # 使用者来自查询中已有的外连接，避免列表逐条查询用户
+    query = _build_secret_query(SecretModel, search_keyword, status_filter, now).options(contains_eager(SecretModel.user))
+    query = apply_keyset(query, SecretModel.created_at, SecretModel.id, cursor)
+    return fetch_page(query, limit, lambda secret: (secret.created_at, secret.id))
+
+
+def _serialize_secret(secret):
+    return {
+        'id': secret.id,
+        'secret': secret.secret,
+        'is_used': secret.is_used,
+        'user_id': secret.user_id,
+        'username': secret.user.username if secret.user else None,
+        'duration_type': secret.duration_type,
+        'created_at': secret.created_at.strftime('%Y-%m-%d %H:%M:%S') if secret.created_at else None,
+        'used_at': secret.used_at.strftime('%Y-%m-%d %H:%M:%S') if secret.used_at else None,
+        'expires_at': secret.expires_at.strftime('%Y-%m-%d %H:%M:%S') if secret.expires_at else None
+    }
+
+
+@bp.route('/secrets')
+@login_required
+@admin_required
+@permission_required('secret_manage')
+@read_only
+def secrets():
+    """卡密管理页面（渲染第一页，后续页由 /admin/api/secrets 加载）"""
+    now = datetime.utcnow()
+    
+    # 获取卡密类型参数，默认为注册卡密
+    secret_type = _get_secret_type(request.args.get('type', 'register'))
     
-    # 按创建时间倒序
-    secrets = query.order_by(SecretModel.created_at.desc()).all()
+    # 获取搜索关键词和筛选状态
+    search_keyword = request.args.get('search', '').strip()
+    status_filter = request.args.get('status', '').strip()
+    
+    secrets, next_cursor = _fetch_secret_page(secret_type, search_keyword, status_filter, now, None, ADMIN_LIST_PAGE_SIZE)
+    counts = _secret_status_counts(secret_type)
+    
+    return render_template('admin/admin_secrets.html', secrets=secrets, next_cursor=next_cursor,
+                           total_count=counts['total'], unused_count=counts['unused'],
+                           released_count=counts['released'], now=now,
+                           status_filter=status_filter, secret_type=secret_type)
+
+
+@bp.route('/api/secrets', methods=['GET'])
+@login_required
+@admin_required
+@permission_required('secret_manage')
+@read_only
+def api_get_secrets():
+    """分页获取卡密API（游标分页，参数与卡密管理页面一致）"""
+    now = datetime.utcnow()
+    secret_type = _get_secret_type(request.args.get('type', 'register'))
+    search_keyword = request.args.get('search', '').strip()
+    status_filter = request.args.get('status', '').strip()
+    limit = _get_list_limit()
     
-    # 计算统计数据
-    total_count = SecretModel.query.count()
-    unused_count = SecretModel.query.filter_by(is_used=False).count()
-    released_count = SecretModel.query.filter_by(is_used=True, user_id=None).count()
+    secrets, next_cursor = _fetch_secret_page(secret_type, search_keyword, status_filter, now,
+                                              request.args.get('cursor'), limit)
     
-    return render_template('admin/admin_secrets.html', secrets=secrets, total_count=total_count, unused_count=unused_count, released_count=released_count, now=now, status_filter=status_filter, secret_type=secret_type)
+    return jsonify({
+        'success': True,
+        'data': [_serialize_secret(secret) for secret in secrets],
+        # 与页面相同的卡片片段，前端直接追加
+        'html': render_template('admin/_secret_cards.html', secrets=secrets, now=now),
+        'counts': _secret_status_counts(secret_type),
+        'pagination': {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    })
 
 
 @bp.route('/api/secrets', methods=['POST'])
@@ -559,7 +646,7 @@ def secrets():
 @admin_required
 @permission_required('secret_manage')
 def api_create_secrets():
-    """批量生成卡密API"""
+    """批量生成卡密API（数量较大时转为后台任务）"""
     data = request.get_json()
     
     if not data:
@@ -567,82 +654,88 @@ def api_create_secrets():
     
     duration_type = data.get('duration_type', 'permanent')
     count = data.get('count', 1)
-    secret_type = data.get('type', 'register')
-    
-    if secret_type not in ['register', 'terminal']:
-        secret_type = 'register'
+    secret_type = _get_secret_type(data.get('type', 'register'))
     
     # 验证数量
     try:
         count = int(count)
-        if count < 1 or count > 100:
-            return jsonify({'success': False, 'message': '生成数量必须在1-100之间'}), 400
-    except ValueError:
+        if count < 1 or count > MAX_GENERATE_COUNT:
+            return jsonify({'success': False, 'message': f'生成数量必须在1-{MAX_GENERATE_COUNT}之间'}), 400
+    except (ValueError, TypeError):
         return jsonify({'success': False, 'message': '生成数量必须是数字'}), 400
     
     # 验证时长类型
-    valid_types = ['1min', '1day', '1month', '1year', 'permanent']
-    if duration_type not in valid_types:
+    if duration_type not in DURATION_NAMES:
         return jsonify({'success': False, 'message': '无效的时长类型'}), 400
     
-    # 时长类型显示名称映射
-    duration_names = {
-        '1min': '1分钟卡',
-        '1day': '日卡(1天)',
-        '1month': '月卡(1个月)',
-        '1year': '年卡(1年)',
-        'permanent': '永久卡'
-    }
-    
-    from datetime import datetime, timedelta
-    import random
-    import string
-    
-    secrets = []
-    
-    # 定义字符集：数字+大小写字母
-    charset = string.digits + string.ascii_letters
-    
-    # 根据卡密类型选择模型和前缀
-    if secret_type == 'register':
-        SecretModel = RegisterSecret
-        prefix = 'sk-'
-        random_length = 18
-    else:
-        SecretModel = TerminalSecret
-        prefix = 'zdsk-'
-        random_length = 10
-    
-    for _ in range(count):
-        # 生成唯一卡密
-        random_part = ''.join(random.choice(charset) for _ in range(random_length))
-        secret_str = f"{prefix}{random_part}"
-        
-        # 创建卡密（生成时不设置过期时间，使用时再计算）
-        secret = SecretModel(
-            secret=secret_str,
-            duration_type=duration_type,
-            expires_at=None
-        )
-        db.session.add(secret)
-        secrets.append(secret_str)
+    secret_type_name = '注册' if secret_type == 'register' else '终端'
+    batch_id = new_batch_id()
     
-    db.session.commit()
+    # 大批量：提交后台任务，前端通过任务状态接口查询进度
+    if count > SYNC_GENERATE_LIMIT:
+        from app.tasks import async_generate_secrets
+        task = async_generate_secrets.delay(secret_type, count, duration_type, batch_id)
+        logger.info(f'管理员 {current_user.username} 提交批量生成卡密任务: count={count}, task_id={task.id}')
+        
+        return jsonify({
+            'success': True,
+            'message': f'已提交后台生成 {count} 个{secret_type_name}{DURATION_NAMES[duration_type]}',
+            'data': {
+                'task_id': task.id,
+                'batch_id': batch_id,
+                'duration_type': duration_type,
+                'duration_name': DURATION_NAMES[duration_type],
+                'count': count
+            }
+        })
     
-    secret_type_name = '注册' if secret_type == 'register' else '终端'
+    # 生成时不设置过期时间，使用时再计算
+    secrets = bulk_create_secrets(secret_type, count, duration_type, batch_id=batch_id)
+    _invalidate_secret_counts(secret_type)
     
     return jsonify({
         'success': True,
-        'message': f'成功生成 {count} 个{secret_type_name}{duration_names[duration_type]}',
+        'message': f'成功生成 {count} 个{secret_type_name}{DURATION_NAMES[duration_type]}',
         'data': {
             'secrets': secrets,
+            'batch_id': batch_id,
             'duration_type': duration_type,
-            'duration_name': duration_names[duration_type],
+            'duration_name': DURATION_NAMES[duration_type],
             'count': count
         }
     })
 
 
+@bp.route('/api/secrets/batches/<batch_id>/download')
+@login_required
+@admin_required
+@permission_required('secret_manage')
+@read_only
+def api_download_secret_batch(batch_id):
+    """按批次下载卡密（CSV / TXT，流式输出）"""
+    secret_type = _get_secret_type(request.args.get('type', 'register'))
+    file_format = request.args.get('format', 'csv')
+    if file_format not in ('csv', 'txt'):
+        return jsonify({'success': False, 'message': '不支持的导出格式'}), 400
+    
+    SecretModel = SECRET_MODELS[secret_type]
+    query = db.select(SecretModel.secret, SecretModel.duration_type, SecretModel.is_used, SecretModel.created_at) \
+        .where(SecretModel.batch_id == batch_id).order_by(SecretModel.id)
+    
+    if db.session.execute(query.limit(1)).first() is None:
+        return jsonify({'success': False, 'message': '批次不存在'}), 404
+    
+    rows = db.session.execute(query.execution_options(yield_per=EXPORT_YIELD_PER))
+    filename = f'secrets_{secret_type}_{batch_id}.{file_format}'
+    
+    if file_format == 'txt':
+        return stream_download(iter_lines(row.secret for row in rows), filename, MIMETYPES['txt'])
+    
+    rows = ((row.secret, DURATION_NAMES.get(row.duration_type, row.duration_type),
+             '已使用' if row.is_used else '未使用', row.created_at) for row in rows)
+    return stream_download(iter_csv(['卡密', '时长类型', '状态', '生成时间'], rows), filename, MIMETYPES['csv'])
+
+
 @bp.route('/api/secrets/<int:secret_id>', methods=['DELETE'])
 @login_required
 @admin_required
@@ -666,6 +759,7 @@ def api_delete_secret(secret_id):
     
     db.session.delete(secret)
     db.session.commit()
+    _invalidate_secret_counts(secret_type)
     
     return jsonify({
         'success': True,
@@ -703,6 +797,7 @@ def api_delete_released_secrets():
         deleted_count += 1
     
     db.session.commit()
+    _invalidate_secret_counts(secret_type)
     
     return jsonify({
         'success': True,
@@ -741,6 +836,7 @@ def api_release_secret(secret_id):
     secret.user_id = None
     
     db.session.commit()
+    _invalidate_secret_counts(secret_type)
     
     return jsonify({
         'success': True,
@@ -748,16 +844,8 @@ def api_release_secret(secret_id):
     })
 
 
-@bp.route('/users')
-@login_required
-@admin_required
-@permission_required('user_manage')
-def users():
-    """用户列表管理页面"""
-    # 获取搜索关键词
-    search_keyword = request.args.get('search', '').strip()
-    
-    # 查询用户
+def _build_user_query(search_keyword, user_filter=''):
+    """按搜索关键词和身份筛选用户（不含排序）"""
     query = User.query
     
     if search_keyword:
@@ -767,13 +855,234 @@ def users():
             (User.email.contains(search_keyword))
         )
     
-    # 按创建时间倒序
-    users = query.order_by(User.created_at.desc()).all()
+    if user_filter == 'admin':
+        query = query.filter(or_(User.is_admin == True, User.is_super_admin == True))
+    elif user_filter == 'unbind':
+        # 有待处理的设备解绑申请
+        query = query.filter(User.device_unbind_status == 1)
+    
+    return query
+
+
+def _user_status_counts():
+    """用户总数 / 管理员数 / 待处理解绑申请数（一条聚合查询，结果短时缓存）"""
+    def compute():
+        total, admins, unbind = db.session.query(
+            func.count(User.id),
+            func.sum(case((or_(User.is_admin == True, User.is_super_admin == True), 1), else_=0)),
+            func.sum(case((User.device_unbind_status == 1, 1), else_=0))
+        ).one()
+        return {
+            'total': total or 0,
+            'admin': admins or 0,
+            'unbind': unbind or 0
+        }
+
+    return cache.get_or_set('user_counts', compute, _stats_cache_seconds())
+
+
+def _invalidate_user_counts():
+    cache.delete('user_counts')
+
+
+def _fetch_user_page(search_keyword, user_filter, cursor, limit):
+    """按 (created_at, id) 游标取一页用户，同时返回每个用户的注册卡密数量"""
+    query = apply_keyset(_build_user_query(search_keyword, user_filter), User.created_at, User.id, cursor)
+    users, next_cursor = fetch_page(query, limit, lambda user: (user.created_at, user.id))
+    
+    # 一次分组查询统计本页用户的卡密数量，避免逐个加载 user.register_secrets
+    secret_counts = {}
+    if users:
+        secret_counts = dict(db.session.query(RegisterSecret.user_id, func.count(RegisterSecret.id))
+                             .filter(RegisterSecret.user_id.in_([user.id for user in users]))
+                             .group_by(RegisterSecret.user_id).all())
+    return users, secret_counts, next_cursor
+
+
+def _serialize_user(user, secret_count):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'is_admin': user.is_admin,
+        'is_super_admin': user.is_super_admin,
+        'bound_device_id': user.bound_device_id,
+        'device_unbind_status': user.device_unbind_status,
+        'secret_count': secret_count,
+        'created_at': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else None
+    }
+
+
+@bp.route('/users')
+@login_required
+@admin_required
+@permission_required('user_manage')
+@read_only
+def users():
+    """用户列表管理页面（渲染第一页，后续页由 /admin/api/users 加载）"""
+    # 获取搜索关键词和身份筛选
+    search_keyword = request.args.get('search', '').strip()
+    user_filter = request.args.get('filter', '').strip()
     
-    # 计算统计数据
-    total_count = User.query.count()
+    users, secret_counts, next_cursor = _fetch_user_page(search_keyword, user_filter, None, ADMIN_LIST_PAGE_SIZE)
+    counts = _user_status_counts()
     
-    return render_template('admin/admin_users.html', users=users, total_count=total_count, search_keyword=search_keyword)
+    return render_template('admin/admin_users.html', users=users, secret_counts=secret_counts,
+                           next_cursor=next_cursor, total_count=counts['total'], counts=counts,
+                           search_keyword=search_keyword, user_filter=user_filter)
+
+
+@bp.route('/api/users', methods=['GET'])
+@login_required
+@admin_required
+@permission_required('user_manage')
+@read_only
+def api_get_users():
+    """分页获取用户API（游标分页，参数与用户管理页面一致）"""
+    search_keyword = request.args.get('search', '').strip()
+    user_filter = request.args.get('filter', '').strip()
+    limit = _get_list_limit()
+    
+    users, secret_counts, next_cursor = _fetch_user_page(search_keyword, user_filter,
+                                                         request.args.get('cursor'), limit)
+    
+    return jsonify({
+        'success': True,
+        'data': [_serialize_user(user, secret_counts.get(user.id, 0)) for user in users],
+        # 与页面相同的卡片片段，前端直接追加
+        'html': render_template('admin/_user_cards.html', users=users, secret_counts=secret_counts),
+        'counts': _user_status_counts(),
+        'pagination': {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    })
+
+
+# 列表导出支持的格式
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+def _export_format_error():
+    """校验导出格式参数，不合法时返回错误响应"""
+    file_format = request.args.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': '不支持的导出格式'}), 400
+    if file_format == 'xlsx' and not xlsx_available():
+        return jsonify({'success': False, 'message': '服务器未安装 openpyxl，暂不支持导出 Excel，请选择 CSV'}), 400
+    return None
+
+
+def _export_response(prefix, header, rows):
+    """按 format 参数输出 CSV / XLSX 下载（rows 为逐行迭代器）"""
+    file_format = request.args.get('format', 'csv')
+    filename = export_filename(prefix, file_format)
+    if file_format == 'xlsx':
+        return stream_download(iter_xlsx(header, rows, sheet_title=prefix), filename, MIMETYPES['xlsx'])
+    return stream_download(iter_csv(header, rows), filename, MIMETYPES['csv'])
+
+
+@bp.route('/export/users')
+@login_required
+@admin_required
+@permission_required('user_manage')
+@read_only
+def export_users():
+    """导出用户列表（筛选参数与用户管理页面一致，流式输出）"""
+    error = _export_format_error()
+    if error:
+        return error
+    
+    search_keyword = request.args.get('search', '').strip()
+    user_filter = request.args.get('filter', '').strip()
+    
+    secret_count = db.select(func.count(RegisterSecret.id)) \
+        .where(RegisterSecret.user_id == User.id).correlate(User).scalar_subquery()
+    query = _build_user_query(search_keyword, user_filter) \
+        .order_by(User.created_at.desc(), User.id.desc()) \
+        .with_entities(User.id, User.username, User.email, User.is_super_admin, User.is_admin,
+                       User.bound_device_id, User.device_unbind_status, secret_count, User.created_at) \
+        .yield_per(EXPORT_YIELD_PER)
+    
+    def rows():
+        for row in query:
+            role = '超级管理员' if row.is_super_admin else ('管理员' if row.is_admin else '普通用户')
+            yield (row.id, row.username, row.email, role, row.bound_device_id,
+                   '申请中' if row.device_unbind_status == 1 else '', row[7], row.created_at)
+    
+    header = ['ID', '用户名', '邮箱', '身份', '绑定设备', '解绑申请', '使用卡密数', '注册时间']
+    return _export_response('users', header, rows())
+
+
+@bp.route('/export/secrets')
+@login_required
+@admin_required
+@permission_required('secret_manage')
+@read_only
+def export_secrets():
+    """导出卡密列表（筛选参数与卡密管理页面一致，流式输出）"""
+    error = _export_format_error()
+    if error:
+        return error
+    
+    now = datetime.utcnow()
+    secret_type = _get_secret_type(request.args.get('type', 'register'))
+    search_keyword = request.args.get('search', '').strip()
+    status_filter = request.args.get('status', '').strip()
+    SecretModel = SECRET_MODELS[secret_type]
+    
+    query = _build_secret_query(SecretModel, search_keyword, status_filter, now) \
+        .order_by(SecretModel.created_at.desc(), SecretModel.id.desc()) \
+        .with_entities(SecretModel.secret, SecretModel.duration_type, SecretModel.is_used, SecretModel.user_id,
+                       User.username, SecretModel.created_at, SecretModel.used_at, SecretModel.expires_at,
+                       SecretModel.batch_id) \
+        .yield_per(EXPORT_YIELD_PER)
+    
+    def rows():
+        for row in query:
+            if not row.is_used:
+                status = '未使用'
+            elif row.user_id is None:
+                status = '已释放'
+            elif row.expires_at and row.expires_at < now and row.duration_type != 'permanent':
+                status = '已失效'
+            else:
+                status = '已使用'
+            yield (row.secret, DURATION_NAMES.get(row.duration_type, row.duration_type), status, row.username,
+                   row.created_at, row.used_at, row.expires_at, row.batch_id)
+    
+    header = ['卡密', '时长类型', '状态', '使用者', '生成时间', '兑换时间', '过期时间', '批次号']
+    return _export_response(f'secrets_{secret_type}', header, rows())
+
+
+@bp.route('/export/materials')
+@login_required
+@admin_required
+@permission_required('material_manage')
+@read_only
+def export_materials():
+    """导出素材及其浏览、收藏、下载计数（筛选参数与素材库管理页面一致，流式输出）"""
+    error = _export_format_error()
+    if error:
+        return error
+    
+    material_type_id, search_keyword = _get_material_filters()
+    query = _build_material_query(material_type_id, search_keyword) \
+        .outerjoin(MaterialType, Material.material_type_id == MaterialType.id) \
+        .order_by(Material.created_at.desc(), Material.id.desc()) \
+        .with_entities(Material.id, Material.title, MaterialType.name, Material.view_count,
+                       Material.favorite_count, Material.download_count, Material.is_published,
+                       Material.created_at, Material.updated_at) \
+        .yield_per(EXPORT_YIELD_PER)
+    
+    def rows():
+        for row in query:
+            yield (row.id, row.title, row.name or '未分类', row.view_count, row.favorite_count,
+                   row.download_count, '已上架' if row.is_published else '已下架', row.created_at, row.updated_at)
+    
+    header = ['ID', '标题', '分类', '浏览量', '收藏数', '下载数', '状态', '创建时间', '更新时间']
+    return _export_response('materials', header, rows())
 
 
 @bp.route('/users/<int:user_id>/permissions', methods=['GET', 'POST'])
@@ -839,6 +1148,7 @@ def api_set_admin(user_id):
     
     user.is_admin = True
     db.session.commit()
+    _invalidate_user_counts()
     
     return jsonify({
         'success': True,
@@ -862,6 +1172,7 @@ def api_remove_admin(user_id):
     
     user.is_admin = False
     db.session.commit()
+    _invalidate_user_counts()
     
     return jsonify({
         'success': True,
@@ -887,19 +1198,16 @@ def api_delete_user(user_id):
         return jsonify({'success': False, 'message': '请先取消该用户的管理员身份'}), 400
     
     # 删除用户作品库素材的图片文件
+    storage = get_storage()
     for user_material in user.user_materials:
         for img in user_material.images:
-            if img.image_url:
-                file_path = os.path.join(current_app.root_path, img.image_url.lstrip('/'))
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except:
-                        pass
+            storage.delete_url(img.image_url)
     
     # 删除用户（级联删除会自动删除用户的卡密、作品库素材和作品库素材图片记录）
     db.session.delete(user)
     db.session.commit()
+    _invalidate_user_counts()
+    _invalidate_secret_counts()
     
     return jsonify({
         'success': True,
@@ -925,6 +1233,7 @@ def api_unbind_user_device(user_id):
     user.device_unbind_status = 0
     user.device_unbind_requested_at = None
     db.session.commit()
+    _invalidate_user_counts()
     
     logger.info(f'管理员 {current_user.username} 解绑了用户 {user.username} 的设备')
     
@@ -953,6 +1262,7 @@ def api_approve_unbind(user_id):
     user.device_unbind_status = 0
     user.device_unbind_requested_at = None
     db.session.commit()
+    _invalidate_user_counts()
     
     logger.info(f'管理员 {current_user.username} 同意了用户 {user.username} 的解绑申请')
     
@@ -980,6 +1290,7 @@ def api_reject_unbind(user_id):
     user.device_unbind_status = 0
     user.device_unbind_requested_at = None
     db.session.commit()
+    _invalidate_user_counts()
     
     logger.info(f'管理员 {current_user.username} 拒绝了用户 {user.username} 的解绑申请')
     
@@ -1120,15 +1431,9 @@ def api_delete_material(material_id):
     material = Material.query.get_or_404(material_id)
     
     # 删除关联的图片文件
+    storage = get_storage()
     for img in material.images:
-        if img.image_url:
-            # 构建完整文件路径
-            file_path = os.path.join(current_app.root_path, img.image_url.lstrip('/'))
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
+        storage.delete_url(img.image_url)
     
     # 删除素材（级联删除关联图片）
     db.session.delete(material)
@@ -1160,15 +1465,10 @@ def api_batch_delete_materials():
             return jsonify({'success': False, 'message': '未找到要删除的素材'}), 404
         
         # 删除关联的图片文件
+        storage = get_storage()
         for material in materials:
             for img in material.images:
-                if img.image_url:
-                    file_path = os.path.join(current_app.root_path, img.image_url.lstrip('/'))
-                    if os.path.exists(file_path):
-                        try:
-                            os.remove(file_path)
-                        except:
-                            pass
+                storage.delete_url(img.image_url)
         
         # 删除素材（级联删除关联图片）
         for material in materials:
@@ -1201,15 +1501,10 @@ def api_delete_all_materials():
             return jsonify({'success': False, 'message': '素材库已经是空的'}), 400
         
         # 删除关联的图片文件
+        storage = get_storage()
         for material in materials:
             for img in material.images:
-                if img.image_url:
-                    file_path = os.path.join(current_app.root_path, img.image_url.lstrip('/'))
-                    if os.path.exists(file_path):
-                        try:
-                            os.remove(file_path)
-                        except:
-                            pass
+                storage.delete_url(img.image_url)
         
         # 删除所有素材（级联删除关联图片）
         for material in materials:
@@ -1234,40 +1529,27 @@ def api_delete_all_materials():
 @permission_required('material_manage')
 @limiter.exempt
 def batch_upload_material():
-    """批量上传素材API（带安全验证）"""
+    """批量上传素材API（单个文件夹一次请求，带安全验证）"""
     try:
         # 获取表单数据
         folder_name = request.form.get('folder_name')
         text_file = request.files.get('text_file')
         
-        # 获取所有图片文件 - 使用更兼容的方式
-        # 先保存文件信息，不直接读取流
-        image_file_info = []
-        for key in request.files:
-            if key.startswith('images'):
-                files = request.files.getlist(key)
-                for f in files:
-                    if f and f.filename:
-                        image_file_info.append({
-                            'key': key,
-                            'filename': f.filename,
-                            'file_obj': f
-                        })
-        
-        # 验证图片文件（先验证但不读取完整流）
-        invalid_files = []
-        valid_file_info = []
+        # 获取所有图片文件（保留文件对象，验证后直接保存）
+        image_files = [
+            f for key in request.files if key.startswith('images')
+            for f in request.files.getlist(key) if f and f.filename
+        ]
         
-        for info in image_file_info:
-            img_file = info['file_obj']
+        # 验证图片文件
+        invalid_files = []
+        for img_file in image_files:
             try:
                 is_valid, error_msg = validate_file(img_file, ALLOWED_IMAGE_EXTENSIONS)
-                if is_valid:
-                    valid_file_info.append(info)
-                else:
-                    invalid_files.append(f'{info["filename"]}: {error_msg}')
+                if not is_valid:
+                    invalid_files.append(f'{img_file.filename}: {error_msg}')
             except Exception as e:
-                invalid_files.append(f'{info["filename"]}: 验证失败 - {str(e)}')
+                invalid_files.append(f'{img_file.filename}: 验证失败 - {str(e)}')
         
         # 如果有无效文件，返回错误
         if invalid_files:
@@ -1279,7 +1561,7 @@ def batch_upload_material():
             }), 400
         
         # 如果没有有效图片，返回错误
-        if not valid_file_info:
+        if not image_files:
             return jsonify({
                 'success': False,
                 'message': '没有有效的图片文件'
@@ -1290,13 +1572,7 @@ def batch_upload_material():
         content = ""
         if text_file:
             try:
-                content_str = text_file.read().decode('utf-8')
-                title_match = re.search(r'title\s*[：:]\s*"(.*?)"', content_str, re.DOTALL | re.IGNORECASE)
-                content_match = re.search(r'content\s*[：:]\s*"(.*?)"', content_str, re.DOTALL | re.IGNORECASE)
-                if title_match:
-                    title = title_match.group(1)
-                if content_match:
-                    content = content_match.group(1)
+                title, content = parse_copy_text(text_file.read().decode('utf-8'))
             except Exception as e:
                 logger.warning(f'解析文案文件失败: {str(e)}')
         
@@ -1305,60 +1581,37 @@ def batch_upload_material():
             title = folder_name or "未命名素材"
         
         # 图片按文件名排序
-        valid_file_info.sort(key=lambda x: x['filename'])
+        image_files.sort(key=lambda f: f.filename)
         
         # 获取或创建"副业"分类
-        material_type = MaterialType.query.filter_by(name="副业").first()
-        if not material_type:
-            material_type = MaterialType(name="副业", description="批量上传的素材分类")
-            db.session.add(material_type)
+        material_type_id = get_import_category()
         
         # 创建素材记录
         material = Material(
             title=title,
             description=content,
-            material_type_id=material_type.id if material_type.id else None,
+            material_type_id=material_type_id,
             is_published=True
         )
         db.session.add(material)
-        
-        # 如果分类是新创建的，需要先flush获取ID
-        if not material_type.id:
-            db.session.flush()
-            material.material_type_id = material_type.id
-        
-        # 再flush获取素材ID
         db.session.flush()
         
-        # 保存图片 - 重新从request.files获取文件流
+        # 保存图片
         saved_count = 0
-        for idx, info in enumerate(valid_file_info):
+        for idx, img_file in enumerate(image_files):
             try:
-                # 重新获取文件对象
-                img_file = request.files.get(info['key'])
-                if not img_file:
-                    # 尝试通过getlist获取
-                    files = request.files.getlist(info['key'])
-                    for f in files:
-                        if f.filename == info['filename']:
-                            img_file = f
-                            break
-                
-                if img_file:
-                    # 重置文件指针
-                    img_file.seek(0)
-                    img_url = save_image(img_file)
-                    if img_url:
-                        image = MaterialImage(
-                            material_id=material.id,
-                            image_url=img_url,
-                            is_cover=(idx == 0),
-                            sort_order=idx
-                        )
-                        db.session.add(image)
-                        saved_count += 1
+                img_url = save_image(img_file)
+                if img_url:
+                    image = MaterialImage(
+                        material_id=material.id,
+                        image_url=img_url,
+                        is_cover=(saved_count == 0),
+                        sort_order=idx
+                    )
+                    db.session.add(image)
+                    saved_count += 1
             except Exception as e:
-                logger.error(f'保存图片失败 {info["filename"]}: {str(e)}')
+                logger.error(f'保存图片失败 {img_file.filename}: {str(e)}')
         
         if saved_count == 0:
             db.session.rollback()
@@ -1384,6 +1637,138 @@ def batch_upload_material():
         return jsonify({'success': False, 'message': f'上传失败: {str(e)}'}), 500
 
 
+# ============================================================
+# 素材批量导入（分块续传 + 后台任务）
+# ============================================================
+
+@bp.route('/materials/imports', methods=['POST'])
+@login_required
+@admin_required
+@permission_required('material_manage')
+def api_create_material_import():
+    """创建导入会话，返回 upload_id 和建议的分块大小"""
+    try:
+        meta = create_import_session(current_user.id)
+        return jsonify({
+            'success': True,
+            'message': '上传会话已创建',
+            'data': {'upload_id': meta['upload_id'], 'chunk_size': IMPORT_CHUNK_SIZE}
+        })
+    except Exception as e:
+        logger.error(f'创建导入会话失败: {str(e)}', exc_info=True)
+        return jsonify({'success': False, 'message': f'创建失败: {str(e)}'}), 500
+
+
+@bp.route('/materials/imports/<upload_id>', methods=['GET'])
+@login_required
+@admin_required
+@permission_required('material_manage')
+@limiter.exempt
+def api_get_material_import(upload_id):
+    """查询会话已接收的文件（客户端据此从断点续传）"""
+    try:
+        meta = load_import_meta(upload_id)
+        if meta is None:
+            return jsonify({'success': False, 'message': '上传会话不存在或已过期'}), 404
+        return jsonify({
+            'success': True,
+            'message': '获取成功',
+            'data': {
+                'upload_id': upload_id,
+                'files': received_import_files(upload_id),
+                'task_id': meta['task_id'],
+                'done': len(meta['done'])
+            }
+        })
+    except MaterialImportError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+
+@bp.route('/materials/imports/<upload_id>/chunk', methods=['POST'])
+@login_required
+@admin_required
+@permission_required('material_manage')
+@limiter.exempt
+def api_upload_material_import_chunk(upload_id):
+    """上传一个分块（请求体为原始字节，path / offset 为查询参数）"""
+    try:
+        if load_import_meta(upload_id) is None:
+            return jsonify({'success': False, 'message': '上传会话不存在或已过期'}), 404
+        offset = request.args.get('offset', 0, type=int)
+        received = append_import_chunk(upload_id, request.args.get('path', ''), offset, request.stream)
+        return jsonify({'success': True, 'message': '上传成功', 'data': {'received': received}})
+    except OffsetMismatch as e:
+        # 客户端从 received 处继续上传
+        return jsonify({'success': False, 'message': str(e), 'data': {'received': e.received}}), 409
+    except MaterialImportError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f'上传分块失败: {str(e)}', exc_info=True)
+        return jsonify({'success': False, 'message': f'上传失败: {str(e)}'}), 500
+
+
+@bp.route('/materials/imports/<upload_id>/complete', methods=['POST'])
+@login_required
+@admin_required
+@permission_required('material_manage')
+def api_complete_material_import(upload_id):
+    """上传完成，启动后台导入任务
+
+    请求体可带 files: {相对路径: 字节数}，与已接收的不一致时返回未完成的文件
+    """
+    from celery.states import READY_STATES
+    from app.tasks import async_import_materials
+    
+    try:
+        meta = load_import_meta(upload_id)
+        if meta is None:
+            return jsonify({'success': False, 'message': '上传会话不存在或已过期'}), 404
+        
+        expected = (request.get_json(silent=True) or {}).get('files') or {}
+        received = received_import_files(upload_id)
+        incomplete = [path for path, size in expected.items() if received.get(path) != size]
+        if incomplete:
+            return jsonify({
+                'success': False,
+                'message': f'还有 {len(incomplete)} 个文件未上传完成',
+                'data': {'incomplete': incomplete, 'files': received}
+            }), 409
+        if not received:
+            return jsonify({'success': False, 'message': '没有上传任何文件'}), 400
+        
+        # 在会话锁内登记任务：重复点击 / 客户端重试时返回正在执行的任务，不并发导入同一会话
+        # 登记的心跳超时（worker 被杀、结果过期）时视为失联，由 claim_import_task 重新登记
+        def is_running(task_id):
+            return async_import_materials.AsyncResult(task_id).state not in READY_STATES
+        
+        task_id, created = claim_import_task(upload_id, is_running)
+        if not created:
+            logger.info(f'素材批量导入任务已在执行: upload_id={upload_id}, task_id={task_id}')
+            return jsonify({
+                'success': True,
+                'message': '导入任务正在执行',
+                'data': {'task_id': task_id, 'files': len(received), 'duplicate': True}
+            })
+        
+        try:
+            async_import_materials.apply_async(args=[upload_id], task_id=task_id)
+        except Exception:
+            release_import_task(upload_id, task_id)
+            raise
+        
+        logger.info(f'素材批量导入任务已提交: upload_id={upload_id}, task_id={task_id}, 文件数={len(received)}')
+        return jsonify({
+            'success': True,
+            'message': '导入任务已提交',
+            'data': {'task_id': task_id, 'files': len(received), 'duplicate': False}
+        })
+    except MaterialImportError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f'提交导入任务失败: {str(e)}', exc_info=True)
+        return jsonify({'success': False, 'message': f'提交失败: {str(e)}'}), 500
+
+
 # ============================================================
 # 公告管理路由
 # ============================================================
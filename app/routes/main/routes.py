@@ -9,38 +9,43 @@
 # 4. 个人中心、安全中心
 # ============================================================
 
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, current_app  # 导入Flask相关模块
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash  # 导入Flask相关模块
 from flask_login import login_required, current_user  # 导入登录相关模块
-from app.models import User, RegisterSecret, Material, UserMaterial, UserMaterialImage, UserFavorite, UserDownload, Announcement, Config  # 导入数据模型
+from app.models import User, RegisterSecret, Material, MaterialImage, UserMaterial, UserMaterialImage, UserFavorite, UserDownload, Announcement, Config  # 导入数据模型
 from app import db  # 导入数据库
-from app.decorators import device_required  # 导入设备锁装饰器
+from app.decorators import device_required, etag_cached  # 导入设备锁、ETag缓存装饰器
 from app.utils.logger import get_logger  # 导入日志模块
 from app.utils.rate_limit import limiter  # 导入限流器
+from app.utils.db_routing import read_only  # 导入只读路由装饰器（查询发往从库）
+from app.utils.pagination import apply_keyset, fetch_page  # 导入游标分页工具
+from app.utils.storage import get_storage, generate_upload_key, generate_random_key  # 导入文件存储
 from sqlalchemy.orm import joinedload  # 导入joinedload用于预加载关联数据
-import os
-import random
+import math
 import base64
 import re
 from werkzeug.utils import secure_filename
-from datetime import datetime, timedelta
+from datetime import timedelta
 from io import BytesIO
 
 logger = get_logger(__name__)
 
 bp = Blueprint('main', __name__)  # 创建主路由蓝图
 
+# 二创图片上传限制
+UPLOAD_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+UPLOAD_IMAGE_MAX_SIZE = 10 * 1024 * 1024  # 10MB
+
 
 def save_image(file):
-    """保存图片到本地并返回相对路径"""
+    """保存图片到存储并返回访问路径"""
     if not file:
         return None
     
     # 验证文件类型
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
     filename = secure_filename(file.filename)
     file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
     
-    if file_ext not in allowed_extensions:
+    if file_ext not in UPLOAD_IMAGE_EXTENSIONS:
         logger.error(f'不支持的文件格式: {file_ext}')
         return None
     
@@ -49,29 +54,16 @@ def save_image(file):
     file_size = file.stream.tell()
     file.stream.seek(0)
     
-    if file_size > 10 * 1024 * 1024:
+    if file_size > UPLOAD_IMAGE_MAX_SIZE:
         logger.error(f'文件大小超过10MB限制: {file_size / (1024 * 1024):.2f}MB')
         return None
     
-    # 添加时间戳避免重名
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-    filename = timestamp + filename
-    
-    # 构建保存路径
-    upload_folder = os.path.join(current_app.root_path, 'static', 'uploads')
-    if not os.path.exists(upload_folder):
-        os.makedirs(upload_folder)
-    
-    # 保存文件
-    file_path = os.path.join(upload_folder, filename)
-    file.save(file_path)
-    
-    # 返回相对路径（用于数据库存储）
-    return f'/static/uploads/{filename}'
+    # 添加时间戳避免重名，保存到存储（本地或对象存储）
+    return get_storage().save(file, generate_upload_key(file.filename))
 
 
 def save_base64_image(base64_data):
-    """保存Base64编码的图片到本地并返回相对路径"""
+    """保存Base64编码的图片到存储并返回访问路径"""
     if not base64_data:
         return None
     
@@ -89,8 +81,7 @@ def save_base64_image(base64_data):
         return None
     
     # 验证文件类型
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
-    if file_ext not in allowed_extensions:
+    if file_ext not in UPLOAD_IMAGE_EXTENSIONS:
         logger.error(f'不支持的图片格式: {file_ext}')
         return None
     
@@ -99,27 +90,12 @@ def save_base64_image(base64_data):
         image_data = base64.b64decode(data)
         
         # 检查文件大小（限制10MB）
-        if len(image_data) > 10 * 1024 * 1024:
+        if len(image_data) > UPLOAD_IMAGE_MAX_SIZE:
             logger.error(f'图片大小超过10MB限制: {len(image_data) / (1024 * 1024):.2f}MB')
             return None
         
-        # 生成文件名
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        random_str = ''.join([str(random.randint(0, 9)) for _ in range(6)])
-        filename = f'{timestamp}_{random_str}.{file_ext}'
-        
-        # 构建保存路径
-        upload_folder = os.path.join(current_app.root_path, 'static', 'uploads')
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-        
-        # 保存文件
-        file_path = os.path.join(upload_folder, filename)
-        with open(file_path, 'wb') as f:
-            f.write(image_data)
-        
-        # 返回相对路径
-        return f'/static/uploads/{filename}'
+        # 生成文件名并保存
+        return get_storage().save(image_data, generate_random_key(file_ext), content_type=f'image/{file_ext}')
         
     except Exception as e:
         logger.error(f'保存Base64图片失败: {e}', exc_info=True)
@@ -134,6 +110,7 @@ def api_test():
 
 @bp.route('/')
 @login_required
+@read_only
 def index():
     from datetime import datetime
     from app.models import Config
@@ -686,6 +663,8 @@ def profile_edit():
 
 @bp.route('/api/latest-materials')
 @login_required
+@etag_cached
+@read_only
 def api_get_latest_materials():
     """分页获取最新入库素材API"""
     page = request.args.get('page', 1, type=int)
@@ -748,49 +727,104 @@ def api_get_latest_materials():
 
 @bp.route('/my-materials')
 @login_required
+@read_only
 def my_materials():
-    """我的作品库页面"""
+    """我的作品库页面（只渲染页面框架和数量，列表由各标签页按需加载）"""
     active_tab = request.args.get('active_tab', 'my')
     
-    # 查询用户的二创素材（我的素材），按创建时间倒序
-    user_materials = UserMaterial.query.filter_by(
-        user_id=current_user.id
-    ).order_by(UserMaterial.created_at.desc()).all()
-    
-    # 查询用户收藏的素材，按创建时间倒序
-    favorites = UserFavorite.query.filter_by(
-        user_id=current_user.id
-    ).order_by(UserFavorite.created_at.desc()).all()
-    favorite_materials = [fav.material for fav in favorites]
-    
-    # 查询用户下载的素材（包括原始素材和用户二创素材），按创建时间倒序
-    downloads = UserDownload.query.filter_by(
-        user_id=current_user.id
-    ).order_by(UserDownload.created_at.desc()).all()
-    
-    # 整理下载素材列表
-    download_items = []
-    for download in downloads:
-        if download.material:
-            download_items.append({
-                'type': 'material',
-                'item': download.material,
-                'created_at': download.created_at
-            })
-        elif download.user_material:
-            download_items.append({
-                'type': 'user_material',
-                'item': download.user_material,
-                'created_at': download.created_at
-            })
+    my_count = UserMaterial.query.filter_by(user_id=current_user.id).count()
+    favorite_count = UserFavorite.query.filter_by(user_id=current_user.id).count()
     
     return render_template('main/my_materials.html', 
-                           user_materials=user_materials,
-                           favorite_materials=favorite_materials,
-                           download_items=download_items,
+                           my_count=my_count,
+                           favorite_count=favorite_count,
                            active_tab=active_tab)
 
 
+# 我的作品库每页条数
+MY_MATERIALS_PAGE_SIZE = 20
+
+
+def _cover_url_subquery(image_model, owner_column, owner_id_column):
+    """封面图地址子查询：优先封面，其次按排序的第一张图"""
+    return db.select(image_model.image_url).where(
+        owner_column == owner_id_column
+    ).order_by(
+        image_model.is_cover.desc(), image_model.sort_order, image_model.id
+    ).limit(1).correlate_except(image_model).scalar_subquery()
+
+
+@bp.route('/api/my-materials/<tab>')
+@login_required
+@read_only
+def api_get_my_materials(tab):
+    """我的作品库分页API（游标分页，只查询标题、计数和封面）"""
+    cursor = request.args.get('cursor')
+    limit = min(max(request.args.get('limit', MY_MATERIALS_PAGE_SIZE, type=int), 1), 50)
+    search_keyword = request.args.get('search', '').strip()
+    
+    if tab == 'my':
+        cover_url = _cover_url_subquery(UserMaterialImage, UserMaterialImage.user_material_id, UserMaterial.id)
+        query = db.session.query(
+            UserMaterial.id,
+            UserMaterial.title,
+            UserMaterial.view_count,
+            UserMaterial.download_count,
+            UserMaterial.created_at,
+            cover_url.label('cover_image_url')
+        ).filter(UserMaterial.user_id == current_user.id)
+        if search_keyword:
+            query = query.filter(UserMaterial.title.contains(search_keyword))
+        query = apply_keyset(query, UserMaterial.created_at, UserMaterial.id, cursor)
+        rows, next_cursor = fetch_page(query, limit, lambda row: (row.created_at, row.id))
+        
+        items = [{
+            'id': row.id,
+            'title': row.title,
+            'view_count': row.view_count,
+            'download_count': row.download_count,
+            'cover_image_url': row.cover_image_url,
+            'url': url_for('main.my_material_detail', user_material_id=row.id)
+        } for row in rows]
+    
+    elif tab == 'favorite':
+        cover_url = _cover_url_subquery(MaterialImage, MaterialImage.material_id, Material.id)
+        query = db.session.query(
+            UserFavorite.id.label('favorite_id'),
+            UserFavorite.created_at,
+            Material.id,
+            Material.title,
+            Material.view_count,
+            Material.favorite_count,
+            cover_url.label('cover_image_url')
+        ).join(Material, UserFavorite.material_id == Material.id).filter(
+            UserFavorite.user_id == current_user.id
+        )
+        if search_keyword:
+            query = query.filter(Material.title.contains(search_keyword))
+        query = apply_keyset(query, UserFavorite.created_at, UserFavorite.id, cursor)
+        rows, next_cursor = fetch_page(query, limit, lambda row: (row.created_at, row.favorite_id))
+        
+        items = [{
+            'id': row.id,
+            'title': row.title,
+            'view_count': row.view_count,
+            'favorite_count': row.favorite_count,
+            'cover_image_url': row.cover_image_url,
+            'url': url_for('main.material_detail', material_id=row.id)
+        } for row in rows]
+    
+    else:
+        return jsonify({'success': False, 'message': '无效的标签页'}), 404
+    
+    return jsonify({
+        'success': True,
+        'data': items,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    })
+
+
 @bp.route('/my-material/<int:user_material_id>')
 @login_required
 def my_material_detail(user_material_id):
@@ -996,6 +1030,39 @@ def api_upload_image():
         }), 500
 
 
+@bp.route('/api/upload-image/presign', methods=['POST'])
+@login_required
+@device_required
+def api_presign_upload_image():
+    """获取图片直传对象存储的预签名参数API
+    
+    对象存储驱动返回预签名表单，浏览器直接上传，图片字节不经过 Flask 进程；
+    本地存储驱动返回 direct_upload=False，前端回退到 /api/upload-image。
+    """
+    data = request.get_json(silent=True) or {}
+    content_type = (data.get('content_type') or 'image/png').lower()
+    
+    file_ext = content_type.split('/')[-1] if content_type.startswith('image/') else ''
+    if file_ext not in UPLOAD_IMAGE_EXTENSIONS:
+        return jsonify({'success': False, 'message': f'不支持的图片格式: {content_type}'}), 400
+    
+    try:
+        presigned = get_storage().presign_upload(
+            generate_random_key(file_ext),
+            content_type,
+            UPLOAD_IMAGE_MAX_SIZE
+        )
+    except Exception as e:
+        logger.error(f'生成预签名上传参数失败: {str(e)}', exc_info=True)
+        presigned = None
+    
+    if not presigned:
+        return jsonify({'success': True, 'data': {'direct_upload': False}})
+    
+    presigned['direct_upload'] = True
+    return jsonify({'success': True, 'data': presigned})
+
+
 @bp.route('/material/<int:material_id>')
 @login_required
 def material_detail(material_id):
@@ -1052,28 +1119,71 @@ def material_detail(material_id):
 @bp.route('/api/material/<int:material_id>/remix', methods=['POST'])
 @login_required
 @device_required
-@limiter.limit("5 per minute")
+@limiter.exempt
 def api_remix_material(material_id):
-    """素材二创API - 异步版本（限流：每分钟5次）"""
+    """素材二创API - 异步版本（按用户的令牌桶限流，会员额度更高）
+    
+    请求头 Idempotency-Key：同一个键重复提交返回同一个任务；
+    同一用户同一素材的任务处理期间重复提交，同样返回正在处理的任务
+    """
     logger.info(f'收到素材二创请求，素材ID: {material_id}')
     
     try:
         from app.models import Material
         from app.tasks import async_remix_material
+        from app.utils.copy_rewriter import rewrite_copy
+        from app.utils.recipe_engine import recipe_seed
+        from app.utils.admission import remix_bucket
+        from app.utils.idempotency import remix_registry, remix_scope, normalize_key
         
         # 获取原始素材（只允许二创已上架的素材）
         original_material = Material.query.filter_by(id=material_id, is_published=True).first_or_404()
         logger.debug(f'找到原始素材: {original_material.title}')
         
-        # 立即启动异步任务
-        task = async_remix_material.delay(material_id, current_user.id)
-        logger.info(f'异步任务已启动，task_id: {task.id}')
+        # 本地改写的文案预览（毫秒级，种子与任务一致，AI 不可用时即为最终文案）
+        preview = rewrite_copy(original_material.description, title=original_material.title,
+                               seed=recipe_seed(current_user.id, material_id))
+        
+        registry = remix_registry()
+        scope = remix_scope(current_user.id, material_id)
+        idempotency_key = normalize_key(request.headers.get('Idempotency-Key'))
+        
+        # 重复提交（双击 / 网络重试）直接返回已有任务，不扣减令牌
+        existing_task_id = registry.lookup(scope, idempotency_key)
+        if existing_task_id:
+            logger.info(f'重复的二创请求，返回已有任务: {existing_task_id}')
+            return jsonify({
+                'success': True,
+                'message': '二创任务正在处理，请等待...',
+                'task_id': existing_task_id,
+                'preview': preview,
+                'duplicate': True
+            })
+        
+        # 按用户ID扣减令牌（同一出口 IP 的多个用户互不影响）
+        allowed, wait = remix_bucket(current_user).take(current_user.id)
+        if not allowed:
+            wait_seconds = max(math.ceil(wait), 1)
+            message = f'创作太频繁，请等待{wait_seconds}秒后再试'
+            return jsonify({'success': False, 'code': 429, 'msg': message, 'message': message}), 429
+        
+        # 先登记任务 ID 再提交（并发的重复请求拿到同一个 ID）
+        task_id, created = registry.claim(scope, idempotency_key)
+        if created:
+            try:
+                async_remix_material.apply_async((material_id, current_user.id), task_id=task_id)
+            except Exception:
+                registry.release(scope, task_id, idempotency_key)
+                raise
+            logger.info(f'异步任务已启动，task_id: {task_id}')
         
         # 返回 task_id
         return jsonify({
             'success': True,
-            'message': '二创任务已提交，请等待处理...',
-            'task_id': task.id
+            'message': '二创任务已提交，请等待处理...' if created else '二创任务正在处理，请等待...',
+            'task_id': task_id,
+            'preview': preview,
+            'duplicate': not created
         })
         
     except Exception as e:
@@ -1104,6 +1214,10 @@ def api_get_task_status(task_id):
             response['message'] = '任务等待中...'
         elif task.status == 'STARTED':
             response['message'] = '任务正在处理中...'
+        elif task.status == 'PROGRESS':
+            # 分块执行的任务上报的进度（current / total）
+            response['message'] = '任务正在处理中...'
+            response['progress'] = task.info if isinstance(task.info, dict) else {}
         elif task.status == 'SUCCESS':
             response['message'] = '任务完成'
             response['result'] = task.result
@@ -1126,11 +1240,16 @@ def api_get_task_status(task_id):
 @bp.route('/api/user-material/<int:user_material_id>/update-image', methods=['POST'])
 @login_required
 def api_update_user_material_image(user_material_id):
-    """更新用户二创素材图片（保存处理后的图片）"""
+    """更新用户二创素材图片（保存处理后的图片）
+    
+    请求体 {"images": [...]}，每项包含 image_url，以及以下任意一个定位字段：
+        id          图片ID
+        sort_order  图片排序值
+        index       按排序后的位置（从 0 开始）
+    都没有时按在列表中的位置（兼容旧的整体提交）。只更新列出的图片，
+    每张图片处理完即可单独提交。
+    """
     from app.models import UserMaterial, UserMaterialImage
-    from werkzeug.utils import secure_filename
-    import base64
-    from io import BytesIO
     
     user_material = UserMaterial.query.filter_by(
         id=user_material_id,
@@ -1138,26 +1257,63 @@ def api_update_user_material_image(user_material_id):
     ).first_or_404()
     
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        if not data or 'images' not in data:
+        if not data or not isinstance(data.get('images'), list):
             return jsonify({'success': False, 'message': '参数错误'}), 400
         
-        # 更新图片
-        for idx, img_data in enumerate(data['images']):
-            remix_img = UserMaterialImage.query.filter_by(
-                user_material_id=user_material_id,
-                sort_order=idx
-            ).first()
+        # 一次查询该素材的全部图片（只取 ID 和排序）
+        rows = db.session.execute(
+            db.select(UserMaterialImage.id, UserMaterialImage.sort_order)
+            .where(UserMaterialImage.user_material_id == user_material.id)
+            .order_by(UserMaterialImage.sort_order, UserMaterialImage.id)
+        ).all()
+        ordered_ids = [row.id for row in rows]
+        image_ids = set(ordered_ids)
+        ids_by_order = {}
+        for row in rows:
+            ids_by_order.setdefault(row.sort_order, row.id)
+        
+        updates = {}
+        skipped = 0
+        for position, img_data in enumerate(data['images']):
+            if not isinstance(img_data, dict):
+                skipped += 1
+                continue
+            image_url = img_data.get('image_url')
+            if not isinstance(image_url, str) or not image_url or len(image_url) > 500:
+                skipped += 1
+                continue
             
-            if remix_img and 'image_url' in img_data:
-                remix_img.image_url = img_data['image_url']
-        
-        db.session.commit()
+            try:
+                if img_data.get('id') is not None:
+                    image_id = int(img_data['id'])
+                    image_id = image_id if image_id in image_ids else None
+                elif img_data.get('sort_order') is not None:
+                    image_id = ids_by_order.get(int(img_data['sort_order']))
+                else:
+                    index = int(img_data.get('index', position))
+                    image_id = ordered_ids[index] if 0 <= index < len(ordered_ids) else None
+            except (TypeError, ValueError):
+                image_id = None
+            
+            if image_id is None:
+                skipped += 1
+                continue
+            updates[image_id] = image_url
+        
+        # 一条按主键批量 UPDATE（executemany）
+        if updates:
+            db.session.execute(
+                db.update(UserMaterialImage),
+                [{'id': image_id, 'image_url': image_url} for image_id, image_url in updates.items()]
+            )
+            db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': '图片更新成功'
+            'message': '图片更新成功',
+            'data': {'updated': len(updates), 'skipped': skipped}
         })
         
     except Exception as e:
@@ -4,19 +4,27 @@
 # Celery 异步任务模块
 # 功能说明：
 # 1. async_remix_material: 素材二创异步任务
-#    - AI优化文案（调用DeepSeek API）
+#    - AI优化文案（调用DeepSeek API，全局并发已满时排队并上报排队位置）
 #    - 创建用户素材记录
-#    - 复制并处理图片
+#    - 复制图片（INSERT ... SELECT 一条语句，见 remix_store.py）
 #    - 支持任务重试（最多3次）
+#    - 结束后删除 (用户, 素材) 的处理中登记（见 idempotency.py）
+# 2. rollup_daily_stats: 每日统计汇总定时任务（celery beat 周期执行）
+#    - 重新汇总最近两天的 daily_stats（跨零点时补全前一天）
+# 3. async_generate_secrets: 大批量生成卡密
+#    - 分块插入，每块提交后更新 PROGRESS 状态（current / total）
+# 4. async_import_materials: 素材批量导入（zip / 多个文件夹）
+#    - 每个素材单独提交，每个目录处理完后更新 PROGRESS 状态（含每个目录的结果）
 # ============================================================
 
 # Celery 异步任务模块
 import os
-import json
 from celery_config import celery_app
 from app import create_app, db
-from app.models import Material, UserMaterial, UserMaterialImage, MaterialImage, UserDownload, Config
-from app.utils.material_remix import optimize_copywriting, get_unique_css_recipes
+from app.models import Material, UserMaterial, UserDownload, Config
+from app.utils.material_remix import optimize_copywriting, recipe_seed
+from app.utils.remix_store import copy_material_images
+from app.utils.idempotency import remix_registry, remix_scope
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,13 +46,21 @@ def async_remix_material(self, material_id, user_id):
         app = create_app()
         
         with app.app_context():
+            # 续期去重登记：排队等待 broker 的时间不占用任务处理期间的登记时长
+            if not remix_registry().touch(remix_scope(user_id, material_id), self.request.id):
+                logger.warning(f'二创任务的去重登记已过期并被新任务占用: user_id={user_id}, material_id={material_id}')
+            
             # 查询原始素材
             material = Material.query.filter_by(id=material_id, is_published=True).first()
             if not material:
                 raise ValueError(f'素材不存在或未上架: {material_id}')
             
-            # 1. AI 优化文案
-            optimized_description = optimize_copywriting(material.description)
+            # 1. AI 优化文案（失败时为本地改写结果，种子与提交时的预览一致）
+            # 全局并发名额已满时排队，排队位置通过任务状态返回给前端
+            optimized_description = optimize_copywriting(
+                material.description, title=material.title, seed=recipe_seed(user_id, material_id),
+                on_queue=lambda position: self.update_state(state='PROGRESS', meta={'queue_position': position})
+            )
             if not optimized_description:
                 optimized_description = material.description
             
@@ -59,27 +75,16 @@ def async_remix_material(self, material_id, user_id):
             db.session.add(user_material)
             db.session.flush()
             
-            # 3. 复制并处理图片
-            material_images = MaterialImage.query.filter_by(material_id=material_id).order_by(MaterialImage.sort_order).all()
-            
-            # 获取不重复的 CSS 配方
-            recipes = get_unique_css_recipes(len(material_images))
-            
-            for idx, img in enumerate(material_images):
-                user_img = UserMaterialImage(
-                    user_material_id=user_material.id,
-                    original_image_url=img.image_url,
-                    image_url=img.image_url,
-                    css_recipe=json.dumps(recipes[idx], ensure_ascii=False) if idx < len(recipes) else None,
-                    is_cover=img.is_cover,
-                    sort_order=img.sort_order
-                )
-                db.session.add(user_img)
+            # 3. 复制图片（一条 INSERT ... SELECT；CSS 配方按用户 + 素材固定种子，结果可复现）
+            copy_material_images(material_id, user_material.id, seed=recipe_seed(user_id, material_id))
             
             db.session.commit()
             
             logger.info(f'用户素材创建成功: user_material_id={user_material.id}, user_id={user_id}')
             
+            # 任务结束，同一素材可以再次二创
+            remix_registry().release(remix_scope(user_id, material_id), self.request.id)
+            
             return {
                 'success': True,
                 'user_material_id': user_material.id
@@ -90,7 +95,102 @@ def async_remix_material(self, material_id, user_id):
         # 重试最多3次
         if self.request.retries < self.max_retries:
             self.retry(exc=e, countdown=2 ** self.request.retries)
+        remix_registry().release(remix_scope(user_id, material_id), self.request.id)
         return {
             'success': False,
             'error': str(e)
         }
+
+
+@celery_app.task
+def rollup_daily_stats(days=2):
+    """
+    汇总最近几天的每日统计（由 celery beat 定时调用）
+    
+    Args:
+        days: 汇总的天数（含今天）
+    
+    Returns:
+        dict: 汇总的天数
+    """
+    app = create_app()
+    
+    with app.app_context():
+        from app.utils.statistics import rollup_recent
+        rolled = rollup_recent(days)
+        logger.info(f'每日统计汇总完成: 最近 {rolled} 天')
+        return {
+            'success': True,
+            'days': rolled
+        }
+
+
+@celery_app.task(bind=True)
+def async_generate_secrets(self, secret_type, count, duration_type, batch_id):
+    """
+    后台批量生成卡密
+    
+    Args:
+        secret_type: register / terminal
+        count: 生成数量
+        duration_type: 时长类型
+        batch_id: 批次号（用于生成完成后按批次下载）
+    
+    Returns:
+        dict: 批次号和生成数量
+    """
+    app = create_app()
+    
+    with app.app_context():
+        from app.utils.secret_generator import bulk_create_secrets
+        
+        def report_progress(current, total):
+            self.update_state(state='PROGRESS', meta={'current': current, 'total': total})
+        
+        created = bulk_create_secrets(secret_type, count, duration_type,
+                                      batch_id=batch_id, progress=report_progress)
+        
+        return {
+            'success': True,
+            'secret_type': secret_type,
+            'batch_id': batch_id,
+            'count': len(created)
+        }
+
+
+@celery_app.task(bind=True)
+def async_import_materials(self, upload_id):
+    """
+    后台导入上传会话中的素材
+    
+    Args:
+        upload_id: 上传会话ID（见 app/utils/material_import.py）
+    
+    Returns:
+        dict: 成功 / 失败 / 跳过的数量和每个目录的结果
+    """
+    app = create_app()
+    
+    with app.app_context():
+        from app.utils.material_import import import_session, remove_session, release_task, TaskSuperseded
+        
+        def report_progress(current, total, folders):
+            self.update_state(state='PROGRESS', meta={'current': current, 'total': total, 'folders': folders})
+        
+        try:
+            summary = import_session(upload_id, progress=report_progress, task_id=self.request.id)
+        except TaskSuperseded as e:
+            # 心跳超时被判定为失联，会话已由新任务接管：直接停止，不清除新任务的登记
+            logger.warning(f'导入任务已被接管: upload_id={upload_id}, task_id={self.request.id}')
+            return {'success': False, 'message': str(e), 'upload_id': upload_id}
+        except Exception:
+            release_task(upload_id, self.request.id)
+            raise
+        
+        # 全部成功后删除上传的文件；有失败时保留会话并清除任务登记，重新提交会跳过已导入的目录
+        if summary['failed']:
+            release_task(upload_id, self.request.id)
+        else:
+            remove_session(upload_id)
+        
+        return dict(summary, success=True, upload_id=upload_id)
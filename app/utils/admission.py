@@ -0,0 +1,266 @@
+# ============================================================
+# admission.py
+#
+# AI 调用准入控制模块
+# 功能说明：
+# 1. TokenBucket：按用户ID的令牌桶（替代按 IP 的固定窗口限流）
+#    - 同一 NAT 后的多个用户互不影响，一个用户换 IP 也绕不过
+#    - 容量 / 补充速度按会员身份区分（会员来自注册卡密有效期）
+#    - Redis 中用 Lua 脚本原子地“补充 + 扣减”，多进程共享
+# 2. LLMSemaphore：全局并发信号量，限制同时进行的 DeepSeek 调用数（全局配额）
+#    - 拿不到名额的调用按到达顺序排队，等待时回调当前排队位置（任务状态中返回给前端）
+#    - 名额带租约时间，worker 异常退出后自动释放
+#    - 等待超过 max_wait 秒放弃（调用方走本地改写）
+# 3. Redis 不可用时（未安装 / memory://）退回进程内实现
+#
+# Redis 键：
+#   admission:bucket:{name}:{key}   令牌桶（hash：tokens / ts）
+#   admission:llm:inflight          正在调用的名额（zset：成员 -> 租约到期时间）
+#   admission:llm:queue             排队中的调用（zset：成员 -> 到达时间）
+#
+# 使用示例：
+#   allowed, wait = remix_bucket(user).take(user.id)
+#   with llm_semaphore().slot(on_wait=lambda pos: ...) as admitted:
+#       if admitted: call_llm()
+# ============================================================
+
+import math
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context
+
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis, RedisError
+
+logger = get_logger(__name__)
+
+# 排队时查询名额的间隔（秒）
+POLL_INTERVAL = 0.5
+
+# 令牌桶：补充后扣减一个令牌，返回 {是否允许, 需等待秒数}
+_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return {allowed, tostring(wait)}
+"""
+
+# 信号量：清理过期名额和超时排队，排在前面的调用获得空闲名额；返回 0 表示已获得，否则为排队位置
+_ACQUIRE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+local token = ARGV[3]
+local lease = tonumber(ARGV[4])
+local stale = tonumber(ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - stale)
+if not redis.call('ZSCORE', KEYS[2], token) then
+    redis.call('ZADD', KEYS[2], now, token)
+end
+local rank = redis.call('ZRANK', KEYS[2], token)
+local free = limit - redis.call('ZCARD', KEYS[1])
+if rank < free then
+    redis.call('ZREM', KEYS[2], token)
+    redis.call('ZADD', KEYS[1], now + lease, token)
+    return 0
+end
+return rank - math.max(free, 0) + 1
+"""
+
+
+class TokenBucket:
+    """令牌桶：capacity 为最大突发次数，refill_per_minute 为每分钟补充的令牌数"""
+
+    def __init__(self, name, capacity, refill_per_minute, redis_client=None):
+        self.name = name
+        self.capacity = capacity
+        self.rate = refill_per_minute / 60.0
+        self._redis = redis_client if redis_client is not None else get_redis()
+        self._script = self._redis.register_script(_BUCKET_SCRIPT) if self._redis is not None else None
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """扣减一个令牌
+
+        Returns:
+            tuple: (是否允许, 令牌不足时需要等待的秒数)
+        """
+        now = time.time()
+        if self._script is not None:
+            try:
+                allowed, wait = self._script(
+                    keys=[f'admission:bucket:{self.name}:{key}'],
+                    args=[self.capacity, self.rate, f'{now:.3f}']
+                )
+                return bool(int(allowed)), float(wait)
+            except RedisError as e:
+                logger.warning(f'令牌桶 {self.name} 无法访问 Redis，改用进程内状态: {e}')
+        return self._take_local(key, now)
+
+    def _take_local(self, key, now):
+        with self._lock:
+            tokens, ts = self._local.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + max(0.0, now - ts) * self.rate)
+            if tokens >= 1:
+                self._local[key] = (tokens - 1, now)
+                return True, 0.0
+            self._local[key] = (tokens, now)
+            return False, (1 - tokens) / self.rate
+
+
+class LLMSemaphore:
+    """全局并发信号量 + 先到先得的等待队列"""
+
+    def __init__(self, limit, lease=60, max_wait=60, redis_client=None, name='llm'):
+        """
+        Args:
+            limit: 同时进行的调用数上限
+            lease: 名额租约秒数（应大于单次调用的最大超时），到期未释放自动回收
+            max_wait: 最长排队秒数
+        """
+        self.limit = limit
+        self.lease = lease
+        self.max_wait = max_wait
+        self._inflight_key = f'admission:{name}:inflight'
+        self._queue_key = f'admission:{name}:queue'
+        self._redis = redis_client if redis_client is not None else get_redis()
+        self._script = self._redis.register_script(_ACQUIRE_SCRIPT) if self._redis is not None else None
+        self._local_inflight = {}
+        self._local_queue = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, token):
+        """尝试获得名额：返回 0 表示已获得，否则为当前排队位置（1 表示下一个）"""
+        now = time.time()
+        # 排队记录在放弃等待后的一段时间内清理（worker 崩溃时不会永久占位）
+        stale = self.max_wait + 10
+        if self._script is not None:
+            try:
+                return int(self._script(
+                    keys=[self._inflight_key, self._queue_key],
+                    args=[self.limit, f'{now:.3f}', token, self.lease, stale]
+                ))
+            except RedisError as e:
+                logger.warning(f'并发信号量无法访问 Redis，改用进程内状态: {e}')
+        return self._try_acquire_local(token, now, stale)
+
+    def _try_acquire_local(self, token, now, stale):
+        with self._lock:
+            for key, expires_at in list(self._local_inflight.items()):
+                if expires_at <= now:
+                    del self._local_inflight[key]
+            for key, arrived_at in list(self._local_queue.items()):
+                if arrived_at <= now - stale:
+                    del self._local_queue[key]
+            self._local_queue.setdefault(token, now)
+            queue = sorted(self._local_queue, key=self._local_queue.get)
+            rank = queue.index(token)
+            free = self.limit - len(self._local_inflight)
+            if rank < free:
+                del self._local_queue[token]
+                self._local_inflight[token] = now + self.lease
+                return 0
+            return rank - max(free, 0) + 1
+
+    def release(self, token):
+        """释放名额（同时移出等待队列）"""
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                pipe.zrem(self._inflight_key, token)
+                pipe.zrem(self._queue_key, token)
+                pipe.execute()
+                return
+            except RedisError as e:
+                logger.warning(f'并发信号量无法访问 Redis，改用进程内状态: {e}')
+        with self._lock:
+            self._local_inflight.pop(token, None)
+            self._local_queue.pop(token, None)
+
+    def acquire(self, token, on_wait=None):
+        """排队直到获得名额或超过 max_wait
+
+        Args:
+            on_wait: 排队位置变化时的回调 on_wait(position)
+
+        Returns:
+            bool: 是否获得名额（未获得时已移出队列）
+        """
+        deadline = time.monotonic() + self.max_wait
+        last_position = None
+        while True:
+            position = self.try_acquire(token)
+            if position == 0:
+                return True
+            if time.monotonic() >= deadline:
+                self.release(token)
+                logger.warning(f'AI 调用排队超过 {self.max_wait} 秒（位置 {position}），放弃')
+                return False
+            if on_wait and position != last_position:
+                on_wait(position)
+                last_position = position
+            time.sleep(POLL_INTERVAL)
+
+    @contextmanager
+    def slot(self, on_wait=None):
+        """with 语句获得名额，退出时释放；as 的值为是否获得名额"""
+        token = uuid.uuid4().hex
+        admitted = self.acquire(token, on_wait)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(token)
+
+
+def _config(key, default):
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+_buckets = {}
+_semaphore = None
+
+
+def remix_bucket(user):
+    """二创令牌桶：会员与普通用户使用不同的容量和补充速度"""
+    tier = 'member' if user.has_valid_membership() else 'basic'
+    bucket = _buckets.get(tier)
+    if bucket is None:
+        if tier == 'member':
+            capacity = _config('REMIX_MEMBER_BUCKET_CAPACITY', 20)
+            refill = _config('REMIX_MEMBER_REFILL_PER_MINUTE', 20)
+        else:
+            capacity = _config('REMIX_BUCKET_CAPACITY', 5)
+            refill = _config('REMIX_REFILL_PER_MINUTE', 5)
+        bucket = _buckets[tier] = TokenBucket(f'remix:{tier}', capacity, refill)
+    return bucket
+
+
+def llm_semaphore():
+    """全局 AI 调用信号量（进程内单例，状态在 Redis 中共享）"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = LLMSemaphore(
+            limit=_config('LLM_MAX_CONCURRENCY', 8),
+            lease=math.ceil(_config('LLM_TIMEOUT_MAX', 30.0)) + 30,
+            max_wait=_config('LLM_QUEUE_MAX_WAIT', 60)
+        )
+    return _semaphore
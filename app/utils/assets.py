@@ -0,0 +1,163 @@
+# ============================================================
+# assets.py
+#
+# 静态资源指纹与缓存模块
+# 功能说明：
+# 1. 资源清单（manifest.json）：记录静态文件的内容哈希
+# 2. asset_url()：生成带哈希的文件名 URL（如 css/output.3f2a1b9c.css）
+# 3. 带哈希的 URL 和上传图片返回 Cache-Control: immutable（长期缓存）
+# 4. flask assets-manifest 命令在部署时预先生成清单
+#
+# 模板中使用：
+#   <img src="{{ asset_url('images/logo.png') }}">
+# ============================================================
+
+import os
+import re
+import json
+import hashlib
+from flask import current_app, url_for, request
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 清单文件名（位于 static 目录下）
+MANIFEST_FILENAME = 'manifest.json'
+# 哈希长度
+HASH_LENGTH = 8
+# 长期缓存时间（1年）
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# 不参与指纹的目录（上传文件本身带时间戳且不会被覆盖；src 为 Tailwind 源文件）
+EXCLUDED_DIRS = ('uploads', 'src')
+
+# 匹配 name.<hash>.ext 形式的文件名
+FINGERPRINT_PATTERN = re.compile(r'^(?P<name>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+def file_hash(path):
+    """计算文件内容哈希（取 md5 前8位）"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def fingerprint_name(filename, hash_value):
+    """在文件名的扩展名前插入哈希：css/output.css -> css/output.<hash>.css"""
+    base, ext = os.path.splitext(filename)
+    return f'{base}.{hash_value}{ext}'
+
+
+def build_manifest(static_folder):
+    """扫描 static 目录，生成 {原始路径: 带哈希路径} 的清单"""
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        rel_root = os.path.relpath(root, static_folder)
+        if rel_root == '.':
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in files:
+            filename = name if rel_root == '.' else f'{rel_root}/{name}'.replace(os.sep, '/')
+            if filename == MANIFEST_FILENAME:
+                continue
+            manifest[filename] = fingerprint_name(filename, file_hash(os.path.join(root, name)))
+    return manifest
+
+
+class AssetManifest:
+    """静态资源清单
+
+    优先读取部署时生成的 manifest.json（多节点保持一致），
+    没有清单文件时按需计算并缓存（开发环境下文件修改后自动更新）。
+    """
+
+    def __init__(self, static_folder, auto_reload=False):
+        self.static_folder = static_folder
+        self.auto_reload = auto_reload
+        self._entries = {}
+        self._mtimes = {}
+        self._from_file = False
+        self.load()
+
+    def load(self):
+        manifest_path = os.path.join(self.static_folder, MANIFEST_FILENAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+            self._from_file = True
+            logger.info(f'已加载静态资源清单: {len(self._entries)} 个文件')
+
+    def get(self, filename):
+        """返回带哈希的文件名，文件不存在时返回 None"""
+        if self._from_file:
+            return self._entries.get(filename)
+
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        cached = self._entries.get(filename)
+        if cached and (not self.auto_reload or self._mtimes.get(filename) == mtime):
+            return cached
+
+        hashed = fingerprint_name(filename, file_hash(path))
+        self._entries[filename] = hashed
+        self._mtimes[filename] = mtime
+        return hashed
+
+    def resolve(self, requested):
+        """将带哈希的文件名还原为原始文件名
+
+        Returns:
+            tuple: (原始文件名, 哈希是否与当前文件一致)，不是指纹文件名时返回 (None, False)
+        """
+        match = FINGERPRINT_PATTERN.match(requested)
+        if not match:
+            return None, False
+        original = match.group('name') + match.group('ext')
+        return original, self.get(original) == requested
+
+
+def get_manifest():
+    return current_app.extensions['asset_manifest']
+
+
+def asset_url(filename):
+    """生成带内容哈希的静态资源 URL（文件不存在时退回普通 URL）"""
+    hashed = get_manifest().get(filename)
+    return url_for('static', filename=hashed or filename)
+
+
+def _mark_immutable(response):
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    response.cache_control.no_cache = None
+    return response
+
+
+def init_assets(app):
+    """注册资源清单、asset_url 模板函数和静态文件缓存策略"""
+    manifest = AssetManifest(app.static_folder, auto_reload=app.debug)
+    app.extensions['asset_manifest'] = manifest
+    app.jinja_env.globals['asset_url'] = asset_url
+
+    def send_static_file(filename):
+        """静态文件视图：支持带哈希的文件名"""
+        original, is_current = manifest.resolve(filename)
+        if original and not os.path.exists(os.path.join(app.static_folder, filename)):
+            response = app.send_static_file(original)
+            # 哈希与当前文件不一致（旧页面引用的旧版本）时不做长期缓存
+            return _mark_immutable(response) if is_current else response
+        return app.send_static_file(filename)
+
+    app.view_functions['static'] = send_static_file
+
+    @app.after_request
+    def set_upload_cache_headers(response):
+        # 上传文件以时间戳命名且不会被覆盖，可以长期缓存
+        if response.status_code == 200 and request.path.startswith('/static/uploads/'):
+            _mark_immutable(response)
+        return response
@@ -0,0 +1,90 @@
+# ============================================================
+# cache.py
+#
+# 进程内短时缓存模块
+# 功能说明：
+# 1. TTLCache：带过期时间的键值缓存（线程安全，按最早过期淘汰）
+# 2. get_or_set：缓存未命中时调用函数计算并写入
+# 3. delete_prefix：按键前缀批量失效（如写入卡密后清除卡密统计）
+#
+# 适用场景：
+#   后台列表的统计数字等“允许短暂不准确、计算代价较高”的数据
+#   缓存只存在于当前进程，多进程部署时各进程独立过期（TTL 即最大延迟）
+#
+# 使用示例：
+#   from app.utils.cache import cache
+#   counts = cache.get_or_set('secret_counts:register', lambda: compute(), ttl=30)
+#   cache.delete_prefix('secret_counts:')
+# ============================================================
+
+import time
+import threading
+
+# 缓存未命中的标记（区分缓存的 None 值）
+_MISSING = object()
+
+
+class TTLCache:
+    """带过期时间的进程内缓存"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """读取缓存，不存在或已过期返回 default"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl):
+        """写入缓存，ttl 为秒数（<= 0 时不缓存）"""
+        if ttl <= 0:
+            return
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                self._evict()
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, func, ttl):
+        """缓存命中直接返回，否则调用 func() 计算并缓存结果"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            # 计算过程不持有锁，并发未命中时可能重复计算，结果一致
+            value = func()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """删除所有以 prefix 开头的键"""
+        with self._lock:
+            for key in [k for k in self._data if str(k).startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        """清理已过期的条目，仍然超限时删除最早过期的条目"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+        if len(self._data) >= self.max_entries:
+            oldest = min(self._data, key=lambda k: self._data[k][0])
+            del self._data[oldest]
+
+
+# 全局缓存实例
+cache = TTLCache()
@@ -0,0 +1,299 @@
+# ============================================================
+# circuit_breaker.py
+#
+# 熔断器模块（保护 DeepSeek 等外部接口）
+# 功能说明：
+# 1. 三种状态：
+#    - closed：正常调用，记录每次调用的结果与耗时
+#    - open：最近窗口内错误率超过阈值后打开，调用方直接走本地兜底（不再等待超时）
+#    - half_open：打开 cooldown 秒后，只放行一个探测请求；成功则关闭，失败则重新打开
+# 2. 状态保存在 Redis 中，所有 Web 进程和 Celery worker 共享
+#    - Redis 不可用时退回进程内状态（各进程独立熔断）
+# 3. 自适应超时：按最近成功调用耗时的 p95 × 倍数计算单次调用的超时时间，
+#    限制在 [min_timeout, max_timeout] 之间
+#
+# Redis 键（name 为熔断器名称）：
+#   circuit:{name}:calls   最近的调用记录列表（"时间戳|成功|耗时"）
+#   circuit:{name}:opened  打开时间（不存在表示 closed）
+#   circuit:{name}:probe   半开探测锁（SET NX EX）
+#
+# 使用示例：
+#   breaker = CircuitBreaker('deepseek')
+#   try:
+#       with breaker.guard() as call:
+#           response = client.create(..., request_timeout=call.timeout)
+#   except CircuitOpenError:
+#       return fallback()
+# ============================================================
+
+import math
+import time
+import threading
+from collections import deque
+
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis, RedisError
+
+logger = get_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Redis 故障后多少秒内使用进程内状态，之后再尝试 Redis
+REDIS_RETRY_SECONDS = 30
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开，调用被拒绝"""
+
+
+def percentile(values, fraction):
+    """最近秩法计算分位数（values 为空时返回 None）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class _MemoryBackend:
+    """进程内状态（Redis 不可用时使用）"""
+
+    def __init__(self, window_size):
+        self._calls = deque(maxlen=window_size)
+        self._opened_at = None
+        self._probe_until = 0
+        self._lock = threading.Lock()
+
+    def record(self, timestamp, success, latency, ttl):
+        with self._lock:
+            self._calls.appendleft((timestamp, success, latency))
+
+    def calls(self):
+        with self._lock:
+            return list(self._calls)
+
+    def opened_at(self):
+        return self._opened_at
+
+    def open(self, timestamp, ttl):
+        self._opened_at = timestamp
+
+    def close(self):
+        with self._lock:
+            self._opened_at = None
+            self._calls.clear()
+
+    def acquire_probe(self, ttl):
+        with self._lock:
+            now = time.time()
+            if self._probe_until > now:
+                return False
+            self._probe_until = now + ttl
+            return True
+
+    def release_probe(self):
+        self._probe_until = 0
+
+
+class _RedisBackend:
+    """Redis 共享状态"""
+
+    def __init__(self, client, name, window_size):
+        self._client = client
+        self._window_size = window_size
+        prefix = f'circuit:{name}'
+        self._calls_key = f'{prefix}:calls'
+        self._opened_key = f'{prefix}:opened'
+        self._probe_key = f'{prefix}:probe'
+
+    def record(self, timestamp, success, latency, ttl):
+        pipe = self._client.pipeline()
+        pipe.lpush(self._calls_key, f'{timestamp:.3f}|{int(success)}|{latency:.3f}')
+        pipe.ltrim(self._calls_key, 0, self._window_size - 1)
+        pipe.expire(self._calls_key, ttl)
+        pipe.execute()
+
+    def calls(self):
+        calls = []
+        for item in self._client.lrange(self._calls_key, 0, self._window_size - 1):
+            timestamp, success, latency = item.split('|')
+            calls.append((float(timestamp), success == '1', float(latency)))
+        return calls
+
+    def opened_at(self):
+        value = self._client.get(self._opened_key)
+        return float(value) if value else None
+
+    def open(self, timestamp, ttl):
+        self._client.set(self._opened_key, f'{timestamp:.3f}', ex=ttl)
+
+    def close(self):
+        self._client.delete(self._opened_key, self._calls_key)
+
+    def acquire_probe(self, ttl):
+        return bool(self._client.set(self._probe_key, '1', nx=True, ex=max(int(math.ceil(ttl)), 1)))
+
+    def release_probe(self):
+        self._client.delete(self._probe_key)
+
+
+class _Call:
+    """一次受保护的调用（guard() 返回）"""
+
+    def __init__(self, timeout, probe):
+        self.timeout = timeout
+        self.probe = probe
+        self.started_at = time.monotonic()
+
+
+class CircuitBreaker:
+    """基于错误率的熔断器，状态在 Redis 中共享"""
+
+    def __init__(self, name, failure_rate=0.5, min_calls=5, window_size=50, window_seconds=120,
+                 cooldown=30, min_timeout=5.0, max_timeout=30.0, timeout_multiplier=2.0,
+                 timeout_percentile=0.95, redis_client=None):
+        """
+        Args:
+            name: 熔断器名称（Redis 键前缀）
+            failure_rate: 窗口内错误率达到该值时打开
+            min_calls: 窗口内调用次数不足时不判断错误率
+            window_size: 最多保留的调用记录数
+            window_seconds: 只统计最近多少秒内的调用
+            cooldown: 打开后多少秒进入半开状态
+            min_timeout / max_timeout: 自适应超时的上下限（秒），样本不足时使用 max_timeout
+            timeout_multiplier: 超时时间 = 耗时分位数 × 倍数
+            timeout_percentile: 计算超时时间使用的分位数
+            redis_client: 默认使用 get_redis()
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.cooldown = cooldown
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.timeout_percentile = timeout_percentile
+
+        client = redis_client if redis_client is not None else get_redis()
+        self._redis = _RedisBackend(client, name, window_size) if client is not None else None
+        self._local = _MemoryBackend(window_size)
+        self._redis_failed_at = 0
+
+    # ---------- 存储 ----------
+
+    def _run(self, operation, *args):
+        """优先在 Redis 上执行，Redis 故障时退回进程内状态"""
+        if self._redis is not None and time.monotonic() - self._redis_failed_at >= REDIS_RETRY_SECONDS:
+            try:
+                return getattr(self._redis, operation)(*args)
+            except (RedisError, ValueError) as e:
+                self._redis_failed_at = time.monotonic()
+                logger.warning(f'熔断器 {self.name} 无法访问 Redis，改用进程内状态: {e}')
+        return getattr(self._local, operation)(*args)
+
+    def _ttl(self):
+        return int(max(self.window_seconds, self.cooldown) * 2)
+
+    # ---------- 统计 ----------
+
+    def stats(self):
+        """最近窗口内的统计：调用数、失败数、错误率、成功调用耗时的 p50 / p95"""
+        since = time.time() - self.window_seconds
+        calls = [call for call in self._run('calls') if call[0] >= since]
+        failures = sum(1 for _, success, _ in calls if not success)
+        latencies = [latency for _, success, latency in calls if success]
+        return {
+            'calls': len(calls),
+            'failures': failures,
+            'error_rate': failures / len(calls) if calls else 0.0,
+            'p50': percentile(latencies, 0.5),
+            'p95': percentile(latencies, 0.95),
+            'latency': percentile(latencies, self.timeout_percentile),
+            'samples': len(latencies)
+        }
+
+    @property
+    def state(self):
+        opened_at = self._run('opened_at')
+        if opened_at is None:
+            return CLOSED
+        return HALF_OPEN if time.time() - opened_at >= self.cooldown else OPEN
+
+    def timeout(self, stats=None):
+        """单次调用的超时时间（秒）：耗时分位数 × 倍数，样本不足时使用 max_timeout"""
+        stats = stats or self.stats()
+        if stats['samples'] < self.min_calls:
+            return self.max_timeout
+        return min(max(stats['latency'] * self.timeout_multiplier, self.min_timeout), self.max_timeout)
+
+    # ---------- 调用 ----------
+
+    def acquire(self):
+        """申请一次调用，熔断器打开时抛出 CircuitOpenError
+
+        Returns:
+            _Call: 包含本次调用的超时时间（timeout）和是否为半开探测（probe）
+        """
+        opened_at = self._run('opened_at')
+        if opened_at is None:
+            return _Call(self.timeout(), probe=False)
+
+        remaining = self.cooldown - (time.time() - opened_at)
+        if remaining > 0:
+            raise CircuitOpenError(f'熔断器 {self.name} 已打开，{math.ceil(remaining)} 秒后探测')
+        # 半开：只放行一个探测请求（探测锁在超时后自动释放）
+        if not self._run('acquire_probe', self.max_timeout + 5):
+            raise CircuitOpenError(f'熔断器 {self.name} 正在探测')
+        logger.info(f'熔断器 {self.name} 半开，发送探测请求')
+        return _Call(self.max_timeout, probe=True)
+
+    def record(self, call, success):
+        """记录调用结果并更新状态"""
+        latency = time.monotonic() - call.started_at
+        now = time.time()
+        self._run('record', now, success, latency, self._ttl())
+
+        if call.probe:
+            if success:
+                self._run('close')
+                logger.info(f'熔断器 {self.name} 探测成功，已关闭')
+            else:
+                self._run('open', now, self._ttl())
+                logger.warning(f'熔断器 {self.name} 探测失败，重新打开 {self.cooldown} 秒')
+            self._run('release_probe')
+            return
+
+        if not success:
+            stats = self.stats()
+            if stats['calls'] >= self.min_calls and stats['error_rate'] >= self.failure_rate \
+                    and self._run('opened_at') is None:
+                self._run('open', now, self._ttl())
+                logger.warning(f'熔断器 {self.name} 已打开：最近 {stats["calls"]} 次调用错误率 '
+                               f'{stats["error_rate"]:.0%}，{self.cooldown} 秒内直接走兜底')
+
+    def guard(self):
+        """上下文管理器：进入时 acquire()，正常退出记为成功，抛出异常记为失败"""
+        return _Guard(self)
+
+    def reset(self):
+        """清除所有状态（手动恢复 / 测试用）"""
+        self._run('close')
+        self._run('release_probe')
+
+
+class _Guard:
+    def __init__(self, breaker):
+        self._breaker = breaker
+        self._call = None
+
+    def __enter__(self):
+        self._call = self._breaker.acquire()
+        return self._call
+
+    def __exit__(self, exc_type, exc, tb):
+        self._breaker.record(self._call, exc_type is None)
+        return False
@@ -0,0 +1,100 @@
+# ============================================================
+# compression.py
+#
+# 响应压缩模块
+# 功能说明：
+# 1. 根据 Accept-Encoding 协商压缩算法（brotli 优先，其次 gzip）
+# 2. 只压缩文本类响应（HTML / JSON / CSS / JS），且超过大小阈值才压缩
+# 3. 跳过流式响应、文件直传响应和已编码的响应
+#
+# 配置项：
+#   COMPRESS_ENABLED   是否启用（默认启用）
+#   COMPRESS_MIN_SIZE  最小压缩字节数（默认 500）
+#   COMPRESS_LEVEL     gzip 压缩级别（默认 6）
+#   COMPRESS_BR_LEVEL  brotli 压缩级别（默认 4，兼顾速度）
+# ============================================================
+
+import gzip
+from flask import request
+from app.utils.logger import get_logger
+
+# brotli 为可选依赖，未安装时只使用 gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = get_logger(__name__)
+
+# 可压缩的响应类型
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml'
+}
+
+
+def available_encodings():
+    """服务端支持的编码（按优先级排序）"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress_data(data, encoding, gzip_level=6, br_level=4):
+    """按指定编码压缩字节数据"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=br_level)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def init_compression(app):
+    """注册响应压缩处理"""
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+
+    if not app.config['COMPRESS_ENABLED']:
+        return
+
+    logger.info(f'响应压缩已启用: {", ".join(available_encodings())}')
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (response.direct_passthrough
+                or response.is_streamed
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.set_data(compress_data(
+            data,
+            encoding,
+            gzip_level=app.config['COMPRESS_LEVEL'],
+            br_level=app.config['COMPRESS_BR_LEVEL']
+        ))
+        response.headers['Content-Encoding'] = encoding
+
+        # 压缩后字节不同，强 ETag 改为弱 ETag
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            response.set_etag(etag, weak=True)
+
+        return response
@@ -0,0 +1,183 @@
+# ============================================================
+# copy_rewriter.py
+#
+# 本地文案改写模块（不调用 AI，毫秒级）
+# 功能说明：
+# 1. replace_sensitive：按词典替换合规敏感词（兼职 -> 搞点碎银子 等）
+#    - 词典构建为 Aho-Corasick 自动机（text_normalize.BannedWordScanner），一次遍历完成
+#    - 重叠时取最左最长的词（"日入过千" 优先于 "日入"）
+# 2. rewrite_copy：切句去重 + 逐句替换敏感词 + 句子重排 + 模板结构化（标题钩子 + 正文 + 引导）
+#    - 首句保持在前，引导类句子（评论、私信、扣1）移到末尾，中间句子打乱
+# 3. prepare_llm_input：调用 AI 前的预处理（清洗、替换、去重、截断），缩短输入
+#
+# 用途：
+#   - 二创提交时立即返回本地改写作为预览
+#   - optimize_copywriting 调用失败 / 未配置 API Key 时的兜底结果
+#   - AI 输出仍含敏感词时的最后一道替换
+#
+# 同一个 seed 得到相同的改写结果
+# ============================================================
+
+import re
+import random
+
+from app.utils.text_normalize import BannedWordScanner, sanitize_copy
+
+# 敏感词 -> 可选的替换词（系统提示词中的替代方案，需覆盖 text_normalize.BANNED_WORDS）
+REPLACEMENTS = {
+    '兼职': ('搞点碎银子', '业余搞点米'),
+    '赚钱': ('搞米', '换个鸡腿', '搞点零花钱'),
+    '挣钱': ('搞米', '搞点零花钱'),
+    '工资': ('零花钱', '米'),
+    '日入过千': ('一天多搞点米', '每天换几个鸡腿'),
+    '月入过万': ('每月改善生活', '每月多点零花钱'),
+    '日入': ('一天搞点米', '每天换个鸡腿'),
+    '月入': ('每月改善生活', '每月多点零花钱'),
+    '提现': ('到手', '拿到'),
+    '回本': ('不亏', '值回来'),
+    '项目': ('资料', '方法'),
+    '副业': ('搞米路子', '小路子'),
+    '躺赚': ('轻松搞米',),
+    '暴富': ('改善生活',),
+}
+
+# 标题钩子（{title} 为素材标题）
+TITLE_HOOKS = (
+    '姐妹们，{title}这个真的可以试试！',
+    '最近挖到一个宝藏：{title}，忍不住分享。',
+    '{title}，早点知道就好了！',
+    '关于{title}，说点大实话。',
+)
+GENERIC_HOOKS = (
+    '姐妹们，这个真的可以试试！',
+    '最近挖到一份宝藏资料，忍不住分享。',
+    '早点知道这个方法就好了！',
+)
+# 结尾引导
+CALL_TO_ACTIONS = (
+    '需要的宝子评论区扣1，看到都会回。',
+    '感兴趣的可以私信我，资料直接发你。',
+    '先收藏起来，慢慢看不迷路。',
+)
+# 句子中出现这些词视为引导语，放到末尾
+CTA_KEYWORDS = ('评论', '私信', '扣1', '关注', '领取', '点赞', '收藏', '戳我', '滴滴')
+
+# 改写结果的最大长度（与系统提示词的 150-300 字一致）
+MAX_REWRITE_LENGTH = 300
+# 标题钩子中标题的最大长度
+MAX_HOOK_TITLE_LENGTH = 20
+# 发送给 AI 的原文最大长度
+MAX_LLM_INPUT_LENGTH = 800
+
+# 句子：到句末标点或换行为止（句末标点保留在句子中）
+_SENTENCE_RE = re.compile(r'[^。！？!?\n]+[。！？!?]*')
+_SENTENCE_END = '。！？!?'
+
+_replacement_scanner = BannedWordScanner(REPLACEMENTS)
+
+
+def replace_sensitive(text, rng=None):
+    """替换敏感词（重叠时取最左最长），rng 为 None 时取第一个替换词"""
+    if not text:
+        return text
+    matches = sorted(_replacement_scanner.find(text), key=lambda match: (match[0], -len(match[1])))
+    if not matches:
+        return text
+
+    parts = []
+    position = 0
+    for start, word in matches:
+        if start < position:
+            continue
+        options = REPLACEMENTS[word]
+        parts.append(text[position:start])
+        parts.append(rng.choice(options) if rng else options[0])
+        position = start + len(word)
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def split_sentences(text):
+    """切分句子，去掉空句和重复句，缺少句末标点的补上句号"""
+    sentences = []
+    seen = set()
+    for sentence in _SENTENCE_RE.findall(text or ''):
+        sentence = sentence.strip(' \t，,、')
+        if not sentence or sentence in seen:
+            continue
+        seen.add(sentence)
+        if sentence[-1] not in _SENTENCE_END:
+            sentence += '。'
+        sentences.append(sentence)
+    return sentences
+
+
+def _is_call_to_action(sentence):
+    return any(keyword in sentence for keyword in CTA_KEYWORDS)
+
+
+def reorder_sentences(sentences, rng):
+    """首句保持在前，引导语移到末尾，中间句子打乱"""
+    if len(sentences) <= 2:
+        return list(sentences)
+    head, rest = sentences[0], sentences[1:]
+    body = [sentence for sentence in rest if not _is_call_to_action(sentence)]
+    tail = [sentence for sentence in rest if _is_call_to_action(sentence)]
+    rng.shuffle(body)
+    return [head] + body + tail
+
+
+def rewrite_copy(text, title=None, seed=None):
+    """本地改写文案：敏感词替换 + 句子重排 + 标题钩子 / 结尾引导
+
+    Args:
+        text: 原文案
+        title: 素材标题（用于标题钩子，可为空）
+        seed: 随机种子（相同种子结果相同）
+
+    Returns:
+        str: 改写后的文案（原文案为空时原样返回）
+    """
+    if not text or not text.strip():
+        return text
+
+    rng = random.Random(seed)
+    # 先切句去重再逐句替换：随机替换词不同会让原本重复的句子去重失败
+    sentences = [replace_sensitive(sentence, rng) for sentence in split_sentences(sanitize_copy(text))]
+    sentences = reorder_sentences(sentences, rng)
+
+    title = replace_sensitive((title or '').strip(), rng)[:MAX_HOOK_TITLE_LENGTH]
+    hook = rng.choice(TITLE_HOOKS).format(title=title) if title else rng.choice(GENERIC_HOOKS)
+    # 原文最后的引导语作为结尾，没有时使用模板
+    if sentences and _is_call_to_action(sentences[-1]):
+        ending = sentences.pop()
+    else:
+        ending = rng.choice(CALL_TO_ACTIONS)
+
+    # 在长度限制内尽量保留正文（标题钩子和结尾不截断）
+    budget = MAX_REWRITE_LENGTH - len(hook) - len(ending)
+    body = []
+    for sentence in sentences:
+        if len(sentence) > budget:
+            break
+        body.append(sentence)
+        budget -= len(sentence)
+    if not body and sentences:
+        body = [sentences[0][:max(budget, 0)]]
+
+    return '\n\n'.join(part for part in (hook, ''.join(body), ending) if part)
+
+
+def prepare_llm_input(text, max_length=MAX_LLM_INPUT_LENGTH):
+    """AI 改写前的预处理：清洗表情、替换敏感词、去掉重复句，并按句截断到 max_length"""
+    if not text or not text.strip():
+        return text
+    sentences = split_sentences(replace_sensitive(sanitize_copy(text)))
+    result = []
+    length = 0
+    for sentence in sentences:
+        if length + len(sentence) > max_length and result:
+            break
+        result.append(sentence)
+        length += len(sentence)
+    return ''.join(result)[:max_length]
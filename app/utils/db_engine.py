@@ -0,0 +1,113 @@
+# ============================================================
+# db_engine.py
+#
+# 数据库引擎配置模块
+# 功能说明：
+# 1. SQLite：每个新连接通过 connect 事件设置 PRAGMA
+#    - journal_mode=WAL    读写互不阻塞（多个 gunicorn / Celery worker 并发）
+#    - synchronous=NORMAL  WAL 模式下安全且写入更快
+#    - busy_timeout        遇到写锁时等待而不是立即报 database is locked
+#    - cache_size / mmap_size / temp_store=MEMORY  减少磁盘 I/O
+# 2. PostgreSQL / MySQL：设置连接池大小、回收时间和 pre-ping
+# 3. 用户在 SQLALCHEMY_ENGINE_OPTIONS 中显式配置的项优先
+#
+# 配置项：
+#   SQLITE_JOURNAL_MODE  日志模式（默认 WAL）
+#   SQLITE_SYNCHRONOUS   同步级别（默认 NORMAL）
+#   SQLITE_BUSY_TIMEOUT  等待写锁的毫秒数（默认 5000）
+#   SQLITE_CACHE_SIZE    页缓存（负数表示 KB，默认 -64000 即 64MB）
+#   SQLITE_MMAP_SIZE     内存映射字节数（默认 256MB）
+#   DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_RECYCLE  服务端数据库连接池参数
+# ============================================================
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite(uri):
+    """内存库不支持 WAL"""
+    database = make_url(uri).database
+    return not database or database == ':memory:' or 'mode=memory' in str(uri)
+
+
+def sqlite_pragmas(config):
+    """根据配置生成 PRAGMA 列表（按执行顺序）"""
+    return [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', int(config.get('SQLITE_BUSY_TIMEOUT', 5000))),
+        ('cache_size', int(config.get('SQLITE_CACHE_SIZE', -64000))),
+        ('mmap_size', int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        ('temp_store', 'MEMORY')
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """在 DBAPI 连接上执行 PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def build_engine_options(uri, config):
+    """生成 SQLALCHEMY_ENGINE_OPTIONS 默认值"""
+    if is_sqlite(uri):
+        # sqlite3 驱动自身的锁等待（秒），与 busy_timeout 保持一致
+        return {
+            'connect_args': {
+                'timeout': int(config.get('SQLITE_BUSY_TIMEOUT', 5000)) / 1000,
+                'check_same_thread': False
+            }
+        }
+
+    return {
+        'pool_size': int(config.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(config.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': int(config.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
+
+
+def configure_engine_options(app):
+    """在 db.init_app 之前调用：合并引擎参数默认值"""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = build_engine_options(uri, app.config)
+
+    user_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if 'connect_args' in user_options and 'connect_args' in options:
+        options['connect_args'].update(user_options['connect_args'])
+        user_options = {k: v for k, v in user_options.items() if k != 'connect_args'}
+    options.update(user_options)
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def attach_sqlite_pragmas(engine, config):
+    """为 SQLite 引擎注册 connect 事件"""
+    pragmas = sqlite_pragmas(config)
+    if is_memory_sqlite(str(engine.url)):
+        pragmas = [(name, value) for name, value in pragmas if name not in ('journal_mode', 'mmap_size')]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    logger.info(f'SQLite 调优已启用: {engine.url.database} ({", ".join(f"{n}={v}" for n, v in pragmas)})')
+
+
+def init_db_engine(app, db):
+    """在 db.init_app 之后调用：为所有 SQLite 引擎注册 PRAGMA"""
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                attach_sqlite_pragmas(engine, app.config)
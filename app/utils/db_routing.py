@@ -0,0 +1,166 @@
+# ============================================================
+# db_routing.py
+#
+# 数据库读写分离模块
+# 功能说明：
+# 1. RoutingSession：在 db.session 上按读写类型选择引擎
+#    - 标记为只读的路由 / 代码块中的查询发往从库（replica_0、replica_1 ...）
+#    - 写入（INSERT / UPDATE / DELETE / flush）始终发往主库
+#    - 同一请求内写入之后的读取也发往主库（读己之写）
+# 2. read_only 装饰器 / use_replica 上下文管理器：标记只读
+# 3. use_primary 上下文管理器：在只读路由中强制读主库
+# 4. 写入后的短时间内，同一用户的后续请求仍读主库（避免从库延迟导致“刚改的数据不见了”）
+#
+# 配置项：
+#   DATABASE_REPLICA_URLS            从库地址，逗号分隔（不配置则不启用读写分离）
+#   DATABASE_REPLICA_STICKY_SECONDS  写入后读主库的秒数（默认 5）
+#
+# 本地测试：
+#   DATABASE_URL=sqlite:///primary.db
+#   DATABASE_REPLICA_URLS=sqlite:///replica.db
+# ============================================================
+
+import time
+import random
+from functools import wraps
+from contextlib import contextmanager
+
+from flask import g, current_app, has_app_context, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.sql import Select
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 从库在 SQLALCHEMY_BINDS 中的键名前缀
+REPLICA_BIND_PREFIX = 'replica_'
+
+# 记录最近一次写入时间的 session 键
+LAST_WRITE_SESSION_KEY = '_db_last_write'
+
+
+def replica_bind_keys(config):
+    """配置中的从库 bind 键列表"""
+    return [key for key in (config.get('SQLALCHEMY_BINDS') or {}) if str(key).startswith(REPLICA_BIND_PREFIX)]
+
+
+def configure_replicas(app, build_options=None):
+    """在 db.init_app 之前调用：把 DATABASE_REPLICA_URLS 注册为 SQLALCHEMY_BINDS"""
+    urls = [url.strip() for url in (app.config.get('DATABASE_REPLICA_URLS') or '').split(',') if url.strip()]
+    app.config.setdefault('DATABASE_REPLICA_STICKY_SECONDS', 5)
+
+    if not urls:
+        return
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for index, url in enumerate(urls):
+        options = build_options(url, app.config) if build_options else {}
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = dict(options, url=url)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+    logger.info(f'读写分离已启用: {len(urls)} 个从库')
+
+
+def _request_flag(name):
+    return has_app_context() and g.get(name, False)
+
+
+def _recently_wrote(sticky_seconds):
+    """当前用户是否在 sticky_seconds 秒内写入过"""
+    if not has_request_context() or sticky_seconds <= 0:
+        return False
+    last_write = flask_session.get(LAST_WRITE_SESSION_KEY)
+    return bool(last_write) and time.time() - last_write < sticky_seconds
+
+
+class RoutingSession(Session):
+    """按读写类型选择主库 / 从库的 Session"""
+
+    def _choose_replica(self):
+        """返回本次会话使用的从库引擎（同一会话固定使用一个从库）"""
+        engines = self._db.engines
+        key = self.info.get('replica_key')
+        if key is None:
+            keys = [k for k in engines if isinstance(k, str) and k.startswith(REPLICA_BIND_PREFIX)]
+            if not keys:
+                return None
+            key = self.info['replica_key'] = random.choice(keys)
+        return engines.get(key)
+
+    def _can_use_replica(self, mapper, clause):
+        if self._flushing or self.info.get('wrote'):
+            return False
+        if not (self.info.get('read_only') or _request_flag('db_read_only')):
+            return False
+        if _request_flag('db_force_primary'):
+            return False
+        if clause is not None and not isinstance(clause, Select):
+            return False
+        # 只有默认 bind 的表才有从库
+        if mapper is not None and inspect(mapper).local_table.metadata.info.get('bind_key') is not None:
+            return False
+        return not _recently_wrote(current_app.config.get('DATABASE_REPLICA_STICKY_SECONDS', 5))
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None and not isinstance(clause, Select):
+            # 直接执行的写语句（update / delete / insert）
+            self.info['wrote'] = True
+
+        if bind is None and self._can_use_replica(mapper, clause):
+            engine = self._choose_replica()
+            if engine is not None:
+                return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_wrote(session, flush_context):
+    """flush 之后本会话的读取都走主库"""
+    session.info['wrote'] = True
+    if has_app_context():
+        g.db_wrote = True
+
+
+def read_only(f):
+    """装饰器：路由中的查询发往从库"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+@contextmanager
+def use_replica(db_session):
+    """上下文管理器：代码块中的查询发往从库（可用于 Celery 任务等非请求场景）"""
+    previous = db_session.info.get('read_only', False)
+    db_session.info['read_only'] = True
+    try:
+        yield db_session
+    finally:
+        db_session.info['read_only'] = previous
+
+
+@contextmanager
+def use_primary():
+    """上下文管理器：在只读路由中强制读主库"""
+    previous = g.get('db_force_primary', False)
+    g.db_force_primary = True
+    try:
+        yield
+    finally:
+        g.db_force_primary = previous
+
+
+def init_db_routing(app):
+    """注册写入记录：写入后的短时间内同一用户的请求读主库"""
+    if not replica_bind_keys(app.config):
+        return
+
+    @app.after_request
+    def remember_last_write(response):
+        if g.get('db_wrote') and app.config['DATABASE_REPLICA_STICKY_SECONDS'] > 0:
+            flask_session[LAST_WRITE_SESSION_KEY] = time.time()
+        return response
@@ -0,0 +1,130 @@
+# ============================================================
+# export.py
+#
+# 流式导出模块
+# 功能说明：
+# 1. iter_csv：把行迭代器逐块编码为 CSV（带 BOM，Excel 直接打开中文不乱码）
+#    - CSV 和 xlsx 的单元格都经过 format_cell：以 = + - @ 制表符 回车 开头的文本加 ' 前缀（防公式注入）
+# 2. iter_lines：每行一个值的纯文本（如卡密列表）
+# 3. iter_xlsx：openpyxl write_only 模式写入临时文件，再分块输出（openpyxl 为可选依赖）
+#    - xlsx 是 zip 格式，必须写完才能输出；write_only 模式逐行落盘，内存占用同样与行数无关
+# 4. stream_download：生成器包装为下载响应，边查询边输出，内存占用与行数无关
+#
+# 使用示例：
+#   rows = db.session.execute(query.execution_options(yield_per=1000))
+#   return stream_download(iter_csv(['卡密', '时长'], rows), 'secrets.csv', 'text/csv')
+# ============================================================
+
+import io
+import os
+import csv
+import tempfile
+from datetime import datetime
+from urllib.parse import quote
+
+from flask import Response, stream_with_context
+
+# 数据库游标每次取出的行数
+EXPORT_YIELD_PER = 1000
+# 每累积多少行向客户端输出一次
+FLUSH_ROWS = 500
+
+# 以这些字符开头的文本会被 Excel 当作公式
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# xlsx 临时文件每次读取的字节数
+XLSX_READ_SIZE = 64 * 1024
+
+MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'txt': 'text/plain; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+# openpyxl 为可选依赖，未安装时不支持 xlsx 导出
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+
+def xlsx_available():
+    return Workbook is not None
+
+
+def format_cell(value):
+    """导出单元格格式：时间统一为字符串，None 为空，可能被当作公式的字符串加单引号前缀"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # 用户名、素材标题等由用户填写，防止 Excel 打开时作为公式执行（CSV / 公式注入）
+        return f"'{value}"
+    return value
+
+
+def iter_csv(header, rows):
+    """逐块生成 CSV 文本"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # UTF-8 BOM
+    buffer.write('\ufeff')
+    writer.writerow(header)
+
+    for index, row in enumerate(rows, 1):
+        writer.writerow([format_cell(value) for value in row])
+        if index % FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def iter_lines(values):
+    """逐块生成每行一个值的纯文本"""
+    chunk = []
+    for value in values:
+        chunk.append(f'{value}\n')
+        if len(chunk) >= FLUSH_ROWS:
+            yield ''.join(chunk)
+            chunk = []
+    yield ''.join(chunk)
+
+
+def iter_xlsx(header, rows, sheet_title='Sheet1'):
+    """写入 xlsx 临时文件后分块输出（调用前用 xlsx_available() 检查依赖）"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append([format_cell(value) for value in row])
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(XLSX_READ_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def export_filename(prefix, extension):
+    """导出文件名：前缀_时间.扩展名"""
+    return f'{prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+
+
+def stream_download(generator, filename, mimetype):
+    """把生成器包装为下载响应（生成器在请求上下文中执行，可继续使用 db.session）"""
+    response = Response(stream_with_context(generator), mimetype=mimetype)
+    # filename* 支持中文文件名
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    response.headers['Cache-Control'] = 'no-store'
+    return response
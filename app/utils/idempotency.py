@@ -0,0 +1,225 @@
+# ============================================================
+# idempotency.py
+#
+# 异步任务提交的幂等与去重模块
+# 功能说明：
+# 1. TaskRegistry：在 Redis 中登记“正在处理”的任务（SET NX），
+#    同一 (用户, 素材) 在处理期间重复提交时返回已有的 task_id，不再创建新任务
+# 2. Idempotency-Key：客户端每次点击生成一个键，网络重试 / 重复发送同一请求时
+#    在 window 秒内返回同一个 task_id（任务完成后仍然有效）
+# 3. 任务 ID 在提交前生成（apply_async(task_id=...)），登记成功后再提交，避免竞态
+# 4. 任务每次开始执行（含重试）时调用 touch 续期登记，排队 / 调用耗时较长时登记不会中途过期
+# 5. Redis 不可用时退回进程内缓存（TTLCache，仅对当前进程去重）
+#
+# Redis 键：
+#   {name}:inflight:{scope}   正在处理的任务 ID（任务结束时删除，最长 window 秒）
+#   {name}:key:{scope}:{key}  Idempotency-Key 对应的任务 ID
+#
+# 使用示例：
+#   task_id, created = registry.claim(f'{user_id}:{material_id}', idempotency_key)
+#   if created:
+#       task.apply_async(args, task_id=task_id)
+#   ...任务开始时：registry.touch(f'{user_id}:{material_id}', task_id)
+#   ...任务结束时：registry.release(f'{user_id}:{material_id}', task_id)
+# ============================================================
+
+import math
+import uuid
+import threading
+
+from flask import current_app, has_app_context
+
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+from app.utils.redis_client import get_redis, RedisError
+
+logger = get_logger(__name__)
+
+# Idempotency-Key 的最大长度（超出视为无效，忽略）
+MAX_KEY_LENGTH = 128
+
+# 仅当值等于自己的任务 ID 时删除（任务结束后不误删新任务的登记）
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 登记不存在或属于自己时续期（已被新任务登记时不覆盖）
+_TOUCH_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current or current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# 登记默认保留秒数的余量（broker 积压、数据库写入等）
+DEFAULT_WINDOW_MARGIN = 120
+
+
+def default_window(config):
+    """默认去重窗口：最长排队时间 + 单次调用最长超时 + 余量"""
+    return int(config.get('LLM_QUEUE_MAX_WAIT', 60) + math.ceil(config.get('LLM_TIMEOUT_MAX', 30.0))
+               + DEFAULT_WINDOW_MARGIN)
+
+
+def normalize_key(key):
+    """校验客户端传入的 Idempotency-Key，无效时返回 None"""
+    key = (key or '').strip()
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        return None
+    return key
+
+
+class TaskRegistry:
+    """正在处理的任务登记表"""
+
+    def __init__(self, name, window=120, redis_client=None):
+        """
+        Args:
+            name: 键前缀
+            window: 登记的最长保留秒数（任务异常退出时也会自动过期）
+        """
+        self.name = name
+        self.window = window
+        self._redis = redis_client if redis_client is not None else get_redis()
+        self._release = self._redis.register_script(_RELEASE_SCRIPT) if self._redis is not None else None
+        self._touch = self._redis.register_script(_TOUCH_SCRIPT) if self._redis is not None else None
+        self._local = TTLCache(max_entries=10000)
+        self._lock = threading.Lock()
+
+    def _inflight_key(self, scope):
+        return f'{self.name}:inflight:{scope}'
+
+    def _idempotency_key(self, scope, key):
+        return f'{self.name}:key:{scope}:{key}'
+
+    def _keys(self, scope, idempotency_key):
+        # 幂等键在前：同一请求重发时优先返回它对应的任务
+        keys = [self._inflight_key(scope)]
+        if idempotency_key:
+            keys.insert(0, self._idempotency_key(scope, idempotency_key))
+        return keys
+
+    def lookup(self, scope, idempotency_key=None):
+        """返回已登记的任务 ID，没有时返回 None（不登记）"""
+        keys = self._keys(scope, idempotency_key)
+        if self._redis is not None:
+            try:
+                for key in keys:
+                    existing = self._redis.get(key)
+                    if existing:
+                        return existing
+                return None
+            except RedisError as e:
+                logger.warning(f'任务登记无法访问 Redis，改用进程内缓存: {e}')
+        for key in keys:
+            existing = self._local.get(key)
+            if existing:
+                return existing
+        return None
+
+    def claim(self, scope, idempotency_key=None):
+        """登记一个新任务，或返回已有的任务 ID
+
+        Args:
+            scope: 去重范围（如 "用户ID:素材ID"）
+            idempotency_key: 客户端传入的幂等键（已经过 normalize_key）
+
+        Returns:
+            tuple: (task_id, 是否为新任务)
+        """
+        task_id = uuid.uuid4().hex
+        keys = self._keys(scope, idempotency_key)
+
+        if self._redis is not None:
+            try:
+                return self._claim_redis(keys, task_id)
+            except RedisError as e:
+                logger.warning(f'任务登记无法访问 Redis，改用进程内缓存: {e}')
+        return self._claim_local(keys, task_id)
+
+    def _claim_redis(self, keys, task_id):
+        # 依次检查幂等键、正在处理的任务；都不存在时登记新任务
+        for key in keys:
+            existing = self._redis.get(key)
+            if existing:
+                return existing, False
+        inflight_key = keys[-1]
+        if not self._redis.set(inflight_key, task_id, nx=True, ex=self.window):
+            # 并发请求抢先登记
+            existing = self._redis.get(inflight_key)
+            if existing:
+                return existing, False
+            self._redis.set(inflight_key, task_id, ex=self.window)
+        if len(keys) > 1:
+            self._redis.set(keys[0], task_id, ex=self.window)
+        return task_id, True
+
+    def _claim_local(self, keys, task_id):
+        with self._lock:
+            for key in keys:
+                existing = self._local.get(key)
+                if existing:
+                    return existing, False
+            for key in keys:
+                self._local.set(key, task_id, self.window)
+            return task_id, True
+
+    def touch(self, scope, task_id):
+        """续期正在处理的登记（任务开始执行时调用）
+
+        Returns:
+            bool: 是否续期成功；False 表示登记已过期并被新提交的任务占用
+        """
+        key = self._inflight_key(scope)
+        if self._touch is not None:
+            try:
+                return bool(self._touch(keys=[key], args=[task_id, self.window]))
+            except RedisError as e:
+                logger.warning(f'任务登记无法访问 Redis，改用进程内缓存: {e}')
+        with self._lock:
+            current = self._local.get(key)
+            if current and current != task_id:
+                return False
+            self._local.set(key, task_id, self.window)
+            return True
+
+    def release(self, scope, task_id, idempotency_key=None):
+        """删除任务的登记
+
+        任务结束时只删除正在处理的登记（幂等键保留到过期，重复请求仍返回同一任务）；
+        任务提交失败时传入 idempotency_key 一并删除，客户端可用同一个键重试
+        """
+        keys = self._keys(scope, idempotency_key)
+        if self._release is not None:
+            try:
+                for key in keys:
+                    self._release(keys=[key], args=[task_id])
+                return
+            except RedisError as e:
+                logger.warning(f'任务登记无法访问 Redis，改用进程内缓存: {e}')
+        with self._lock:
+            for key in keys:
+                if self._local.get(key) == task_id:
+                    self._local.delete(key)
+
+
+_remix_registry = None
+
+
+def remix_registry():
+    """二创任务登记表（进程内单例）"""
+    global _remix_registry
+    if _remix_registry is None:
+        config = current_app.config if has_app_context() else {}
+        window = config.get('REMIX_DEDUP_SECONDS') or default_window(config)
+        _remix_registry = TaskRegistry('remix', window=window)
+    return _remix_registry
+
+
+def remix_scope(user_id, material_id):
+    return f'{user_id}:{material_id}'
@@ -0,0 +1,64 @@
+# ============================================================
+# json_provider.py
+#
+# JSON 序列化快速通道
+# 功能说明：
+# 1. FastJSONProvider：安装 orjson 时使用 orjson 序列化 jsonify 响应
+# 2. 未安装 orjson 或调用方传入自定义参数时，回退到 Flask 默认实现
+# 3. 日期、Decimal 等类型仍交给 Flask 默认的 default 处理，输出格式不变
+#
+# 配置项：
+#   JSON_FAST_PROVIDER  是否启用快速通道（默认启用）
+# ============================================================
+
+from flask.json.provider import DefaultJSONProvider
+from app.utils.logger import get_logger
+
+# orjson 为可选依赖
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = get_logger(__name__)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """基于 orjson 的 JSON Provider"""
+
+    def _orjson_option(self):
+        # 日期交给 Flask 默认 default 处理（HTTP 日期格式），与标准库输出保持一致
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # 调试模式需要缩进输出，交给默认实现
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        data = orjson.dumps(obj, default=self.default, option=self._orjson_option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """为应用启用 JSON 快速通道"""
+    app.config.setdefault('JSON_FAST_PROVIDER', True)
+
+    if not app.config['JSON_FAST_PROVIDER']:
+        return
+
+    app.json = FastJSONProvider(app)
+    logger.info(f'JSON Provider: {"orjson" if orjson is not None else "标准库 json（未安装 orjson）"}')
@@ -0,0 +1,836 @@
+# ============================================================
+# material_import.py
+#
+# 素材批量导入模块
+# 功能说明：
+# 1. 分块上传会话：每个会话一个目录，文件按相对路径分块追加写入
+#    - 客户端带 offset 上传，offset 与已接收字节数不一致时返回已接收字节数，从断点续传
+#    - zip 包和文件夹中的单个文件走同一套接口
+# 2. 会话锁与任务登记：meta.json 的修改都在会话锁（meta.lock）内进行
+#    - claim_task：登记导入任务，任务未结束时重复提交返回已有任务（不会并发导入同一会话）
+#    - 任务执行中定期刷新心跳（解压期间、每个目录处理完后），超过 IMPORT_TASK_STALE 秒
+#      没有心跳的登记视为失联（worker 被杀、结果过期后状态变回 PENDING），可以重新提交
+#    - 被新任务接管的旧任务在下次刷新心跳时停止，不覆盖新任务的登记
+# 3. collect_folders：解压 zip（防路径穿越、限制解压总大小），按目录分组
+#    - 每个包含图片的目录是一个素材，目录中的 文案.txt 为标题和文案
+# 4. import_session：线程池并行保存图片到存储，每个素材单独提交
+#    - 单个素材失败只回滚该素材（并删除已保存的图片），不影响其它素材
+#    - 已完成的目录记录在会话中，任务重试时跳过
+# 5. parse_copy_text：解析 文案.txt（title: "..." / content: "..."）
+# 6. import_directory：命令行离线导入（flask import-materials <目录>）
+#    - 进程池并行计算内容哈希、复制图片到存储
+#    - 素材和图片按批 executemany 插入，每批一个事务
+# 7. content_hash：图片文件名和内容 + 文案的 SHA-256，内容相同的目录只导入一次
+#
+# 会话目录结构：
+#   <MATERIAL_IMPORT_DIR>/<upload_id>/meta.json      会话信息、导入任务登记和心跳、已完成的目录
+#   <MATERIAL_IMPORT_DIR>/<upload_id>/meta.lock      会话锁（修改 meta.json 时短暂持有）
+#   <MATERIAL_IMPORT_DIR>/<upload_id>/files/...      上传的文件（保留相对路径）
+#   <MATERIAL_IMPORT_DIR>/<upload_id>/extracted/...  zip 解压结果
+# ============================================================
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import secrets
+import hashlib
+import zipfile
+import mimetypes
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from flask import current_app
+
+from app import db
+from app.models import Material, MaterialType, MaterialImage
+from app.utils.storage import get_storage, create_storage, generate_upload_key
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 允许上传的文件类型
+IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp'}
+IMPORT_EXTENSIONS = IMAGE_EXTENSIONS | {'txt', 'zip'}
+# 文案文件名
+COPY_FILENAME = '文案.txt'
+# 批量上传的素材分类
+IMPORT_CATEGORY = '副业'
+
+# 建议的分块大小（需小于 MAX_CONTENT_LENGTH）
+IMPORT_CHUNK_SIZE = 5 * 1024 * 1024
+# 单张图片 / 单个文案 / 单个 zip 的大小上限
+MAX_IMAGE_SIZE = 50 * 1024 * 1024
+MAX_TEXT_SIZE = 1024 * 1024
+MAX_ZIP_SIZE = 2 * 1024 * 1024 * 1024
+# 单个 zip 解压后的总大小上限（防止 zip 炸弹）
+MAX_EXTRACT_SIZE = 4 * 1024 * 1024 * 1024
+# 保存图片的线程数（存储写入是 I/O 密集型）
+IMPORT_WORKERS = 8
+# 未完成的会话保留时间（秒）
+IMPORT_SESSION_TTL = 24 * 60 * 60
+# 命令行导入：每批插入的素材数（每批一个事务）
+IMPORT_BATCH_SIZE = 500
+# 命令行导入：每次分派给子进程的目录数
+IMPORT_MAP_CHUNKSIZE = 8
+# 会话锁的最长等待时间（秒）；超过 IMPORT_LOCK_STALE 秒未释放的锁视为进程异常退出遗留
+IMPORT_LOCK_TIMEOUT = 10
+IMPORT_LOCK_STALE = 30
+# 导入任务超过该时间（秒）没有刷新心跳视为失联；解压期间至少每 IMPORT_HEARTBEAT_INTERVAL 秒刷新一次
+IMPORT_TASK_STALE = 10 * 60
+IMPORT_HEARTBEAT_INTERVAL = 30
+# 计算哈希时每次读取的字节数
+HASH_READ_SIZE = 1024 * 1024
+# 素材标题的最大长度（与 Material.title 一致）
+MAX_TITLE_LENGTH = 200
+
+_UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+_TITLE_RE = re.compile(r'title\s*[：:]\s*"(.*?)"', re.DOTALL | re.IGNORECASE)
+_CONTENT_RE = re.compile(r'content\s*[：:]\s*"(.*?)"', re.DOTALL | re.IGNORECASE)
+# zip 标志位：文件名为 UTF-8 编码
+_ZIP_UTF8_FLAG = 0x800
+
+
+class MaterialImportError(ValueError):
+    """导入会话的参数错误（返回给客户端的提示）"""
+
+
+class DuplicateFolder(MaterialImportError):
+    """目录内容与已导入的素材相同"""
+
+    def __init__(self, material_id):
+        super().__init__(f'内容相同的素材已导入（素材ID {material_id}）')
+        self.material_id = material_id
+
+
+class TaskSuperseded(MaterialImportError):
+    """会话已被新提交的任务接管（本任务的心跳超时，被判定为失联）"""
+
+    def __init__(self):
+        super().__init__('导入任务已被新提交的任务接管')
+
+
+class OffsetMismatch(MaterialImportError):
+    """分块的 offset 与已接收字节数不一致，客户端应从 received 处续传"""
+
+    def __init__(self, received):
+        super().__init__(f'offset 不匹配，已接收 {received} 字节')
+        self.received = received
+
+
+def parse_copy_text(text):
+    """解析文案文本，返回 (title, content)，缺失的部分为空字符串"""
+    title_match = _TITLE_RE.search(text)
+    content_match = _CONTENT_RE.search(text)
+    return (title_match.group(1) if title_match else '',
+            content_match.group(1) if content_match else '')
+
+
+def read_copy_file(path):
+    """读取并解析 文案.txt（兼容 UTF-8 BOM 和 GBK 编码）"""
+    with open(path, 'rb') as f:
+        raw = f.read(MAX_TEXT_SIZE)
+    for encoding in ('utf-8-sig', 'gbk'):
+        try:
+            return parse_copy_text(raw.decode(encoding))
+        except UnicodeDecodeError:
+            continue
+    logger.warning(f'文案文件编码无法识别: {path}')
+    return '', ''
+
+
+def get_import_category(name=IMPORT_CATEGORY):
+    """获取或创建批量上传使用的素材分类，返回分类ID"""
+    material_type = MaterialType.query.filter_by(name=name).first()
+    if not material_type:
+        material_type = MaterialType(name=name, description='批量上传的素材分类')
+        db.session.add(material_type)
+        db.session.commit()
+    return material_type.id
+
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+
+
+def safe_relative_path(path, extensions=IMPORT_EXTENSIONS):
+    """校验客户端提交的相对路径，返回规范化的路径（/ 分隔）"""
+    parts = [part for part in (path or '').replace('\\', '/').split('/') if part]
+    if not parts:
+        raise MaterialImportError('文件路径不能为空')
+    for part in parts:
+        if part in ('.', '..') or part.startswith('.') or '\x00' in part:
+            raise MaterialImportError(f'非法的文件路径: {path}')
+    if _extension(parts[-1]) not in extensions:
+        raise MaterialImportError(f'不支持的文件格式: {parts[-1]}')
+    return '/'.join(parts)
+
+
+def _size_limit(path):
+    extension = _extension(path)
+    if extension == 'zip':
+        return MAX_ZIP_SIZE
+    if extension == 'txt':
+        return MAX_TEXT_SIZE
+    return MAX_IMAGE_SIZE
+
+
+# ============================================================
+# 上传会话
+# ============================================================
+
+def get_import_root():
+    return current_app.config.get('MATERIAL_IMPORT_DIR') or os.path.join(current_app.instance_path, 'imports')
+
+
+def session_dir(upload_id):
+    if not upload_id or not _UPLOAD_ID_RE.match(upload_id):
+        raise MaterialImportError('无效的上传会话')
+    return os.path.join(get_import_root(), upload_id)
+
+
+def load_meta(upload_id):
+    """读取会话信息，会话不存在时返回 None"""
+    try:
+        with open(os.path.join(session_dir(upload_id), 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_meta(upload_id, meta):
+    """原子写入会话信息（先写临时文件再替换）"""
+    path = os.path.join(session_dir(upload_id), 'meta.json')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def session_lock(upload_id):
+    """会话锁（O_EXCL 创建锁文件，多进程 / 多 worker 共享会话目录时有效）"""
+    path = os.path.join(session_dir(upload_id), 'meta.lock')
+    deadline = time.monotonic() + IMPORT_LOCK_TIMEOUT
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > IMPORT_LOCK_STALE:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= deadline:
+                raise MaterialImportError('上传会话正忙，请稍后重试')
+            time.sleep(0.05)
+        except FileNotFoundError:
+            raise MaterialImportError('上传会话不存在或已过期')
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _claim_alive(meta, is_running):
+    """已登记的任务是否仍然有效：心跳未超时，且任务状态未结束
+
+    worker 被杀后任务状态停在 STARTED，结果过期后又变回 PENDING（未知任务ID 也是 PENDING），
+    只看状态会永远认为任务在执行，所以先看心跳
+    """
+    if not meta.get('task_id'):
+        return False
+    if time.time() - meta.get('heartbeat', 0) > IMPORT_TASK_STALE:
+        return False
+    return is_running(meta['task_id'])
+
+
+def claim_task(upload_id, is_running):
+    """为会话登记导入任务
+
+    Args:
+        upload_id: 上传会话ID
+        is_running: is_running(task_id)，已登记的任务是否仍在排队或执行
+
+    Returns:
+        tuple: (task_id, 是否为新任务)；已有任务有效时返回该任务，调用方不应再提交
+    """
+    with session_lock(upload_id):
+        meta = load_meta(upload_id)
+        if meta is None:
+            raise MaterialImportError('上传会话不存在或已过期')
+        if _claim_alive(meta, is_running):
+            return meta['task_id'], False
+        if meta.get('task_id'):
+            logger.warning(f'导入任务已失联，重新登记: upload_id={upload_id}, task_id={meta["task_id"]}')
+        meta['task_id'] = uuid.uuid4().hex
+        meta['heartbeat'] = time.time()
+        save_meta(upload_id, meta)
+        return meta['task_id'], True
+
+
+def touch_task(upload_id, task_id=None, done=None):
+    """刷新任务心跳，同时记录刚完成的目录
+
+    Args:
+        upload_id: 上传会话ID
+        task_id: 当前任务ID；会话已登记其它任务时抛出 TaskSuperseded（None 不检查）
+        done: (目录key, 素材ID)，可选
+
+    Returns:
+        dict: 更新后的会话信息
+    """
+    with session_lock(upload_id):
+        meta = load_meta(upload_id)
+        if meta is None:
+            raise MaterialImportError('上传会话不存在或已过期')
+        if task_id and meta.get('task_id') != task_id:
+            raise TaskSuperseded()
+        meta['heartbeat'] = time.time()
+        if done:
+            meta['done'][done[0]] = done[1]
+        save_meta(upload_id, meta)
+        return meta
+
+
+def release_task(upload_id, task_id):
+    """任务结束（或提交失败）后清除登记，会话可以重新提交"""
+    try:
+        with session_lock(upload_id):
+            meta = load_meta(upload_id)
+            if meta is not None and meta.get('task_id') == task_id:
+                meta['task_id'] = None
+                save_meta(upload_id, meta)
+    except MaterialImportError:
+        # 会话已删除
+        pass
+
+
+def create_session(user_id):
+    """创建上传会话，返回会话信息"""
+    cleanup_expired()
+    upload_id = secrets.token_hex(16)
+    os.makedirs(os.path.join(session_dir(upload_id), 'files'))
+    meta = {
+        'upload_id': upload_id,
+        'user_id': user_id,
+        'created_at': time.time(),
+        'task_id': None,
+        'done': {}
+    }
+    save_meta(upload_id, meta)
+    return meta
+
+
+def received_files(upload_id):
+    """已接收的文件及字节数 {相对路径: 字节数}"""
+    root = os.path.join(session_dir(upload_id), 'files')
+    result = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            result[os.path.relpath(full_path, root).replace(os.sep, '/')] = os.path.getsize(full_path)
+    return result
+
+
+def append_chunk(upload_id, path, offset, stream):
+    """把一个分块追加到会话文件，返回追加后的字节数
+
+    Raises:
+        OffsetMismatch: offset 与已接收字节数不一致
+        MaterialImportError: 路径非法或文件超过大小限制
+    """
+    path = safe_relative_path(path)
+    target = os.path.join(session_dir(upload_id), 'files', *path.split('/'))
+    received = os.path.getsize(target) if os.path.exists(target) else 0
+    if offset != received:
+        raise OffsetMismatch(received)
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    limit = _size_limit(path)
+    with open(target, 'ab') as f:
+        while True:
+            data = stream.read(64 * 1024)
+            if not data:
+                break
+            received += len(data)
+            if received > limit:
+                # 超限时丢弃本块，已接收的部分保持不变
+                f.flush()
+                f.truncate(offset)
+                raise MaterialImportError(f'文件超过大小限制 ({limit // (1024 * 1024)}MB): {path}')
+            f.write(data)
+    # 刷新会话目录的修改时间，正在续传的会话不会被当作过期清理
+    os.utime(session_dir(upload_id))
+    return received
+
+
+def remove_session(upload_id):
+    shutil.rmtree(session_dir(upload_id), ignore_errors=True)
+
+
+def cleanup_expired(max_age=IMPORT_SESSION_TTL):
+    """删除超过保留时间的会话目录"""
+    root = get_import_root()
+    if not os.path.isdir(root):
+        return
+    expire_before = time.time() - max_age
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if _UPLOAD_ID_RE.match(name) and os.path.getmtime(path) < expire_before:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# ============================================================
+# 解压与分组
+# ============================================================
+
+def _zip_member_name(info):
+    """zip 内的文件名：未标记 UTF-8 的按 GBK 解码（Windows 中文系统打包的 zip）"""
+    if info.flag_bits & _ZIP_UTF8_FLAG:
+        return info.filename
+    try:
+        return info.filename.encode('cp437').decode('gbk')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def extract_zip(zip_path, dest, on_file=None):
+    """解压 zip 中的图片和文案到 dest（跳过其它文件），返回解压的文件数
+
+    on_file: 每解压一个文件后调用（刷新任务心跳）
+    """
+    shutil.rmtree(dest, ignore_errors=True)
+    extracted = 0
+    total_size = 0
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            name = _zip_member_name(info)
+            if name.startswith('__MACOSX/'):
+                continue
+            try:
+                relative = safe_relative_path(name, IMAGE_EXTENSIONS | {'txt'})
+            except MaterialImportError:
+                continue
+            if info.file_size > _size_limit(relative):
+                raise MaterialImportError(f'zip 内文件超过大小限制: {relative}')
+            total_size += info.file_size
+            if total_size > MAX_EXTRACT_SIZE:
+                raise MaterialImportError('zip 解压后超过大小限制')
+
+            target = os.path.join(dest, *relative.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with zf.open(info) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            extracted += 1
+            if on_file:
+                on_file()
+    return extracted
+
+
+def _group_directory(root, prefix, folders):
+    """把 root 下的文件按所在目录分组到 folders {目录key: 目录信息}"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        relative_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+        key = prefix if relative_dir == '.' else f'{prefix}/{relative_dir}'.lstrip('/')
+        for filename in filenames:
+            extension = _extension(filename)
+            if extension not in IMAGE_EXTENSIONS and filename != COPY_FILENAME:
+                continue
+            folder = folders.setdefault(key, {
+                'key': key,
+                'name': key.rsplit('/', 1)[-1] if key else '未命名素材',
+                'images': [],
+                'text_path': None
+            })
+            full_path = os.path.join(dirpath, filename)
+            if filename == COPY_FILENAME:
+                folder['text_path'] = full_path
+            else:
+                folder['images'].append(full_path)
+
+
+def collect_folders(upload_id, on_file=None):
+    """解压会话中的 zip，并按目录分组，返回目录信息列表（按 key 排序）
+
+    on_file: 传给 extract_zip，每解压一个文件后调用
+    """
+    base = session_dir(upload_id)
+    files_root = os.path.join(base, 'files')
+    extracted_root = os.path.join(base, 'extracted')
+
+    folders = {}
+    for relative in sorted(received_files(upload_id)):
+        if _extension(relative) == 'zip':
+            # zip 以去掉扩展名的路径作为目录前缀，与文件夹上传的 key 规则一致
+            prefix = relative[:-len('.zip')]
+            dest = os.path.join(extracted_root, *prefix.split('/'))
+            extract_zip(os.path.join(files_root, *relative.split('/')), dest, on_file)
+            _group_directory(dest, prefix, folders)
+    _group_directory(files_root, '', folders)
+    return _sorted_folders(folders)
+
+
+def scan_directory(root):
+    """按目录分组本地目录树（命令行导入），返回目录信息列表（按 key 排序）"""
+    folders = {}
+    _group_directory(root, '', folders)
+    return _sorted_folders(folders)
+
+
+def _sorted_folders(folders):
+    result = []
+    for key in sorted(folders):
+        folder = folders[key]
+        # 图片按文件名排序，第一张为封面
+        folder['images'].sort(key=os.path.basename)
+        result.append(folder)
+    return result
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def folder_content_hash(folder):
+    """目录内容哈希：每张图片的文件名和内容摘要（按排序）+ 文案内容"""
+    digest = hashlib.sha256()
+    for path in folder['images']:
+        digest.update(os.path.basename(path).encode('utf-8') + b'\0')
+        digest.update(_file_digest(path))
+    if folder['text_path']:
+        with open(folder['text_path'], 'rb') as f:
+            digest.update(b'text\0' + f.read(MAX_TEXT_SIZE))
+    return digest.hexdigest()
+
+
+def _oversized_images(folder):
+    return [os.path.basename(path) for path in folder['images'] if os.path.getsize(path) > MAX_IMAGE_SIZE]
+
+
+def _material_title(title, folder):
+    return (title or folder['name'])[:MAX_TITLE_LENGTH]
+
+
+# ============================================================
+# 导入
+# ============================================================
+
+def _save_file(storage, path):
+    """保存单张图片到存储，返回访问地址"""
+    key = generate_upload_key(f'{secrets.token_hex(6)}.{_extension(path)}')
+    content_type = mimetypes.guess_type(path)[0]
+    with open(path, 'rb') as f:
+        return storage.save(f, key, content_type=content_type)
+
+
+def _delete_urls(storage, urls):
+    for url in urls:
+        storage.delete_url(url)
+
+
+def _save_images(storage, paths, pool):
+    """并行保存一个目录的图片，返回与 paths 顺序一致的地址；任意一张失败则删除已保存的并抛出"""
+    futures = [pool.submit(_save_file, storage, path) for path in paths]
+    urls = []
+    error = None
+    for path, future in zip(paths, futures):
+        try:
+            urls.append(future.result())
+        except Exception as e:
+            error = error or f'{os.path.basename(path)}: {e}'
+    if error:
+        _delete_urls(storage, urls)
+        raise RuntimeError(f'保存图片失败 {error}')
+    return urls
+
+
+def import_folder(folder, material_type_id, storage, pool):
+    """导入一个目录为素材并提交，返回素材ID
+
+    Raises:
+        DuplicateFolder: 内容相同的素材已导入
+    """
+    oversized = _oversized_images(folder)
+    if oversized:
+        raise MaterialImportError(f'图片超过大小限制: {", ".join(oversized)}')
+
+    content_hash = folder_content_hash(folder)
+    existing_id = db.session.execute(
+        db.select(Material.id).where(Material.content_hash == content_hash)
+    ).scalar()
+    if existing_id:
+        raise DuplicateFolder(existing_id)
+
+    title, content = read_copy_file(folder['text_path']) if folder['text_path'] else ('', '')
+    urls = _save_images(storage, folder['images'], pool)
+
+    try:
+        material = Material(
+            title=_material_title(title, folder),
+            description=content,
+            material_type_id=material_type_id,
+            is_published=True,
+            content_hash=content_hash
+        )
+        db.session.add(material)
+        db.session.flush()
+        db.session.add_all([
+            MaterialImage(material_id=material.id, image_url=url, is_cover=(idx == 0), sort_order=idx)
+            for idx, url in enumerate(urls)
+        ])
+        db.session.commit()
+        return material.id
+    except Exception:
+        db.session.rollback()
+        _delete_urls(storage, urls)
+        raise
+
+
+def import_session(upload_id, progress=None, workers=IMPORT_WORKERS, task_id=None):
+    """导入会话中的所有目录
+
+    Args:
+        upload_id: 上传会话ID
+        progress: 进度回调 progress(current, total, folders)，每个目录处理完后调用
+        workers: 保存图片的线程数
+        task_id: 当前任务ID；开始时、解压期间和每个目录处理完后刷新心跳，
+            会话已被新任务接管时抛出 TaskSuperseded
+
+    Returns:
+        dict: total / created / failed / skipped 数量和每个目录的结果
+    """
+    meta = touch_task(upload_id, task_id)
+    last_touch = time.monotonic()
+
+    def on_file():
+        nonlocal last_touch
+        if time.monotonic() - last_touch >= IMPORT_HEARTBEAT_INTERVAL:
+            touch_task(upload_id, task_id)
+            last_touch = time.monotonic()
+
+    folders = collect_folders(upload_id, on_file)
+    results = [{
+        'key': folder['key'],
+        'name': folder['name'],
+        'images': len(folder['images']),
+        'status': 'pending',
+        'message': ''
+    } for folder in folders]
+
+    material_type_id = get_import_category()
+    storage = get_storage()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for index, (folder, result) in enumerate(zip(folders, results), 1):
+            done = None
+            if folder['key'] in meta['done']:
+                # 上次执行已经导入（任务重试）
+                result['status'] = 'done'
+                result['material_id'] = meta['done'][folder['key']]
+            elif not folder['images']:
+                result['status'] = 'skipped'
+                result['message'] = '没有找到图片文件'
+            else:
+                try:
+                    material_id = import_folder(folder, material_type_id, storage, pool)
+                    result['status'] = 'done'
+                    result['material_id'] = material_id
+                    done = (folder['key'], material_id)
+                except DuplicateFolder as e:
+                    result['status'] = 'skipped'
+                    result['message'] = str(e)
+                except Exception as e:
+                    logger.error(f'导入素材失败 {folder["key"]}: {str(e)}')
+                    result['status'] = 'failed'
+                    result['message'] = str(e)
+
+            # 合并写入磁盘上的会话信息（不用开始时读到的副本覆盖）
+            touch_task(upload_id, task_id, done)
+            if progress:
+                progress(index, len(folders), results)
+
+    summary = {
+        'total': len(results),
+        'created': sum(1 for result in results if result['status'] == 'done'),
+        'failed': sum(1 for result in results if result['status'] == 'failed'),
+        'skipped': sum(1 for result in results if result['status'] == 'skipped'),
+        'folders': results
+    }
+    logger.info(f'批量导入完成: upload_id={upload_id}, 成功 {summary["created"]}, '
+                f'失败 {summary["failed"]}, 跳过 {summary["skipped"]}')
+    return summary
+
+
+# ============================================================
+# 命令行导入（flask import-materials）
+# ============================================================
+
+# 子进程中的存储驱动和已导入的内容哈希（由进程池 initializer 设置）
+_worker_storage = None
+_worker_existing = frozenset()
+
+
+def _init_worker(storage_config, root_path, existing_hashes):
+    global _worker_storage, _worker_existing
+    _worker_storage = create_storage(storage_config, root_path)
+    _worker_existing = existing_hashes
+
+
+def _prepare_folder(folder):
+    """子进程：计算内容哈希、解析文案、复制图片到存储（不访问数据库）
+
+    status: ready 待插入 / exists 已导入 / empty 没有图片 / failed 失败
+    """
+    result = {'key': folder['key'], 'status': 'failed', 'message': '', 'urls': []}
+    try:
+        if not folder['images']:
+            result['status'] = 'empty'
+            return result
+        oversized = _oversized_images(folder)
+        if oversized:
+            result['message'] = f'图片超过大小限制: {", ".join(oversized)}'
+            return result
+
+        content_hash = folder_content_hash(folder)
+        if content_hash in _worker_existing:
+            result['status'] = 'exists'
+            return result
+
+        title, content = read_copy_file(folder['text_path']) if folder['text_path'] else ('', '')
+        urls = result['urls']
+        try:
+            for path in folder['images']:
+                urls.append(_save_file(_worker_storage, path))
+        except Exception:
+            _delete_urls(_worker_storage, urls)
+            raise
+
+        result.update(status='ready', content_hash=content_hash,
+                      title=_material_title(title, folder), description=content)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['message'] = str(e)
+        result['urls'] = []
+    return result
+
+
+def _insert_batch(batch, material_type_id):
+    """一个事务插入一批素材及其图片，返回插入的图片数"""
+    now = datetime.utcnow()
+    db.session.execute(Material.__table__.insert(), [{
+        'title': item['title'],
+        'description': item['description'],
+        'material_type_id': material_type_id,
+        'is_published': True,
+        'content_hash': item['content_hash'],
+        'created_at': now,
+        'updated_at': now
+    } for item in batch])
+
+    # content_hash 唯一，用它取回新素材的ID（不依赖 RETURNING，兼容 MySQL）
+    ids = dict(db.session.execute(
+        db.select(Material.content_hash, Material.id)
+        .where(Material.content_hash.in_([item['content_hash'] for item in batch]))
+    ).all())
+
+    image_rows = [{
+        'material_id': ids[item['content_hash']],
+        'image_url': url,
+        'is_cover': idx == 0,
+        'sort_order': idx,
+        'created_at': now
+    } for item in batch for idx, url in enumerate(item['urls'])]
+    db.session.execute(MaterialImage.__table__.insert(), image_rows)
+    db.session.commit()
+    return len(image_rows)
+
+
+def import_directory(root, workers=None, batch_size=IMPORT_BATCH_SIZE, category=IMPORT_CATEGORY, echo=None):
+    """离线导入本地素材库目录
+
+    Args:
+        root: 素材库根目录（每个包含图片的子目录是一个素材）
+        workers: 子进程数，默认为 CPU 核数
+        batch_size: 每批插入的素材数
+        category: 素材分类名称（不存在时创建）
+        echo: 进度输出函数（如 click.echo），为 None 时写日志
+
+    Returns:
+        dict: total / created / exists / empty / failed / images / seconds
+    """
+    echo = echo or logger.info
+    started = time.monotonic()
+
+    folders = scan_directory(root)
+    echo(f'扫描到 {len(folders)} 个目录')
+
+    existing = frozenset(db.session.execute(
+        db.select(Material.content_hash).where(Material.content_hash.isnot(None))
+    ).scalars())
+    material_type_id = get_import_category(category)
+    storage = get_storage()
+    storage_config = {key: value for key, value in current_app.config.items()
+                      if key.startswith(('STORAGE_', 'S3_'))}
+
+    summary = {'total': len(folders), 'created': 0, 'exists': 0, 'empty': 0, 'failed': 0, 'images': 0}
+    seen = set()
+    batch = []
+
+    def flush():
+        try:
+            summary['images'] += _insert_batch(batch, material_type_id)
+            summary['created'] += len(batch)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'批量插入素材失败: {str(e)}', exc_info=True)
+            echo(f'本批 {len(batch)} 个素材插入失败: {e}')
+            for item in batch:
+                _delete_urls(storage, item['urls'])
+            summary['failed'] += len(batch)
+        batch.clear()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(storage_config, current_app.root_path, existing)) as pool:
+        for index, result in enumerate(pool.map(_prepare_folder, folders, chunksize=IMPORT_MAP_CHUNKSIZE), 1):
+            status = result['status']
+            if status == 'ready' and result['content_hash'] in seen:
+                # 本次导入中内容相同的目录，只保留第一个
+                _delete_urls(storage, result['urls'])
+                status = 'exists'
+
+            if status == 'ready':
+                seen.add(result['content_hash'])
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    flush()
+            else:
+                summary[status] += 1
+                if status == 'failed':
+                    echo(f'导入失败 {result["key"]}: {result["message"]}')
+
+            if index % batch_size == 0:
+                echo(f'已处理 {index} / {len(folders)}')
+
+        if batch:
+            flush()
+
+    summary['seconds'] = round(time.monotonic() - started, 1)
+    logger.info(f'目录导入完成: {root}, {summary}')
+    return summary
@@ -4,7 +4,12 @@
 # 素材二创工具模块
 # 功能说明：
 # 1. optimize_copywriting: 调用DeepSeek API优化文案
-# 2. get_unique_css_recipes: 获取不重复的CSS样式配方
+#    - 调用前用本地改写引擎预处理（替换敏感词、去重、截断），缩短输入
+#    - 调用失败或未配置 API Key 时返回本地改写结果（见 copy_rewriter.py）
+#    - 熔断器保护（见 circuit_breaker.py）：接口持续出错时所有进程直接走本地改写，
+#      单次调用超时按最近耗时的 p95 自适应
+#    - 全局并发信号量限制同时进行的调用数，排队时回调排队位置（见 admission.py）
+# 2. get_unique_css_recipes: 获取不重复的CSS样式配方（见 recipe_engine.py）
 # ============================================================
 
 # DeepSeek文案优化接口
@@ -12,37 +17,51 @@ import os
 import openai
 import random
 import string
-import re
+from flask import current_app, has_app_context
 from app.utils.logger import get_logger
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.admission import llm_semaphore
+# 文案清洗与敏感词扫描（正则预编译，见 text_normalize.py）
+from app.utils.text_normalize import sanitize_copy, banned_word_scanner
+# 本地文案改写（预处理 / 兜底）
+from app.utils.copy_rewriter import rewrite_copy, replace_sensitive, prepare_llm_input
+# CSS 配方引擎（保留从本模块导入的旧接口）
+from app.utils.recipe_engine import CSS_RECIPES, get_random_css_recipe, get_unique_css_recipes, recipe_seed
 
 logger = get_logger(__name__)
 
+_llm_breaker = None
+
+
+def get_llm_breaker():
+    """DeepSeek 接口的熔断器（进程内单例，状态在 Redis 中共享）"""
+    global _llm_breaker
+    if _llm_breaker is None:
+        config = current_app.config if has_app_context() else {}
+        _llm_breaker = CircuitBreaker(
+            'deepseek',
+            failure_rate=config.get('LLM_BREAKER_FAILURE_RATE', 0.5),
+            cooldown=config.get('LLM_BREAKER_COOLDOWN', 30),
+            min_timeout=config.get('LLM_TIMEOUT_MIN', 5.0),
+            max_timeout=config.get('LLM_TIMEOUT_MAX', 30.0)
+        )
+    return _llm_breaker
+
 
 def generate_random_string(length=8):
     """生成随机字符串"""
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
 
 
-def sanitize_copy(text):
-    """清洗文案中的代码式表情等噪声"""
-    if not text:
-        return text
-    
-    # 移除形如 [哈哈] / [火] / [doge] / [OK] 等“代码式表情包”
-    text = re.sub(r'\[(?:[A-Za-z0-9_\u4e00-\u9fff]{1,8})\]', '', text)
+def optimize_copywriting(original_text, title=None, seed=None, on_queue=None):
+    """优化文案 - 使用DeepSeek API
     
-    # 移除形如 :smile: :ok_hand: 等冒号包裹的表情关键词
-    text = re.sub(r':[A-Za-z0-9_+\-]{1,30}:', '', text, flags=re.IGNORECASE)
-    
-    # 规范多余空白与标点前空格
-    text = re.sub(r'\s+([，。；；、,.!！?？])', r'\1', text)
-    text = re.sub(r'[ \t]{2,}', ' ', text)
-    
-    return text.strip()
-
-
-def optimize_copywriting(original_text):
-    """优化文案 - 使用DeepSeek API"""
+    Args:
+        original_text: 原文案
+        title: 素材标题（本地改写兜底时使用）
+        seed: 本地改写的随机种子
+        on_queue: 等待全局并发名额时的回调 on_queue(排队位置)
+    """
     
     if not original_text or not original_text.strip():
         return original_text
@@ -52,8 +71,8 @@ def optimize_copywriting(original_text):
     api_base = os.environ.get("DEEPSEEK_API_BASE") or "https://api.deepseek.com"
     
     if not api_key:
-        logger.warning("未配置DeepSeek API Key，返回原文案")
-        return original_text
+        logger.warning("未配置DeepSeek API Key，使用本地改写")
+        return rewrite_copy(original_text, title=title, seed=seed)
     
     # 设置API
     openai.api_key = api_key
@@ -76,108 +95,65 @@ def optimize_copywriting(original_text):
 # Output
 直接输出二创后的纯文案内容，不要任何解释。"""
 
+    # 全局并发名额（DeepSeek 配额全局共享），排队超时走本地改写
+    with llm_semaphore().slot(on_wait=on_queue) as admitted:
+        if not admitted:
+            logger.warning("AI调用排队超时，使用本地改写")
+            return rewrite_copy(original_text, title=title, seed=seed)
+        return _generate_copy(system_prompt, original_text, title, seed)
+
+
+def _generate_copy(system_prompt, original_text, title, seed):
+    """经熔断器调用接口并处理结果，失败时返回本地改写"""
+    breaker = get_llm_breaker()
     try:
-        # 使用旧版API调用方式
-        response = openai.ChatCompletion.create(
-            model="deepseek-chat",
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": f"请对这段文案进行二创，确保合规且吸引人：\n\n{original_text}"
-                }
-            ],
-            temperature=0.8,  # 略微提高温度，增加二创的随机性和原创度
-            top_p=0.9,
-            max_tokens=1000,
-            stream=False,
-            timeout=30  # 添加30秒超时，防止API响应慢导致请求堆积
-        )
+        with breaker.guard() as call:
+            response = _request_completion(system_prompt, original_text, call.timeout)
 
         # 提取回复内容
         if response and 'choices' in response and len(response['choices']) > 0:
-            generated = response.choices[0].message.content.strip()
-            return sanitize_copy(generated)
+            generated = sanitize_copy(response.choices[0].message.content.strip())
+            hits = banned_word_scanner.find(generated)
+            if hits:
+                # AI 没有完全遵守规则时按词典替换
+                logger.warning(f"AI文案仍包含敏感词，已本地替换: {sorted({word for _, word in hits})}")
+                generated = replace_sensitive(generated)
+            return generated
         else:
-            logger.warning("API返回格式异常，返回原文案")
-            return sanitize_copy(original_text)
+            logger.warning("API返回格式异常，使用本地改写")
+            return rewrite_copy(original_text, title=title, seed=seed)
 
+    except CircuitOpenError as e:
+        # 熔断期间不等待接口超时，直接返回本地改写
+        logger.info(f"{e}，使用本地改写")
+        return rewrite_copy(original_text, title=title, seed=seed)
     except Exception as e:
         logger.error(f"DeepSeek API调用失败: {str(e)}", exc_info=True)
-        # 返回原文案作为备用
-        return sanitize_copy(original_text)
-
-
-# CSS混合配方库
-CSS_RECIPES = [
-    {
-        "gradient": "linear-gradient(45deg, #ff9a9e, #fad0c4)",
-        "blend_mode": "multiply",
-        "contrast": 1.15,
-        "brightness": 1.0,
-        "saturation": 1.2,
-        "opacity": 0.25
-    },
-    {
-        "gradient": "linear-gradient(120deg, #a1c4fd, #c2e9fb)",
-        "blend_mode": "overlay",
-        "contrast": 1.1,
-        "brightness": 1.05,
-        "saturation": 1.15,
-        "opacity": 0.3
-    },
-    {
-        "gradient": "linear-gradient(to right, #43e97b, #38f9d7)",
-        "blend_mode": "soft-light",
-        "contrast": 1.2,
-        "brightness": 0.95,
-        "saturation": 1.3,
-        "opacity": 0.2
-    },
-    {
-        "gradient": "linear-gradient(135deg, #667eea, #764ba2)",
-        "blend_mode": "screen",
-        "contrast": 1.12,
-        "brightness": 1.02,
-        "saturation": 1.25,
-        "opacity": 0.28
-    },
-    {
-        "gradient": "linear-gradient(45deg, #fa709a, #fee140)",
-        "blend_mode": "color-dodge",
-        "contrast": 1.08,
-        "brightness": 1.1,
-        "saturation": 1.2,
-        "opacity": 0.22
-    }
-]
-
-
-def get_random_css_recipe(exclude_recipes=None):
-    """获取随机CSS混合配方，可排除已使用的配方"""
-    if exclude_recipes is None:
-        exclude_recipes = []
-    
-    available_recipes = [r for r in CSS_RECIPES if r not in exclude_recipes]
-    
-    if not available_recipes:
-        available_recipes = CSS_RECIPES
-    
-    return random.choice(available_recipes)
-
-
-def get_unique_css_recipes(count):
-    """获取指定数量的不重复CSS配方"""
-    selected_recipes = []
-    
-    for i in range(count):
-        recipe = get_random_css_recipe(selected_recipes)
-        selected_recipes.append(recipe)
-    
-    return selected_recipes
+        # 本地改写作为备用（替换敏感词 + 重排结构）
+        return rewrite_copy(original_text, title=title, seed=seed)
+
+
+def _request_completion(system_prompt, original_text, timeout):
+    """调用 DeepSeek 接口（timeout 为熔断器给出的自适应超时）"""
+    # 使用旧版API调用方式
+    return openai.ChatCompletion.create(
+        model="deepseek-chat",
+        messages=[
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": f"请对这段文案进行二创，确保合规且吸引人：\n\n{prepare_llm_input(original_text)}"
+            }
+        ],
+        temperature=0.8,  # 略微提高温度，增加二创的随机性和原创度
+        top_p=0.9,
+        max_tokens=1000,
+        stream=False,
+        request_timeout=timeout  # HTTP 请求超时，防止API响应慢导致请求堆积
+    )
 
 
 def generate_remix_html(image_url, recipe):
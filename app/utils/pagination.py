@@ -0,0 +1,56 @@
+# ============================================================
+# pagination.py
+#
+# 游标（keyset）分页工具
+# 功能说明：
+# 1. 按 (created_at, id) 倒序分页，翻页代价与页码无关（不使用 OFFSET）
+# 2. 游标编码为 "时间戳_ID" 字符串，前端原样回传
+# 3. 多查询一条判断是否还有下一页，避免额外的 COUNT
+#
+# 使用示例：
+#   query = apply_keyset(query, UserMaterial.created_at, UserMaterial.id, request.args.get('cursor'))
+#   rows, next_cursor = fetch_page(query, limit, lambda row: (row.created_at, row.id))
+# ============================================================
+
+from datetime import datetime
+from sqlalchemy import or_, and_
+
+# 游标中时间的格式（精确到微秒，保证同一秒内的记录也能区分）
+CURSOR_TIME_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+def encode_cursor(created_at, record_id):
+    """把 (created_at, id) 编码为游标字符串"""
+    return f'{created_at.strftime(CURSOR_TIME_FORMAT)}_{record_id}'
+
+
+def decode_cursor(cursor):
+    """解析游标字符串，无效游标返回 None"""
+    if not cursor:
+        return None
+    try:
+        time_part, id_part = cursor.split('_', 1)
+        return datetime.strptime(time_part, CURSOR_TIME_FORMAT), int(id_part)
+    except (ValueError, AttributeError):
+        return None
+
+
+def apply_keyset(query, time_column, id_column, cursor):
+    """按 (time_column, id_column) 倒序排序，并从游标之后开始"""
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, record_id = position
+        query = query.filter(or_(
+            time_column < created_at,
+            and_(time_column == created_at, id_column < record_id)
+        ))
+    return query.order_by(time_column.desc(), id_column.desc())
+
+
+def fetch_page(query, limit, key_func):
+    """取一页数据，返回 (记录列表, 下一页游标或 None)"""
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key_func(rows[-1]))
@@ -0,0 +1,282 @@
+# ============================================================
+# recipe_engine.py
+#
+# CSS 混合配方引擎
+# 功能说明：
+# 1. CSS_RECIPES：人工调好的预设配方，优先使用
+# 2. 参数化配方空间：渐变（线性角度 / 径向圆心）、两种颜色、混合模式、
+#    对比度 / 亮度 / 饱和度 / 不透明度按固定步长离散，每个编号解码为唯一的配方
+# 3. RecipeEngine：预设配方打乱一次后依次取出，之后在参数化空间中
+#    按 (起点 + k × 步长) mod 空间大小 取编号（步长与空间大小互质），
+#    每取一个配方 O(1)，整个空间取完前不会重复
+# 4. recipe_seed：按 用户 + 素材 生成种子，同一用户二创同一素材得到相同的配方
+# 5. 配方 ID（版本化的代码内配方表，数据库只存一个整数）：
+#    - ID = 版本号 << 40 | 版本内编号；预设配方编号 0 ~ 4，参数化配方编号 = 5 + 空间编号
+#    - recipe_by_id / recipe_to_id 互相转换，recipe_css 返回预先拼好的 CSS（按 ID 缓存）
+#    - 修改预设或参数取值会改变编号含义，必须新增版本（旧版本的解码保留）
+#
+# 配方格式（前端直接使用）：
+#   {"gradient", "blend_mode", "contrast", "brightness", "saturation", "opacity"}
+#
+# 使用示例：
+#   recipes = get_unique_css_recipes(30, seed=recipe_seed(user_id, material_id))
+#   recipe_ids = RecipeEngine(seed).take_ids(30)
+#   style = recipe_css(recipe_ids[0])   # {"filter": "...", "overlay": "..."}
+# ============================================================
+
+import math
+import random
+import hashlib
+import colorsys
+from functools import lru_cache
+
+# CSS混合配方库
+CSS_RECIPES = [
+    {
+        "gradient": "linear-gradient(45deg, #ff9a9e, #fad0c4)",
+        "blend_mode": "multiply",
+        "contrast": 1.15,
+        "brightness": 1.0,
+        "saturation": 1.2,
+        "opacity": 0.25
+    },
+    {
+        "gradient": "linear-gradient(120deg, #a1c4fd, #c2e9fb)",
+        "blend_mode": "overlay",
+        "contrast": 1.1,
+        "brightness": 1.05,
+        "saturation": 1.15,
+        "opacity": 0.3
+    },
+    {
+        "gradient": "linear-gradient(to right, #43e97b, #38f9d7)",
+        "blend_mode": "soft-light",
+        "contrast": 1.2,
+        "brightness": 0.95,
+        "saturation": 1.3,
+        "opacity": 0.2
+    },
+    {
+        "gradient": "linear-gradient(135deg, #667eea, #764ba2)",
+        "blend_mode": "screen",
+        "contrast": 1.12,
+        "brightness": 1.02,
+        "saturation": 1.25,
+        "opacity": 0.28
+    },
+    {
+        "gradient": "linear-gradient(45deg, #fa709a, #fee140)",
+        "blend_mode": "color-dodge",
+        "contrast": 1.08,
+        "brightness": 1.1,
+        "saturation": 1.2,
+        "opacity": 0.22
+    }
+]
+
+# 参数化配方的取值范围（范围与预设配方一致，保证效果自然）
+LINEAR_ANGLES = list(range(0, 360, 15))
+RADIAL_CENTERS = [f'{x}% {y}%' for x in (0, 50, 100) for y in (0, 50, 100)]
+GRADIENT_SHAPES = [f'linear-gradient({angle}deg' for angle in LINEAR_ANGLES] + \
+                  [f'radial-gradient(circle at {center}' for center in RADIAL_CENTERS]
+# 色相步长 10°，第二种颜色与第一种错开 20° ~ 180°
+HUE_STEPS = 36
+HUE_OFFSETS = list(range(2, 19))
+# 颜色的 HSL 亮度（偏浅的粉彩色，叠加后不压暗图片）
+COLOR_LIGHTNESS = (0.72, 0.8, 0.86)
+COLOR_SATURATION = 0.85
+BLEND_MODES = ['multiply', 'overlay', 'soft-light', 'screen', 'color-dodge', 'hard-light', 'lighten']
+CONTRASTS = [round(1.05 + i * 0.01, 2) for i in range(16)]     # 1.05 ~ 1.20
+BRIGHTNESSES = [round(0.95 + i * 0.01, 2) for i in range(16)]  # 0.95 ~ 1.10
+SATURATIONS = [round(1.10 + i * 0.01, 2) for i in range(21)]   # 1.10 ~ 1.30
+OPACITIES = [round(0.18 + i * 0.01, 2) for i in range(13)]     # 0.18 ~ 0.30
+
+# 混合进制解码的各位基数（顺序即解码顺序）
+_RADICES = (
+    len(GRADIENT_SHAPES), HUE_STEPS, len(HUE_OFFSETS), len(COLOR_LIGHTNESS), len(BLEND_MODES),
+    len(CONTRASTS), len(BRIGHTNESSES), len(SATURATIONS), len(OPACITIES)
+)
+# 参数化配方空间的大小
+RECIPE_SPACE_SIZE = math.prod(_RADICES)
+
+_PRESET_GRADIENTS = frozenset(recipe['gradient'] for recipe in CSS_RECIPES)
+
+# 配方 ID 的版本与版本内编号位数
+RECIPE_REGISTRY_VERSION = 1
+RECIPE_ID_BITS = 40
+_LOCAL_MASK = (1 << RECIPE_ID_BITS) - 1
+
+_RECIPE_FIELDS = ('gradient', 'blend_mode', 'contrast', 'brightness', 'saturation', 'opacity')
+
+
+def _hsl_hex(hue_step, lightness):
+    r, g, b = colorsys.hls_to_rgb(hue_step / HUE_STEPS, lightness, COLOR_SATURATION)
+    return '#{:02x}{:02x}{:02x}'.format(round(r * 255), round(g * 255), round(b * 255))
+
+
+def recipe_from_index(index):
+    """把 [0, RECIPE_SPACE_SIZE) 内的编号解码为配方，不同编号得到不同配方"""
+    digits = []
+    for radix in _RADICES:
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+    shape, hue, hue_offset, lightness, blend, contrast, brightness, saturation, opacity = digits
+
+    color_from = _hsl_hex(hue, COLOR_LIGHTNESS[lightness])
+    color_to = _hsl_hex((hue + HUE_OFFSETS[hue_offset]) % HUE_STEPS, COLOR_LIGHTNESS[lightness])
+    return {
+        "gradient": f'{GRADIENT_SHAPES[shape]}, {color_from}, {color_to})',
+        "blend_mode": BLEND_MODES[blend],
+        "contrast": CONTRASTS[contrast],
+        "brightness": BRIGHTNESSES[brightness],
+        "saturation": SATURATIONS[saturation],
+        "opacity": OPACITIES[opacity]
+    }
+
+
+def _recipe_key(recipe):
+    return tuple(recipe.get(field) for field in _RECIPE_FIELDS)
+
+
+def _local_id(local):
+    return (RECIPE_REGISTRY_VERSION << RECIPE_ID_BITS) | local
+
+
+def recipe_by_id(recipe_id):
+    """按配方 ID 取配方，ID 无效时返回 None"""
+    if recipe_id is None or recipe_id < 0:
+        return None
+    version, local = recipe_id >> RECIPE_ID_BITS, recipe_id & _LOCAL_MASK
+    if version != 1:
+        return None
+    if local < len(CSS_RECIPES):
+        return dict(CSS_RECIPES[local])
+    if local - len(CSS_RECIPES) < RECIPE_SPACE_SIZE:
+        return recipe_from_index(local - len(CSS_RECIPES))
+    return None
+
+
+# 反向查找表：预设配方、渐变形状、颜色 -> (色相, 亮度)、各数值的下标
+_PRESET_IDS = {_recipe_key(recipe): index for index, recipe in enumerate(CSS_RECIPES)}
+_SHAPE_INDEX = {shape: index for index, shape in enumerate(GRADIENT_SHAPES)}
+_COLOR_INDEX = {_hsl_hex(hue, lightness): (hue, index)
+                for hue in range(HUE_STEPS) for index, lightness in enumerate(COLOR_LIGHTNESS)}
+_VALUE_INDEX = [{value: index for index, value in enumerate(values)}
+                for values in (BLEND_MODES, CONTRASTS, BRIGHTNESSES, SATURATIONS, OPACITIES)]
+
+
+def recipe_to_id(recipe):
+    """配方 -> 配方 ID（旧数据迁移用），不在配方表中时返回 None"""
+    if not isinstance(recipe, dict):
+        return None
+    preset = _PRESET_IDS.get(_recipe_key(recipe))
+    if preset is not None:
+        return _local_id(preset)
+
+    try:
+        shape, color_from, color_to = str(recipe['gradient'])[:-1].rsplit(', ', 2)
+        hue, lightness = _COLOR_INDEX[color_from]
+        hue_to, lightness_to = _COLOR_INDEX[color_to]
+        hue_offset = HUE_OFFSETS.index((hue_to - hue) % HUE_STEPS)
+        values = [index[recipe[field]] for index, field in zip(_VALUE_INDEX, _RECIPE_FIELDS[1:])]
+        digits = [_SHAPE_INDEX[shape], hue, hue_offset, lightness] + values
+    except (KeyError, ValueError, TypeError):
+        return None
+    if lightness_to != lightness:
+        return None
+
+    index = 0
+    for digit, radix in zip(reversed(digits), reversed(_RADICES)):
+        index = index * radix + digit
+    # 解码校验（颜色取整等原因可能对应不到同一个配方）
+    if _recipe_key(recipe_from_index(index)) != _recipe_key(recipe):
+        return None
+    return _local_id(len(CSS_RECIPES) + index)
+
+
+@lru_cache(maxsize=4096)
+def recipe_css(recipe_id):
+    """配方 ID -> 预先拼好的 CSS：filter 用于图片，overlay 用于叠加层（ID 无效时返回 None）"""
+    recipe = recipe_by_id(recipe_id)
+    if recipe is None:
+        return None
+    return recipe_style(recipe)
+
+
+def recipe_style(recipe):
+    """配方 -> CSS 字符串"""
+    return {
+        'filter': f"contrast({recipe['contrast']}) brightness({recipe['brightness']}) saturate({recipe['saturation']})",
+        'overlay': f"mix-blend-mode: {recipe['blend_mode']}; background: {recipe['gradient']}; opacity: {recipe['opacity']}"
+    }
+
+
+def recipe_seed(*parts):
+    """由 用户ID、素材ID 等生成稳定的种子（与进程、Python 版本无关）"""
+    text = ':'.join(str(part) for part in parts)
+    return int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+
+
+class RecipeEngine:
+    """不重复的配方序列：先取打乱后的预设配方，再按互质步长遍历参数化空间"""
+
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+        # 预设配方只打乱一次
+        self._preset_order = self._rng.sample(range(len(CSS_RECIPES)), len(CSS_RECIPES))
+        self._start = self._rng.randrange(RECIPE_SPACE_SIZE)
+        self._stride = self._coprime_stride()
+        self._taken = 0
+
+    def _coprime_stride(self):
+        while True:
+            stride = self._rng.randrange(1, RECIPE_SPACE_SIZE)
+            if math.gcd(stride, RECIPE_SPACE_SIZE) == 1:
+                return stride
+
+    def _next(self):
+        """取下一个配方，返回 (版本内编号, 配方)"""
+        while True:
+            position = self._taken
+            self._taken += 1
+            if position < len(self._preset_order):
+                local = self._preset_order[position]
+                return local, dict(CSS_RECIPES[local])
+
+            step = position - len(self._preset_order)
+            index = (self._start + step * self._stride) % RECIPE_SPACE_SIZE
+            recipe = recipe_from_index(index)
+            # 跳过与预设渐变相同的组合，保证整体不重复
+            if recipe['gradient'] not in _PRESET_GRADIENTS:
+                return len(CSS_RECIPES) + index, recipe
+
+    def next(self):
+        """取下一个配方"""
+        return self._next()[1]
+
+    def next_id(self):
+        """取下一个配方的 ID"""
+        return _local_id(self._next()[0])
+
+    def take(self, count):
+        """连续取 count 个配方"""
+        return [self.next() for _ in range(count)]
+
+    def take_ids(self, count):
+        """连续取 count 个配方 ID（与 take 的顺序一致）"""
+        return [self.next_id() for _ in range(count)]
+
+
+def get_unique_css_recipes(count, seed=None):
+    """获取指定数量的不重复CSS配方（seed 相同时结果相同）"""
+    return RecipeEngine(seed).take(count)
+
+
+def get_random_css_recipe(exclude_recipes=None, seed=None):
+    """获取一个随机CSS配方（保留旧接口；exclude_recipes 中的配方不会被选中）"""
+    engine = RecipeEngine(seed)
+    excluded = {recipe['gradient'] + recipe['blend_mode'] for recipe in exclude_recipes or []}
+    while True:
+        recipe = engine.next()
+        if recipe['gradient'] + recipe['blend_mode'] not in excluded:
+            return recipe
@@ -0,0 +1,64 @@
+# ============================================================
+# redis_client.py
+#
+# 共享 Redis 连接模块
+# 功能说明：
+# 1. get_redis：按 REDIS_URL 返回进程内共享的 Redis 客户端（连接池复用）
+# 2. REDIS_URL 未配置为 redis:// / rediss:// / unix://（如压测用的 memory://）
+#    或未安装 redis 包时返回 None，调用方退回进程内实现
+# 3. 连接 / 读写超时较短，Redis 故障时快速失败，不拖慢业务请求
+#
+# 使用示例：
+#   client = get_redis()
+#   if client is not None:
+#       client.incr('key')
+# ============================================================
+
+import os
+import threading
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# redis 为可选依赖（Flask-Limiter 的 Redis 存储同样依赖它）
+try:
+    import redis
+    RedisError = redis.RedisError
+except ImportError:
+    redis = None
+    RedisError = OSError
+
+# 连接与读写超时（秒）
+REDIS_SOCKET_TIMEOUT = 1.0
+
+_REDIS_SCHEMES = ('redis://', 'rediss://', 'unix://')
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_redis_url():
+    return os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+
+def get_redis(url=None):
+    """返回共享的 Redis 客户端，不可用时返回 None"""
+    url = url or get_redis_url()
+    if redis is None or not url.startswith(_REDIS_SCHEMES):
+        return None
+
+    client = _clients.get(url)
+    if client is None:
+        with _lock:
+            client = _clients.get(url)
+            if client is None:
+                client = redis.Redis.from_url(
+                    url,
+                    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    decode_responses=True
+                )
+                _clients[url] = client
+                logger.info(f'Redis 客户端已创建: {url.split("@")[-1]}')
+    return client
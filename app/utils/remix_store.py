@@ -0,0 +1,65 @@
+# ============================================================
+# remix_store.py
+#
+# 二创结果的批量写入模块
+# 功能说明：
+# 1. copy_material_images：把原素材的图片复制为二创图片
+#    - 一条 INSERT ... SELECT 完成，图片行不经过 ORM（不逐行 add / flush）
+#    - 每张图片的 CSS 配方 ID 用 CASE material_images.id WHEN ... 映射（配方 ID 见 recipe_engine.py）
+#    - 只查询原图片的 ID 列（决定配方数量和顺序），不加载图片对象
+#
+# 使用示例：
+#   count = copy_material_images(material_id, user_material.id, seed=recipe_seed(user_id, material_id))
+#   db.session.commit()
+# ============================================================
+
+from datetime import datetime
+
+from app import db
+from app.models import MaterialImage, UserMaterialImage
+from app.utils.recipe_engine import RecipeEngine
+
+
+def copy_material_images(material_id, user_material_id, seed=None):
+    """复制原素材图片到二创素材（调用方负责提交事务）
+
+    Args:
+        material_id: 原素材ID
+        user_material_id: 二创素材ID（需已 flush 得到ID）
+        seed: CSS 配方的随机种子
+
+    Returns:
+        int: 复制的图片数
+    """
+    image_ids = db.session.execute(
+        db.select(MaterialImage.id)
+        .where(MaterialImage.material_id == material_id)
+        .order_by(MaterialImage.sort_order, MaterialImage.id)
+    ).scalars().all()
+    if not image_ids:
+        return 0
+
+    # 按排序依次分配不重复的配方（与 get_unique_css_recipes 的顺序一致）
+    recipe_ids = RecipeEngine(seed).take_ids(len(image_ids))
+    recipe_case = db.case(
+        dict(zip(image_ids, recipe_ids)),
+        value=MaterialImage.id
+    )
+
+    images = db.select(
+        db.literal(user_material_id, db.Integer),
+        MaterialImage.image_url,
+        MaterialImage.image_url,
+        recipe_case,
+        MaterialImage.is_cover,
+        MaterialImage.sort_order,
+        db.literal(datetime.utcnow(), db.DateTime)
+    ).where(MaterialImage.material_id == material_id)
+
+    table = UserMaterialImage.__table__
+    db.session.execute(table.insert().from_select(
+        [table.c.user_material_id, table.c.original_image_url, table.c.image_url, table.c.css_recipe_id,
+         table.c.is_cover, table.c.sort_order, table.c.created_at],
+        images
+    ))
+    return len(image_ids)
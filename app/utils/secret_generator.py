@@ -0,0 +1,168 @@
+# ============================================================
+# secret_generator.py
+#
+# 卡密批量生成模块
+# 功能说明：
+# 1. 使用 secrets 模块（密码学安全随机数）生成卡密
+#    - 一次取出整批随机字节，用 bytes.translate 拒绝采样映射到字符集（无取模偏差）
+# 2. 分块插入：每块先查库排除已存在的卡密，再用 executemany 一次写入
+# 3. 唯一约束冲突（并发生成）时只替换冲突的卡密并重试该块，不影响已提交的块
+# 4. 同一次生成的卡密写入相同的 batch_id，用于按批次导出
+#
+# 使用示例：
+#   keys = bulk_create_secrets('register', 10000, 'permanent', batch_id=new_batch_id())
+# ============================================================
+
+import string
+import secrets
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import RegisterSecret, TerminalSecret
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 卡密字符集：数字+大小写字母（62 个字符）
+CHARSET = string.digits + string.ascii_letters
+
+# 卡密类型 -> (模型, 前缀, 随机部分长度)
+SECRET_FORMATS = {
+    'register': (RegisterSecret, 'sk-', 18),
+    'terminal': (TerminalSecret, 'zdsk-', 10)
+}
+
+# 时长类型显示名称
+DURATION_NAMES = {
+    '1min': '1分钟卡',
+    '1day': '日卡(1天)',
+    '1month': '月卡(1个月)',
+    '1year': '年卡(1年)',
+    'permanent': '永久卡'
+}
+
+# 同步生成的最大数量，超过后转为后台任务
+SYNC_GENERATE_LIMIT = 1000
+# 单次生成的最大数量
+MAX_GENERATE_COUNT = 100000
+# 每块插入的条数（同时也是 IN 查询的参数个数）
+INSERT_CHUNK_SIZE = 500
+# 单块遇到唯一约束冲突时的最大重试次数
+MAX_INSERT_RETRIES = 5
+
+# 拒绝采样：只接受 < 248（62 的整数倍）的字节，保证每个字符等概率
+_ACCEPT_LIMIT = 256 - 256 % len(CHARSET)
+_TRANSLATE_TABLE = bytes(ord(CHARSET[b % len(CHARSET)]) if b < _ACCEPT_LIMIT else 0 for b in range(256))
+_REJECTED_BYTES = bytes(range(_ACCEPT_LIMIT, 256))
+
+
+def random_strings(count, length):
+    """生成 count 个长度为 length 的随机字符串"""
+    needed = count * length
+    chars = b''
+    while len(chars) < needed:
+        missing = needed - len(chars)
+        # 每个字节被接受的概率为 248/256，多取一点减少补取次数
+        chars += secrets.token_bytes(missing + missing // 16 + 16).translate(_TRANSLATE_TABLE, _REJECTED_BYTES)
+    text = chars[:needed].decode('ascii')
+    return [text[i:i + length] for i in range(0, needed, length)]
+
+
+def generate_secret_strings(count, prefix, length, exclude=None):
+    """生成 count 个互不重复的卡密（也不与 exclude 中的重复）"""
+    exclude = exclude or set()
+    result = set()
+    while len(result) < count:
+        for random_part in random_strings(count - len(result), length):
+            key = f'{prefix}{random_part}'
+            if key not in exclude:
+                result.add(key)
+    return list(result)
+
+
+def new_batch_id():
+    """生成批次号：时间 + 随机后缀"""
+    return f'{datetime.utcnow().strftime("%Y%m%d%H%M%S")}-{secrets.token_hex(4)}'
+
+
+def _existing_secrets(table, keys):
+    """keys 中已存在于库中的卡密"""
+    if not keys:
+        return set()
+    return set(db.session.execute(
+        db.select(table.c.secret).where(table.c.secret.in_(keys))
+    ).scalars())
+
+
+def _unique_candidates(table, size, prefix, length):
+    """生成 size 个库中不存在的卡密，只替换与库中重复的部分"""
+    keys = set()
+    while len(keys) < size:
+        fresh = generate_secret_strings(size - len(keys), prefix, length, exclude=keys)
+        taken = _existing_secrets(table, fresh)
+        keys.update(key for key in fresh if key not in taken)
+    return list(keys)
+
+
+def _insert_chunk(table, size, prefix, length, duration_type, batch_id):
+    """插入一块卡密并提交，返回卡密列表"""
+    keys = _unique_candidates(table, size, prefix, length)
+
+    for attempt in range(MAX_INSERT_RETRIES):
+        now = datetime.utcnow()
+        rows = [
+            {
+                'secret': key,
+                'is_used': False,
+                'duration_type': duration_type,
+                'expires_at': None,
+                'batch_id': batch_id,
+                'created_at': now
+            }
+            for key in keys
+        ]
+        try:
+            # 列表参数会以 executemany 执行
+            db.session.execute(table.insert(), rows)
+            db.session.commit()
+            return keys
+        except IntegrityError:
+            db.session.rollback()
+            # 与并发生成的卡密冲突：只替换冲突的卡密后重试本块
+            taken = _existing_secrets(table, keys)
+            logger.warning(f'卡密唯一约束冲突，替换 {len(taken)} 个后重试（第 {attempt + 1} 次）')
+            keys = [key for key in keys if key not in taken]
+            keys += _unique_candidates(table, size - len(keys), prefix, length)
+
+    raise RuntimeError(f'卡密插入连续冲突 {MAX_INSERT_RETRIES} 次，已停止')
+
+
+def bulk_create_secrets(secret_type, count, duration_type, batch_id=None, progress=None,
+                        chunk_size=INSERT_CHUNK_SIZE):
+    """批量生成并插入卡密
+
+    Args:
+        secret_type: register / terminal
+        count: 生成数量
+        duration_type: 时长类型（见 DURATION_NAMES）
+        batch_id: 批次号
+        progress: 进度回调 progress(已完成数, 总数)，每块提交后调用
+        chunk_size: 每块插入的条数
+
+    Returns:
+        list: 生成的卡密
+    """
+    SecretModel, prefix, length = SECRET_FORMATS[secret_type]
+    table = SecretModel.__table__
+
+    created = []
+    while len(created) < count:
+        size = min(chunk_size, count - len(created))
+        created.extend(_insert_chunk(table, size, prefix, length, duration_type, batch_id))
+        if progress:
+            progress(len(created), count)
+
+    logger.info(f'批量生成卡密完成: type={secret_type}, count={count}, batch_id={batch_id}')
+    return created
@@ -0,0 +1,197 @@
+# ============================================================
+# statistics.py
+#
+# 运营统计模块
+# 功能说明：
+# 1. rollup_range：按天汇总指定日期范围的数据，写入 daily_stats
+#    - 每个指标一条 GROUP BY 日期 的查询，与天数无关
+#    - 已存在的日期直接覆盖（重复执行结果一致），没有数据的日期写入全 0 的行
+# 2. backfill：从最早的数据开始分段回填历史
+# 3. get_daily_stats：一条查询读取最近 N 天；汇总表中没有行的日期（从未汇总）实时统计
+#    （未部署定时任务时趋势图仍是实时数据）
+# 4. get_dashboard_totals：一条查询读取后台首页的总数
+#
+# 日期按 UTC 划分（与 created_at 的 datetime.utcnow 一致）
+# ============================================================
+
+from datetime import datetime, date, timedelta
+from sqlalchemy import func
+
+from app import db
+from app.models import (DailyStat, User, UserMaterial, UserDownload, UserFavorite,
+                        RegisterSecret, TerminalSecret, Material)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 回填时每段的天数（控制单次查询和事务的大小）
+BACKFILL_CHUNK_DAYS = 31
+
+
+def _metric_columns():
+    """指标名 -> 用于按天分组的时间字段列表"""
+    return {
+        'new_users': [User.created_at],
+        'remixes': [UserMaterial.created_at],
+        'downloads': [UserDownload.created_at],
+        'favorites': [UserFavorite.created_at],
+        'secrets_activated': [RegisterSecret.used_at, TerminalSecret.used_at]
+    }
+
+
+def _to_date(value):
+    """func.date() 在 SQLite 返回字符串，在 PostgreSQL / MySQL 返回 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def count_by_day(column, start_date, end_date):
+    """统计 [start_date, end_date] 每天的记录数，返回 {date: 数量}"""
+    day = func.date(column)
+    rows = db.session.query(day, func.count()).filter(
+        column >= datetime.combine(start_date, datetime.min.time()),
+        column < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    ).group_by(day).all()
+    return {_to_date(value): count for value, count in rows}
+
+
+def live_counts(start_date, end_date):
+    """实时统计 [start_date, end_date] 每天的各项指标，返回 {指标: {date: 数量}}"""
+    counts = {}
+    for metric, columns in _metric_columns().items():
+        merged = {}
+        for column in columns:
+            for day, count in count_by_day(column, start_date, end_date).items():
+                merged[day] = merged.get(day, 0) + count
+        counts[metric] = merged
+    return counts
+
+
+def rollup_range(start_date, end_date):
+    """重新汇总 [start_date, end_date] 的每日统计并提交，返回写入的天数"""
+    counts = live_counts(start_date, end_date)
+
+    existing = {
+        stat.date: stat
+        for stat in DailyStat.query.filter(DailyStat.date >= start_date, DailyStat.date <= end_date)
+    }
+
+    days = (end_date - start_date).days + 1
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        values = {metric: counts[metric].get(day, 0) for metric in counts}
+        stat = existing.get(day)
+        if stat is None:
+            # 没有任何数据的日期也建行（全 0），读取时有行即表示已汇总
+            stat = DailyStat(date=day)
+            db.session.add(stat)
+        for metric, value in values.items():
+            setattr(stat, metric, value)
+        stat.updated_at = datetime.utcnow()
+
+    db.session.commit()
+    return days
+
+
+def rollup_recent(days=2):
+    """汇总最近 days 天（含今天），供定时任务调用"""
+    today = datetime.utcnow().date()
+    return rollup_range(today - timedelta(days=days - 1), today)
+
+
+def earliest_date():
+    """所有统计来源中最早的日期，没有数据时返回 None"""
+    columns = [column for columns in _metric_columns().values() for column in columns]
+    # 每张表各自取最小值（标量子查询合并为一条查询，避免多表笛卡尔积）
+    values = db.session.execute(db.select(*[
+        db.select(func.min(column)).scalar_subquery() for column in columns
+    ])).one()
+    values = [_to_date(value) for value in values if value is not None]
+    return min(values) if values else None
+
+
+def backfill(days=None, echo=None):
+    """回填历史统计
+
+    Args:
+        days: 只回填最近 days 天；为 None 时从最早的数据开始
+        echo: 进度输出函数（如 click.echo），为 None 时写日志
+    """
+    echo = echo or logger.info
+    today = datetime.utcnow().date()
+    if days:
+        start = today - timedelta(days=days - 1)
+    else:
+        start = earliest_date()
+        if start is None:
+            echo('没有可回填的数据')
+            return 0
+
+    total = 0
+    chunk_start = start
+    while chunk_start <= today:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), today)
+        total += rollup_range(chunk_start, chunk_end)
+        echo(f'已汇总 {chunk_start} ~ {chunk_end}')
+        chunk_start = chunk_end + timedelta(days=1)
+    return total
+
+
+def _missing_runs(days):
+    """把缺失的日期（升序）合并为连续区间 [(开始, 结束)]"""
+    runs = []
+    for day in days:
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def get_daily_stats(days=7):
+    """读取最近 days 天的每日统计（一条查询），按日期正序返回字典列表
+
+    汇总表中没有行的日期（从未汇总过，如未运行定时任务）按连续区间实时统计，不写入汇总表；
+    今天的数据由定时任务按 STATS_ROLLUP_INTERVAL 更新
+    """
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    stats = {
+        stat.date: {metric: getattr(stat, metric) for metric in _metric_columns()}
+        for stat in DailyStat.query.filter(DailyStat.date >= start, DailyStat.date <= today).all()
+    }
+
+    missing = [start + timedelta(days=offset) for offset in range(days)
+               if start + timedelta(days=offset) not in stats]
+    for run_start, run_end in _missing_runs(missing):
+        live = live_counts(run_start, run_end)
+        for offset in range((run_end - run_start).days + 1):
+            day = run_start + timedelta(days=offset)
+            stats[day] = {metric: live[metric].get(day, 0) for metric in live}
+
+    result = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        result.append(dict(date=day.strftime('%Y-%m-%d'), **stats[day]))
+    return result
+
+
+def get_dashboard_totals():
+    """后台首页的总数（各表计数合并为一条查询）"""
+    def count_of(model, *criteria):
+        query = db.select(func.count()).select_from(model)
+        if criteria:
+            query = query.where(*criteria)
+        return query.scalar_subquery()
+
+    row = db.session.execute(db.select(
+        count_of(Material).label('total_materials'),
+        count_of(RegisterSecret, RegisterSecret.is_used == False).label('unused_secrets'),
+        count_of(User).label('total_users'),
+        count_of(UserMaterial).label('total_remix_count'),
+        count_of(UserDownload).label('total_download_count')
+    )).one()
+    return dict(row._mapping)
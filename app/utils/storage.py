@@ -0,0 +1,308 @@
+# ============================================================
+# storage.py
+#
+# 文件存储抽象模块
+# 功能说明：
+# 1. Storage 抽象：save / open / delete / url / exists
+# 2. LocalStorage：本地文件系统驱动（默认 app/static/uploads）
+# 3. S3Storage：S3 兼容驱动（AWS S3 / MinIO / 阿里云 OSS 等）
+# 4. 支持预签名直传（浏览器直接上传到对象存储，不经过 Flask 进程）
+#
+# 使用方式：
+#   from app.utils.storage import get_storage
+#   image_url = get_storage().save(file, key)
+# ============================================================
+
+import os
+import shutil
+import secrets
+from datetime import datetime
+from werkzeug.utils import secure_filename
+from flask import current_app
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 本地存储默认的 URL 前缀（与数据库中已有的 image_url 保持一致）
+LOCAL_URL_PREFIX = '/static/uploads'
+# 上传文件名带时间戳且不会被覆盖，对象存储中同样设置长期缓存
+UPLOAD_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# 存储 key 中随机部分的字节数（十六进制后为 2 倍长度）
+KEY_RANDOM_BYTES = 8
+
+
+def generate_upload_key(filename):
+    """根据原始文件名生成 时间戳_随机串_文件名 形式的存储 key
+
+    同一秒内上传同名文件（secure_filename 会去掉中文，中文文件名尤其容易相同）不会互相覆盖
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
+    return f'{timestamp}{secrets.token_hex(KEY_RANDOM_BYTES)}_{secure_filename(filename)}'
+
+
+def generate_random_key(file_ext):
+    """生成 时间戳_随机串.扩展名 形式的存储 key（用于没有原始文件名的图片和预签名直传）
+
+    随机串来自 secrets（密码学安全），预签名直传时客户端无法预测或撞上其他用户的 key；
+    对象存储的 POST 会直接覆盖同名对象，且文件设置了长期缓存，key 必须唯一
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f'{timestamp}_{secrets.token_hex(KEY_RANDOM_BYTES)}.{file_ext}'
+
+
+class Storage:
+    """存储驱动基类"""
+
+    def save(self, fileobj, key, content_type=None):
+        """保存文件并返回可访问的 URL
+
+        Args:
+            fileobj: 文件对象（werkzeug FileStorage / 任意二进制文件对象 / bytes）
+            key: 存储 key（文件名）
+            content_type: MIME 类型（可选）
+
+        Returns:
+            str: 文件访问 URL
+        """
+        raise NotImplementedError
+
+    def open(self, key):
+        """以二进制只读方式打开文件"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """删除文件，文件不存在时返回 False"""
+        raise NotImplementedError
+
+    def exists(self, key):
+        """检查文件是否存在"""
+        raise NotImplementedError
+
+    def url(self, key):
+        """返回文件的访问 URL"""
+        raise NotImplementedError
+
+    def key_from_url(self, url):
+        """从数据库中保存的 URL 反推出存储 key，无法识别时返回 None"""
+        raise NotImplementedError
+
+    def presign_upload(self, key, content_type, max_size, expires_in=600):
+        """生成浏览器直传的预签名参数，不支持直传的驱动返回 None"""
+        return None
+
+    def delete_url(self, url):
+        """根据 URL 删除文件（删除失败只记录日志，不抛出异常）"""
+        if not url:
+            return False
+        key = self.key_from_url(url)
+        if not key:
+            return False
+        try:
+            return self.delete(key)
+        except Exception as e:
+            logger.warning(f'删除文件失败 {url}: {str(e)}')
+            return False
+
+
+class LocalStorage(Storage):
+    """本地文件系统存储"""
+
+    def __init__(self, root, url_prefix=LOCAL_URL_PREFIX):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip('/')
+
+    def _path(self, key):
+        # 防止 ../ 等路径穿越
+        safe_key = os.path.basename(key)
+        return os.path.join(self.root, safe_key)
+
+    def save(self, fileobj, key, content_type=None):
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+        file_path = self._path(key)
+        if isinstance(fileobj, (bytes, bytearray)):
+            with open(file_path, 'wb') as f:
+                f.write(fileobj)
+        elif hasattr(fileobj, 'save'):
+            # werkzeug FileStorage
+            fileobj.save(file_path)
+        else:
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(fileobj, f)
+
+        return self.url(key)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def delete(self, key):
+        file_path = self._path(key)
+        if not os.path.exists(file_path):
+            return False
+        os.remove(file_path)
+        return True
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def url(self, key):
+        return f'{self.url_prefix}/{key}'
+
+    def key_from_url(self, url):
+        prefix = self.url_prefix + '/'
+        if url.startswith(prefix):
+            return url[len(prefix):]
+        return None
+
+
+class S3Storage(Storage):
+    """S3 兼容对象存储（AWS S3 / MinIO / OSS 等）"""
+
+    def __init__(self, bucket, endpoint_url=None, access_key=None, secret_key=None,
+                 region=None, public_url=None, prefix=''):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url.rstrip('/') if endpoint_url else None
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.public_url = public_url.rstrip('/') if public_url else None
+        self.prefix = prefix.strip('/')
+        self._client = None
+
+    @property
+    def client(self):
+        """延迟创建 boto3 客户端（boto3 为可选依赖）"""
+        if self._client is None:
+            try:
+                import boto3
+                from botocore.config import Config as BotoConfig
+            except ImportError:
+                raise RuntimeError('使用 S3 存储需要安装 boto3：pip install boto3')
+
+            self._client = boto3.client(
+                's3',
+                endpoint_url=self.endpoint_url,
+                aws_access_key_id=self.access_key,
+                aws_secret_access_key=self.secret_key,
+                region_name=self.region,
+                # MinIO 等自建服务只支持路径风格访问
+                config=BotoConfig(signature_version='s3v4', s3={'addressing_style': 'path'})
+            )
+        return self._client
+
+    def _object_key(self, key):
+        return f'{self.prefix}/{key}' if self.prefix else key
+
+    def save(self, fileobj, key, content_type=None):
+        extra_args = {'CacheControl': UPLOAD_CACHE_CONTROL}
+        if content_type:
+            extra_args['ContentType'] = content_type
+        if isinstance(fileobj, (bytes, bytearray)):
+            self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=bytes(fileobj), **extra_args)
+        else:
+            stream = getattr(fileobj, 'stream', fileobj)
+            if not content_type and getattr(fileobj, 'mimetype', None):
+                extra_args['ContentType'] = fileobj.mimetype
+            self.client.upload_fileobj(stream, self.bucket, self._object_key(key), ExtraArgs=extra_args)
+        return self.url(key)
+
+    def open(self, key):
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        return response['Body']
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        return True
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def _base_url(self):
+        if self.public_url:
+            return self.public_url
+        return f'{self.endpoint_url or "https://s3.amazonaws.com"}/{self.bucket}'
+
+    def url(self, key):
+        return f'{self._base_url()}/{self._object_key(key)}'
+
+    def key_from_url(self, url):
+        base = self._base_url() + '/'
+        if url.startswith(base):
+            object_key = url[len(base):]
+        elif url.startswith(LOCAL_URL_PREFIX + '/'):
+            # 迁移前保存在本地的历史图片，按同名 key 处理
+            return url[len(LOCAL_URL_PREFIX) + 1:]
+        else:
+            return None
+
+        if self.prefix and object_key.startswith(self.prefix + '/'):
+            object_key = object_key[len(self.prefix) + 1:]
+        return object_key
+
+    def presign_upload(self, key, content_type, max_size, expires_in=600):
+        """生成预签名 POST 表单（带大小和类型限制）"""
+        presigned = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Fields={'Content-Type': content_type, 'Cache-Control': UPLOAD_CACHE_CONTROL},
+            Conditions=[
+                {'Content-Type': content_type},
+                {'Cache-Control': UPLOAD_CACHE_CONTROL},
+                ['content-length-range', 1, max_size]
+            ],
+            ExpiresIn=expires_in
+        )
+        return {
+            'method': 'POST',
+            'url': presigned['url'],
+            'fields': presigned['fields'],
+            'image_url': self.url(key)
+        }
+
+
+def create_storage(config, root_path):
+    """根据配置创建存储驱动
+
+    Args:
+        config: Flask 配置（或同结构的字典）
+        root_path: 应用根目录（本地存储默认目录的基准）
+
+    Returns:
+        Storage 实例
+    """
+    backend = (config.get('STORAGE_BACKEND') or 'local').lower()
+
+    if backend == 's3':
+        return S3Storage(
+            bucket=config.get('S3_BUCKET'),
+            endpoint_url=config.get('S3_ENDPOINT_URL'),
+            access_key=config.get('S3_ACCESS_KEY'),
+            secret_key=config.get('S3_SECRET_KEY'),
+            region=config.get('S3_REGION'),
+            public_url=config.get('S3_PUBLIC_URL'),
+            prefix=config.get('S3_PREFIX') or ''
+        )
+
+    local_root = config.get('STORAGE_LOCAL_ROOT') or os.path.join(root_path, 'static', 'uploads')
+    return LocalStorage(local_root)
+
+
+def init_storage(app):
+    """初始化存储驱动并挂载到 app.extensions"""
+    storage = create_storage(app.config, app.root_path)
+    app.extensions['storage'] = storage
+    logger.info(f'存储驱动: {type(storage).__name__}')
+    return storage
+
+
+def get_storage():
+    """获取当前应用的存储驱动"""
+    return current_app.extensions['storage']
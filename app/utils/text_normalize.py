@@ -0,0 +1,193 @@
+# ============================================================
+# text_normalize.py
+#
+# 文案清洗与敏感词扫描模块
+# 功能说明：
+# 1. sanitize_copy：清洗 AI 输出的文案
+#    - 代码式表情（[火] / :fire:）和 Unicode 表情（🔥 💪 ❤️ 国旗、肤色、组合表情）
+#    - 全角字母数字转半角，中文后的半角标点转全角，规范多余空白
+#    - 所有正则在模块加载时编译一次
+# 2. BannedWordScanner：Aho-Corasick 自动机扫描敏感词
+#    - 一次遍历同时匹配所有词，耗时与词表大小无关
+#    - stream() 返回增量扫描器，逐块喂入流式输出，跨块的词也能匹配
+# 3. BANNED_WORDS：系统提示词中要求规避的合规敏感词
+#
+# 使用示例：
+#   text = sanitize_copy(generated)
+#   hits = banned_word_scanner.find(text)        # [(位置, 词), ...]
+#   stream = banned_word_scanner.stream()
+#   for chunk in chunks: hits += stream.feed(chunk)
+# ============================================================
+
+import re
+from collections import deque
+
+# 合规敏感词（与 material_remix 系统提示词中的规则一致）
+BANNED_WORDS = ('兼职', '赚钱', '工资', '日入', '月入', '提现', '回本', '项目', '副业')
+
+# 代码式表情：[哈哈] / [火] / [doge] / [OK]
+_CODE_EMOJI_RE = re.compile(r'\[(?:[A-Za-z0-9_\u4e00-\u9fff]{1,8})\]')
+# 冒号包裹的表情关键词：:smile: / :ok_hand:
+_COLON_EMOJI_RE = re.compile(r':[A-Za-z0-9_+\-]{1,30}:', re.IGNORECASE)
+# Unicode 表情及其修饰字符
+_EMOJI_RE = re.compile(
+    '['
+    '\U0001F000-\U0001FAFF'  # 麻将 / 扑克 / 表情 / 交通 / 补充符号（含肤色修饰、国旗字母）
+    '\u2600-\u27BF'          # 杂项符号、装饰符号（☀ ❤ ✅ ✨）
+    '\u2300-\u23FF'          # 杂项技术符号（⌚ ⏰ ⏳）
+    '\u2B00-\u2BFF'          # 箭头、星形（⬆ ⭐ ⭕）
+    '\u3030\u303D\u3297\u3299'  # 〰 〽 ㊗ ㊙
+    '\uFE00-\uFE0F'          # 变体选择符
+    '\u200D'                 # 零宽连接符（组合表情）
+    '\u20E3'                 # 键帽组合符
+    '\U000E0020-\U000E007F'  # 标签字符（地区旗帜）
+    ']+'
+)
+# 标点前的空白
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+(?=[，。；；、,.!！?？])')
+# 连续空格 / 制表符
+_MULTI_SPACE_RE = re.compile(r'[ \t]{2,}')
+# 中文后面的半角标点（数字间的 : 等保持不变；先匹配标点再回看，比逐字回看快）
+_CJK_ASCII_PUNCT_RE = re.compile(r'[,!?;:](?<=[\u4e00-\u9fff].)(?!\d)')
+
+_CJK_PUNCT = {',': '，', '!': '！', '?': '？', ';': '；', ':': '：'}
+
+# 全角字母数字、全角空格 -> 半角（全角标点在中文里是正常写法，保持不变）
+_WIDTH_TABLE = {code: code - 0xFEE0 for code in range(0xFF10, 0xFF1A)}
+_WIDTH_TABLE.update({code: code - 0xFEE0 for code in range(0xFF21, 0xFF3B)})
+_WIDTH_TABLE.update({code: code - 0xFEE0 for code in range(0xFF41, 0xFF5B)})
+_WIDTH_TABLE[0x3000] = 0x20
+# 只对包含全角字符的片段做 translate（大部分文案没有全角字母数字）
+_FULLWIDTH_RE = re.compile('[\uFF10-\uFF19\uFF21-\uFF3A\uFF41-\uFF5A\u3000]+')
+
+
+def strip_emoji(text):
+    """移除 Unicode 表情"""
+    return _EMOJI_RE.sub('', text)
+
+
+def normalize_width(text):
+    """全角字母数字转半角，中文后的半角标点转全角"""
+    text = _FULLWIDTH_RE.sub(lambda m: m.group().translate(_WIDTH_TABLE), text)
+    return _CJK_ASCII_PUNCT_RE.sub(lambda m: _CJK_PUNCT[m.group()], text)
+
+
+def sanitize_copy(text):
+    """清洗文案中的表情等噪声"""
+    if not text:
+        return text
+
+    text = strip_emoji(text)
+    text = _CODE_EMOJI_RE.sub('', text)
+    text = _COLON_EMOJI_RE.sub('', text)
+
+    # 规范多余空白与标点前空格（先去空格，"中文 ," 才能识别为中文后的标点）
+    text = _SPACE_BEFORE_PUNCT_RE.sub('', text)
+    text = _MULTI_SPACE_RE.sub(' ', text)
+    text = normalize_width(text)
+
+    return text.strip()
+
+
+class BannedWordScanner:
+    """Aho-Corasick 多模式匹配"""
+
+    def __init__(self, words):
+        self.words = tuple(dict.fromkeys(word for word in words if word))
+        # 节点 0 为根；_goto[节点] = {字符: 子节点}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for word in self.words:
+            self._insert(word)
+        self._build_fail_links()
+        # 根状态下跳到下一个可能开始匹配的字符（在 C 层完成，避免逐字循环）
+        first_chars = ''.join(re.escape(char) for char in self._goto[0])
+        self._first_char_re = re.compile(f'[{first_chars}]') if first_chars else None
+
+    def _insert(self, word):
+        node = 0
+        for char in word:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = child
+        self._output[node] = (word,)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # 合并后缀节点的输出（一个位置可能同时结束多个词）
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def scan(self, text, state=0, offset=0):
+        """从自动机状态 state 开始扫描 text
+
+        Returns:
+            tuple: ([(起始位置, 词), ...], 结束状态)，位置加上 offset
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        index = 0
+        length = len(text)
+        while index < length:
+            if state == 0:
+                if self._first_char_re is None:
+                    break
+                found = self._first_char_re.search(text, index)
+                if found is None:
+                    break
+                index = found.start()
+            char = text[index]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = offset + index + 1
+                matches.extend((end - len(word), word) for word in output[state])
+            index += 1
+        return matches, state
+
+    def find(self, text):
+        """扫描整段文本，返回 [(起始位置, 词), ...]"""
+        return self.scan(text)[0]
+
+    def contains(self, text):
+        return bool(self.find(text))
+
+    def stream(self):
+        """增量扫描器（用于流式输出）"""
+        return StreamScanner(self)
+
+
+class StreamScanner:
+    """逐块扫描，自动机状态在块之间保留，跨块的词同样能匹配"""
+
+    def __init__(self, scanner):
+        self._scanner = scanner
+        self._state = 0
+        self.position = 0
+        self.matches = []
+
+    def feed(self, chunk):
+        """喂入一块文本，返回本块新增的匹配（位置为全文位置）"""
+        matches, self._state = self._scanner.scan(chunk, self._state, self.position)
+        self.position += len(chunk)
+        self.matches.extend(matches)
+        return matches
+
+
+# 默认的敏感词扫描器
+banned_word_scanner = BannedWordScanner(BANNED_WORDS)
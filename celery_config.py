@@ -7,6 +7,10 @@
 # 2. 配置 Redis 作为 Broker 和 Backend
 # 3. 配置任务序列化、时区等参数
 # 4. 自动发现并注册任务模块
+# 5. 定时任务（celery beat）：每日统计汇总
+#
+# 启动定时任务：
+#   celery -A celery_config beat --loglevel=info
 # ============================================================
 
 # Celery 配置文件
@@ -54,6 +58,13 @@ celery_app.conf.update(
         'socket_connect_timeout': 30,
         'socket_timeout': 60,
         'retry_on_timeout': True
+    },
+    # 定时任务：按 STATS_ROLLUP_INTERVAL 秒（默认 10 分钟）汇总每日统计
+    beat_schedule={
+        'rollup-daily-stats': {
+            'task': 'app.tasks.rollup_daily_stats',
+            'schedule': int(os.environ.get('STATS_ROLLUP_INTERVAL', 600))
+        }
     }
 )
 
@@ -0,0 +1,102 @@
+# ============================================================
+# gunicorn_config.py
+#
+# Gunicorn 生产环境配置文件
+# 功能说明：
+# 1. 按 GUNICORN_PROFILE 选择工作模式（sync / gthread / gevent）
+# 2. 根据 CPU 核数计算 worker / 线程数（可用环境变量覆盖）
+# 3. preload_app：主进程预加载应用，fork 后子进程共享内存（写时复制）
+# 4. max_requests + jitter：定期重启 worker，避免内存泄漏且不会同时重启
+# 5. 优雅超时：重启/停止时等待进行中的请求完成
+#
+# 启动方式：
+#   gunicorn -c gunicorn_config.py wsgi:app
+#   GUNICORN_PROFILE=gevent gunicorn -c gunicorn_config.py wsgi:app
+#
+# 工作模式说明：
+#   sync    每个 worker 同时处理 1 个请求，适合 CPU 密集型，慢请求会占满 worker
+#   gthread 每个 worker 多线程，适合混合负载（默认）
+#   gevent  协程模式，适合大量 I/O 等待（任务状态轮询、Celery 投递、邮件、LLM 调用）
+# ============================================================
+
+import os
+import multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CPU_COUNT = multiprocessing.cpu_count()
+
+# 工作模式
+PROFILE = os.environ.get('GUNICORN_PROFILE', 'gthread').lower()
+
+# 各工作模式的默认参数
+PROFILES = {
+    'sync': {
+        'worker_class': 'sync',
+        'workers': CPU_COUNT * 2 + 1,
+        'threads': 1,
+        'timeout': 60
+    },
+    'gthread': {
+        'worker_class': 'gthread',
+        'workers': CPU_COUNT + 1,
+        'threads': 4,
+        'timeout': 60
+    },
+    'gevent': {
+        'worker_class': 'gevent',
+        'workers': CPU_COUNT,
+        'threads': 1,
+        'timeout': 120
+    }
+}
+
+if PROFILE not in PROFILES:
+    raise ValueError(f'GUNICORN_PROFILE 只能是 {", ".join(PROFILES)}，当前为: {PROFILE}')
+
+_profile = PROFILES[PROFILE]
+
+# 监听地址
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# 工作模式与并发
+worker_class = _profile['worker_class']
+workers = int(os.environ.get('WEB_CONCURRENCY', _profile['workers']))
+threads = int(os.environ.get('GUNICORN_THREADS', _profile['threads']))
+# gevent 模式下每个 worker 的最大并发连接数
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# 预加载应用（写时复制共享内存，worker 启动更快）
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ['true', 'on', '1']
+
+# 定期重启 worker（加随机抖动，避免所有 worker 同时重启）
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# 超时设置
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', _profile['timeout']))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 日志
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    server.log.info(f'工作模式: {PROFILE}, workers={workers}, threads={threads}, preload_app={preload_app}')
+
+
+def post_fork(server, worker):
+    """fork 之后丢弃从主进程继承的数据库连接，每个 worker 使用自己的连接池"""
+    if not preload_app:
+        return
+
+    from wsgi import app
+    from app import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -5,6 +5,8 @@
 # 功能说明：
 # 1. 创建 Flask 应用实例
 # 2. 启动开发服务器
+#
+# 生产环境请使用 gunicorn：gunicorn -c gunicorn_config.py wsgi:app
 # ============================================================
 
 # 导入创建应用的函数
@@ -0,0 +1,116 @@
+# ============================================================
+# benchmark_json_compression.py
+#
+# JSON 序列化与响应压缩基准测试脚本
+# 功能说明：
+# 1. 构造与 /api/latest-materials、/admin/api/materials 相同结构的素材列表数据
+# 2. 对比 Flask 默认 JSON Provider 与 orjson 快速通道的序列化耗时
+# 3. 对比原始 / gzip / brotli 压缩后的字节数和压缩耗时
+#
+# 使用方式：
+#   python scripts/benchmark_json_compression.py --sizes 8,50,200 --repeat 2000
+# ============================================================
+
+import sys
+import os
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.utils.compression import compress_data, brotli
+
+TITLES = ['小红书爆款文案合集', '私域引流话术模板', '闲鱼虚拟资料上架攻略', '短视频口播脚本100篇', '朋友圈营销素材包']
+TYPES = ['副业', '引流', '文案', '未分类']
+
+
+def build_material_list(count, admin=False):
+    """构造素材列表接口的返回数据"""
+    now = datetime(2026, 1, 1)
+    materials = []
+    for i in range(count):
+        item = {
+            'id': i + 1,
+            'title': f'{random.choice(TITLES)} 第{i + 1}期',
+            'material_type': random.choice(TYPES),
+            'view_count': random.randint(0, 50000),
+            'favorite_count': random.randint(0, 5000),
+            'download_count': random.randint(0, 8000),
+            'cover_image_url': f'/static/uploads/20260221_00{i % 60:02d}13_image_1.jpg'
+        }
+        if admin:
+            item['description'] = '这是一段用于测试的素材文案，包含痛点、场景、利益点和引导。' * 4
+            item['is_published'] = True
+            item['created_at'] = (now - timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S')
+        materials.append(item)
+
+    return {
+        'success': True,
+        'data': materials,
+        'pagination': {'page': 1, 'per_page': count, 'total': count * 10, 'has_more': True}
+    }
+
+
+def time_call(func, repeat):
+    """返回单次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run_benchmark(sizes, repeat):
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+
+    print('=' * 78)
+    print('JSON 序列化与响应压缩基准测试')
+    print(f'orjson: {"已安装" if orjson else "未安装"}    brotli: {"已安装" if brotli else "未安装"}')
+    print('=' * 78)
+
+    for admin in (False, True):
+        label = '/admin/api/materials' if admin else '/api/latest-materials'
+        print(f'\n【{label}】')
+        print(f'{"条数":>6} {"默认序列化(us)":>14} {"orjson(us)":>12} {"加速":>6} '
+              f'{"原始(B)":>9} {"gzip(B)":>9} {"br(B)":>9} {"gzip(us)":>9} {"br(us)":>9}')
+
+        for size in sizes:
+            payload = build_material_list(size, admin=admin)
+
+            with app.app_context():
+                default_us = time_call(lambda: default_provider.response(payload).get_data(), repeat)
+                fast_us = time_call(lambda: fast_provider.response(payload).get_data(), repeat)
+                body = fast_provider.response(payload).get_data()
+                default_body = default_provider.response(payload).get_data()
+
+            gzip_body = compress_data(body, 'gzip')
+            gzip_us = time_call(lambda: compress_data(body, 'gzip'), max(repeat // 10, 1))
+
+            if brotli is not None:
+                br_size = len(compress_data(body, 'br'))
+                br_us = f"{time_call(lambda: compress_data(body, 'br'), max(repeat // 10, 1)):.1f}"
+            else:
+                br_size, br_us = '-', '-'
+
+            print(f'{size:>6} {default_us:>14.1f} {fast_us:>12.1f} {default_us / fast_us:>5.1f}x '
+                  f'{len(body):>9} {len(gzip_body):>9} {br_size:>9} {gzip_us:>9.1f} {br_us:>9}')
+            print(f'{"":>6} 默认 Provider 输出 {len(default_body)} 字节（中文转义为 \\uXXXX），'
+                  f'gzip 节省 {100 - len(gzip_body) * 100 / len(default_body):.1f}%')
+
+    print('\n' + '=' * 78)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='JSON 序列化与响应压缩基准测试')
+    parser.add_argument('--sizes', default='8,50,200', help='每页条数，逗号分隔')
+    parser.add_argument('--repeat', type=int, default=2000, help='每项重复次数')
+    args = parser.parse_args()
+
+    random.seed(42)
+    run_benchmark([int(s) for s in args.sizes.split(',')], args.repeat)
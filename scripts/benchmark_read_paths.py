@@ -0,0 +1,376 @@
+# ============================================================
+# benchmark_read_paths.py
+#
+# 主要读路径的 HTTP 压测脚本
+# 功能说明：
+# 1. 按规模生成压测数据（scripts/test_helpers.py 的 seed_load_dataset）：
+#    用户（绑定设备ID）、卡密、素材及图片、收藏、下载、二创作品
+#    - 默认使用临时 SQLite 数据库；--database-url 指定已有库时复用同前缀的数据
+# 2. N 个并发会话（每个会话一个已登录用户，带 X-Device-ID 和会话设备ID）
+#    在 --duration 秒内按权重随机访问：
+#    - 首页 /、素材详情 /material/<id>
+#    - /api/latest-materials：每种排序（created_at / view / favorite / download）和搜索，随机翻页
+#    - 我的作品库 /my-materials 及 /api/my-materials/my|favorite
+#    - 后台列表页：素材 / 卡密 / 用户（页面和分页 API，由管理员会话访问）
+# 3. 每个接口统计：请求数、错误数、吞吐量、延迟 mean / p50 / p95 / p99 / max（毫秒）、
+#    每个请求的 SQL 条数（mean / max）
+# 4. 请求在本进程内通过 Flask test_client 执行（SQL 按线程计数），
+#    结果输出为 JSON（含 git 提交号），--baseline 指定上次的结果文件时打印对比
+#
+# 使用方式：
+#   python scripts/benchmark_read_paths.py --users 200 --materials 2000 --images 9 \
+#       --concurrency 16 --duration 30 --output results/read_$(git rev-parse --short HEAD).json
+#   python scripts/benchmark_read_paths.py --only latest_view,latest_search --baseline results/read_abc123.json
+# ============================================================
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# 搜索压测使用的关键词（与 test_helpers.LOAD_KEYWORDS 一致，另加一个无结果的词）
+SEARCH_TERMS = ['副业', '宝妈', '穿搭', '美食', '干货', '素材1', '不存在的关键词']
+
+# 场景名 -> (权重, 是否管理员会话)
+SCENARIOS = {
+    'index': (10, False),
+    'material_detail': (20, False),
+    'latest_created_at': (10, False),
+    'latest_view': (6, False),
+    'latest_favorite': (4, False),
+    'latest_download': (4, False),
+    'latest_search': (8, False),
+    'my_materials': (6, False),
+    'my_materials_api_my': (4, False),
+    'my_materials_api_favorite': (4, False),
+    'admin_materials': (2, True),
+    'admin_materials_api': (3, True),
+    'admin_secrets': (2, True),
+    'admin_secrets_api': (2, True),
+    'admin_users': (2, True),
+    'admin_users_api': (2, True),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='主要读路径 HTTP 压测')
+    parser.add_argument('--users', type=int, default=50, help='普通用户数')
+    parser.add_argument('--secrets', type=int, default=None, help='注册卡密数（默认用户数的 2 倍）')
+    parser.add_argument('--materials', type=int, default=500, help='素材数')
+    parser.add_argument('--images', type=int, default=9, help='每个素材的图片数')
+    parser.add_argument('--favorites', type=int, default=20, help='每个用户的收藏数')
+    parser.add_argument('--downloads', type=int, default=20, help='每个用户的下载记录数')
+    parser.add_argument('--remixes', type=int, default=5, help='每个用户的二创作品数')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发会话数（含一个管理员会话）')
+    parser.add_argument('--duration', type=float, default=20, help='压测时长（秒）')
+    parser.add_argument('--warmup', type=int, default=2, help='每个会话正式计时前预热的请求数')
+    parser.add_argument('--only', default=None, help='只运行指定场景（逗号分隔，见 SCENARIOS）')
+    parser.add_argument('--database-url', default=None, help='使用已有数据库（默认临时 SQLite）')
+    parser.add_argument('--redis', default=None, help='使用本地 Redis（如 redis://localhost:6379/15），默认进程内缓存')
+    parser.add_argument('--rate-limit', action='store_true', help='保留接口限流（默认关闭）')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    parser.add_argument('--output', default=None, help='结果 JSON 文件（默认打印到标准输出）')
+    parser.add_argument('--baseline', default=None, help='上次的结果 JSON，打印 p50 / p95 / SQL 条数对比')
+    return parser.parse_args()
+
+
+def configure_environment(args, workdir):
+    """导入 app 之前设置环境变量"""
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(workdir, 'benchmark.db')
+    os.environ['REDIS_URL'] = args.redis or 'memory://'
+    os.environ['CELERY_BROKER_URL'] = args.redis or 'memory://'
+    os.environ['CELERY_RESULT_BACKEND'] = args.redis or 'cache+memory://'
+    os.environ['STORAGE_LOCAL_ROOT'] = os.path.join(workdir, 'uploads')
+    if not args.rate_limit:
+        os.environ['RATELIMIT_ENABLED'] = 'False'
+
+
+# ---------- 统计 ----------
+
+class Recorder:
+    """按场景记录延迟、SQL 条数和状态码"""
+
+    def __init__(self):
+        self.latency = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.lock = threading.Lock()
+
+    def add(self, name, elapsed, queries, status):
+        with self.lock:
+            self.latency[name].append(elapsed)
+            self.queries[name].append(queries)
+            self.status[name][status] += 1
+            # 304 为 ETag 命中，属于正常响应
+            if status >= 400:
+                self.errors[name] += 1
+
+
+class QueryCounter:
+    """按线程统计 SQL 条数（test_client 的请求在调用线程中执行）"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def install(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        @event.listens_for(Engine, 'before_cursor_execute')
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def summarize(name, recorder, elapsed):
+    """单个场景的统计（延迟为毫秒）"""
+    from app.utils.circuit_breaker import percentile
+
+    values = recorder.latency[name]
+    if not values:
+        return {'count': 0}
+    queries = recorder.queries[name]
+    return {
+        'count': len(values),
+        'errors': recorder.errors[name],
+        'status': {str(code): count for code, count in sorted(recorder.status[name].items())},
+        'throughput_per_second': round(len(values) / elapsed, 2) if elapsed else 0,
+        'mean': round(sum(values) / len(values) * 1000, 2),
+        'p50': round(percentile(values, 0.5) * 1000, 2),
+        'p95': round(percentile(values, 0.95) * 1000, 2),
+        'p99': round(percentile(values, 0.99) * 1000, 2),
+        'max': round(max(values) * 1000, 2),
+        'queries_mean': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries)
+    }
+
+
+# ---------- 负载 ----------
+
+def build_request(name, rng, dataset):
+    """生成场景对应的 URL"""
+    material_ids = dataset['material_ids']
+    page = rng.randint(1, 5)
+    if name == 'index':
+        return '/'
+    if name == 'material_detail':
+        return f'/material/{rng.choice(material_ids)}'
+    if name.startswith('latest_') and name != 'latest_search':
+        return f"/api/latest-materials?sort={name[len('latest_'):]}&page={page}"
+    if name == 'latest_search':
+        sort = rng.choice(['created_at', 'view', 'favorite', 'download'])
+        return f'/api/latest-materials?sort={sort}&page={rng.randint(1, 2)}&search={rng.choice(SEARCH_TERMS)}'
+    if name == 'my_materials':
+        return '/my-materials'
+    if name == 'my_materials_api_my':
+        return '/api/my-materials/my'
+    if name == 'my_materials_api_favorite':
+        return '/api/my-materials/favorite'
+    if name == 'admin_materials':
+        return '/admin/materials'
+    if name == 'admin_materials_api':
+        return f'/admin/api/materials?page={page}&search={rng.choice(["", "", rng.choice(SEARCH_TERMS)])}'
+    if name == 'admin_secrets':
+        return '/admin/secrets'
+    if name == 'admin_secrets_api':
+        return f"/admin/api/secrets?status={rng.choice(['', 'unused', 'used'])}"
+    if name == 'admin_users':
+        return '/admin/users'
+    if name == 'admin_users_api':
+        return f"/admin/api/users?search={rng.choice(['', rng.choice(dataset['users'])[1]])}"
+    raise ValueError(f'未知场景: {name}')
+
+
+def login_client(app, user_id, device_id):
+    """已登录的 test_client（会话与登录时一致：用户ID + 设备ID）"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+        if device_id:
+            session['device_id'] = device_id
+    return client
+
+
+def run_session(app, counter, recorder, scenarios, dataset, user_id, device_id, args, rng, stop_at):
+    """一个会话：按权重随机访问，直到 stop_at"""
+    client = login_client(app, user_id, device_id)
+    headers = {'X-Device-ID': device_id} if device_id else {}
+    names = list(scenarios)
+    weights = [scenarios[name] for name in names]
+
+    sent = 0
+    while time.perf_counter() < stop_at:
+        name = rng.choices(names, weights)[0]
+        url = build_request(name, rng, dataset)
+        counter.reset()
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        elapsed = time.perf_counter() - started
+        queries = counter.count
+        response.close()
+        sent += 1
+        if sent > args.warmup:
+            recorder.add(name, elapsed, queries, response.status_code)
+
+
+def select_scenarios(args):
+    """按 --only 过滤场景，返回 (普通会话场景, 管理员会话场景)"""
+    names = list(SCENARIOS)
+    if args.only:
+        names = [name.strip() for name in args.only.split(',') if name.strip()]
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise SystemExit(f'未知场景: {", ".join(unknown)}（可选: {", ".join(SCENARIOS)}）')
+    user_scenarios = {name: SCENARIOS[name][0] for name in names if not SCENARIOS[name][1]}
+    admin_scenarios = {name: SCENARIOS[name][0] for name in names if SCENARIOS[name][1]}
+    return user_scenarios, admin_scenarios
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(result, baseline_path):
+    """与上次结果对比 p50 / p95 / 每请求 SQL 条数"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n对比基线 {baseline.get('commit')} -> {result.get('commit')}", file=sys.stderr)
+    for name, current in result['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous or not previous.get('count') or not current.get('count'):
+            continue
+        parts = []
+        for key in ('p50', 'p95', 'queries_mean'):
+            before, after = previous[key], current[key]
+            change = (after - before) / before * 100 if before else 0.0
+            parts.append(f'{key} {before:.1f} -> {after:.1f} ({change:+.1f}%)')
+        print(f'  {name:<28}' + '  '.join(parts), file=sys.stderr)
+
+
+def print_table(result):
+    """终端表格输出"""
+    print(f"\n{'场景':<28}{'请求':>7}{'错误':>6}{'QPS':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'SQL':>7}",
+          file=sys.stderr)
+    for name, stats in result['endpoints'].items():
+        if not stats.get('count'):
+            continue
+        print(f"{name:<28}{stats['count']:>7}{stats['errors']:>6}{stats['throughput_per_second']:>9.1f}"
+              f"{stats['p50']:>9.1f}{stats['p95']:>9.1f}{stats['p99']:>9.1f}{stats['queries_mean']:>7.1f}",
+              file=sys.stderr)
+    total = result['total']
+    print(f"{'合计':<28}{total['count']:>7}{total['errors']:>6}{total['throughput_per_second']:>9.1f}"
+          f"{total['p50']:>9.1f}{total['p95']:>9.1f}{total['p99']:>9.1f}{total['queries_mean']:>7.1f}",
+          file=sys.stderr)
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='read_benchmark_')
+    configure_environment(args, workdir)
+    user_scenarios, admin_scenarios = select_scenarios(args)
+
+    from app import create_app, db
+    from scripts.test_helpers import seed_load_dataset
+
+    app = create_app()
+    print('生成压测数据...', file=sys.stderr)
+    seeding_started = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        dataset = seed_load_dataset(users=max(args.users, 1), secrets=args.secrets, materials=args.materials,
+                                    images_per_material=args.images, favorites_per_user=args.favorites,
+                                    downloads_per_user=args.downloads, remixes_per_user=args.remixes,
+                                    seed=args.seed)
+    print(f"数据: {json.dumps(dataset['counts'], ensure_ascii=False)}"
+          f"（{time.perf_counter() - seeding_started:.1f} 秒）", file=sys.stderr)
+    if not dataset['material_ids']:
+        raise SystemExit('没有已上架素材，请增大 --materials')
+
+    counter = QueryCounter()
+    counter.install()
+    recorder = Recorder()
+
+    # 一个管理员会话访问后台列表页，其余会话为普通用户
+    sessions = []
+    if admin_scenarios:
+        admin_id, _ = dataset['admin']
+        sessions.append((admin_scenarios, admin_id, None))
+    if user_scenarios:
+        user_sessions = args.concurrency - len(sessions) if admin_scenarios else args.concurrency
+        for index in range(max(user_sessions, 1)):
+            user_id, _, device_id = dataset['users'][index % len(dataset['users'])]
+            sessions.append((user_scenarios, user_id, device_id))
+
+    print(f'{len(sessions)} 个并发会话，压测 {args.duration} 秒...', file=sys.stderr)
+    started = time.perf_counter()
+    stop_at = started + args.duration
+    threads = [threading.Thread(target=run_session, args=(app, counter, recorder, scenarios, dataset, user_id,
+                                                          device_id, args, random.Random(rng.random()), stop_at))
+               for scenarios, user_id, device_id in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    endpoints = {name: summarize(name, recorder, elapsed) for name in SCENARIOS if recorder.latency[name]}
+    total = Recorder()
+    for name in endpoints:
+        total.latency['total'] = total.latency['total'] + recorder.latency[name]
+        total.queries['total'] = total.queries['total'] + recorder.queries[name]
+        total.errors['total'] += recorder.errors[name]
+        for code, count in recorder.status[name].items():
+            total.status['total'][code] += count
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'dataset': dataset['counts'],
+        'sessions': len(sessions),
+        'elapsed_seconds': round(elapsed, 3),
+        'total': summarize('total', total, elapsed),
+        'endpoints': endpoints
+    }
+
+    print_table(result)
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'结果已写入 {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        print_comparison(result, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
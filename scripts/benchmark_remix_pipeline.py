@@ -0,0 +1,405 @@
+# ============================================================
+# benchmark_remix_pipeline.py
+#
+# 素材二创全链路基准测试脚本
+# 功能说明：
+# 1. 本地启动 DeepSeek 模拟服务（可配置延迟、抖动、错误率），不消耗真实配额
+# 2. 使用临时 SQLite 数据库，Celery 使用内存 broker（或 --redis 指定本地 Redis），
+#    worker 在本进程内以线程池运行
+# 3. N 个并发用户依次提交二创并轮询任务状态，统计各阶段耗时：
+#    - submit：提交接口耗时
+#    - queue_wait：提交完成到 worker 开始执行
+#    - llm：调用 DeepSeek 接口耗时
+#    - task_db：任务内 SQL 执行总耗时
+#    - task_run：任务执行总耗时
+#    - poll：状态查询接口耗时（以及每个任务的查询次数）
+#    - end_to_end：点击提交到轮询到完成
+#    每项输出 count / mean / p50 / p95 / p99 / max（毫秒）
+# 4. 结果输出为 JSON（含 git 提交号），--baseline 指定上次的结果文件时打印对比
+#
+# 使用方式：
+#   python scripts/benchmark_remix_pipeline.py --requests 200 --concurrency 16 --workers 8 \
+#       --llm-latency 0.8 --output results/remix_$(git rev-parse --short HEAD).json
+#   python scripts/benchmark_remix_pipeline.py --baseline results/remix_abc123.json
+# ============================================================
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# 模拟接口返回的文案（不含敏感词，长度与真实输出接近）
+STUB_COPY = ('姐妹们，最近挖到一份宝藏资料，跟着步骤做就行，每天花半小时就能上手。'
+             '适合宝妈和上班族，手机就能操作，不限时间地点。'
+             '整理了完整的方法和注意事项，新手也能看懂，先收藏起来慢慢看。'
+             '需要的宝子评论区扣1，看到都会回。')
+
+DESCRIPTION = '兼职赚钱项目，日入过千！每天1小时，提现秒到。零基础也能做，宝妈学生党都适合。评论区扣1领取资料。'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='素材二创全链路基准测试')
+    parser.add_argument('--requests', type=int, default=100, help='二创请求总数')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发用户数')
+    parser.add_argument('--workers', type=int, default=4, help='Celery worker 线程数')
+    parser.add_argument('--materials', type=int, default=50, help='素材数')
+    parser.add_argument('--images', type=int, default=20, help='每个素材的图片数')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='模拟接口的平均延迟（秒）')
+    parser.add_argument('--llm-jitter', type=float, default=0.2, help='延迟抖动（±秒）')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='模拟接口返回 500 的比例')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='状态轮询间隔（秒）')
+    parser.add_argument('--timeout', type=float, default=120, help='单个任务的最长等待（秒）')
+    parser.add_argument('--redis', default=None, help='使用本地 Redis（如 redis://localhost:6379/15），默认内存 broker')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    parser.add_argument('--output', default=None, help='结果 JSON 文件（默认打印到标准输出）')
+    parser.add_argument('--baseline', default=None, help='上次的结果 JSON，打印 p50 / p95 对比')
+    return parser.parse_args()
+
+
+# ---------- DeepSeek 模拟服务 ----------
+
+class StubDeepSeekHandler(BaseHTTPRequestHandler):
+    """兼容 OpenAI chat/completions 的模拟接口"""
+
+    latency = 0.5
+    jitter = 0.2
+    error_rate = 0.0
+    rng = random.Random(0)
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        with self.lock:
+            delay = max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0)
+            failed = self.rng.random() < self.error_rate
+        time.sleep(delay)
+
+        if failed:
+            body = json.dumps({'error': {'message': 'stub overloaded', 'type': 'server_error'}})
+            self._send(500, body)
+            return
+        body = json.dumps({
+            'id': f'chatcmpl-{int(time.time() * 1000)}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': 'deepseek-chat',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': STUB_COPY}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 300, 'completion_tokens': 120, 'total_tokens': 420}
+        }, ensure_ascii=False)
+        self._send(200, body)
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(args):
+    StubDeepSeekHandler.latency = args.llm_latency
+    StubDeepSeekHandler.jitter = args.llm_jitter
+    StubDeepSeekHandler.error_rate = args.llm_error_rate
+    StubDeepSeekHandler.rng = random.Random(args.seed)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubDeepSeekHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+# ---------- 环境与数据 ----------
+
+def configure_environment(args, stub_url, workdir):
+    """导入 app 之前设置环境变量（临时数据库、内存 broker、模拟接口）"""
+    broker = args.redis or 'memory://'
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'benchmark.db')
+    os.environ['REDIS_URL'] = args.redis or 'memory://'
+    os.environ['CELERY_BROKER_URL'] = broker
+    os.environ['CELERY_RESULT_BACKEND'] = args.redis or 'cache+memory://'
+    os.environ['DEEPSEEK_API_KEY'] = 'benchmark'
+    os.environ['DEEPSEEK_API_BASE'] = stub_url
+    os.environ['STORAGE_LOCAL_ROOT'] = os.path.join(workdir, 'uploads')
+    os.environ['RATELIMIT_ENABLED'] = 'False'
+    # 基准测试不受用户令牌桶限制
+    os.environ['REMIX_BUCKET_CAPACITY'] = str(args.requests + 1)
+    os.environ['REMIX_MEMBER_BUCKET_CAPACITY'] = str(args.requests + 1)
+    os.environ['LLM_QUEUE_MAX_WAIT'] = str(int(args.timeout))
+
+
+def seed_data(app, args):
+    """创建并发用户（绑定设备ID）和带图片的素材，返回 [(user_id, device_id)], [material_id]"""
+    from app import db
+    from app.models import User, MaterialType, Material, MaterialImage
+
+    with app.app_context():
+        db.create_all()
+        material_type = MaterialType(name='基准测试')
+        db.session.add(material_type)
+        db.session.flush()
+
+        users = []
+        for index in range(args.concurrency):
+            user = User(username=f'bench_{index}', email=f'bench_{index}@test.com',
+                        bound_device_id=f'bench-device-{index}')
+            user.password = 'Bench123!'
+            db.session.add(user)
+            users.append(user)
+
+        materials = []
+        for index in range(args.materials):
+            material = Material(title=f'基准素材 {index}', description=DESCRIPTION,
+                                material_type_id=material_type.id, is_published=True)
+            db.session.add(material)
+            materials.append(material)
+        db.session.flush()
+
+        db.session.execute(MaterialImage.__table__.insert(), [{
+            'material_id': material.id,
+            'image_url': f'/static/uploads/bench/{material.id}_{order}.jpg',
+            'is_cover': order == 0,
+            'sort_order': order
+        } for material in materials for order in range(args.images)])
+        db.session.commit()
+        return [(user.id, user.bound_device_id) for user in users], [material.id for material in materials]
+
+
+# ---------- 指标采集 ----------
+
+class Recorder:
+    """线程安全的耗时记录"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.task_started = {}
+        self.task_finished = {}
+        self.task_db = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples[name].append(seconds)
+
+    def add_task_db(self, task_id, seconds):
+        with self._lock:
+            self.task_db[task_id] += seconds
+
+
+def install_hooks(recorder):
+    """Celery 信号记录任务开始 / 结束，包装接口调用和 SQL 执行记录耗时"""
+    from celery import current_task
+    from celery.signals import task_prerun, task_postrun
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    import app.utils.material_remix as material_remix
+
+    @task_prerun.connect(weak=False)
+    def on_prerun(task_id=None, **kwargs):
+        recorder.task_started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def on_postrun(task_id=None, **kwargs):
+        recorder.task_finished[task_id] = time.perf_counter()
+
+    request_completion = material_remix._request_completion
+
+    def timed_request_completion(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return request_completion(*args, **kwargs)
+        finally:
+            recorder.add('llm', time.perf_counter() - started)
+
+    material_remix._request_completion = timed_request_completion
+
+    # 任务每次执行都会 create_app()，监听 Engine 类以覆盖所有引擎
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        # current_task 是代理对象，不在任务中时为假值
+        if current_task and current_task.request.id:
+            recorder.add_task_db(current_task.request.id, time.perf_counter() - started)
+
+
+def summarize(values):
+    """毫秒统计"""
+    from app.utils.circuit_breaker import percentile
+
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values) * 1000, 2),
+        'p50': round(percentile(values, 0.5) * 1000, 2),
+        'p95': round(percentile(values, 0.95) * 1000, 2),
+        'p99': round(percentile(values, 0.99) * 1000, 2),
+        'max': round(max(values) * 1000, 2)
+    }
+
+
+# ---------- 负载 ----------
+
+def run_client(app, recorder, user_id, device_id, material_ids, count, args, rng, outcomes):
+    """一个用户：依次提交二创并轮询到完成"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+        # 与登录时一致：会话中记录设备ID（全局设备校验）
+        session['device_id'] = device_id
+    headers = {'X-Device-ID': device_id}
+
+    for _ in range(count):
+        material_id = rng.choice(material_ids)
+        clicked = time.perf_counter()
+        response = client.post(f'/api/material/{material_id}/remix',
+                               headers=dict(headers, **{'Idempotency-Key': f'{user_id}-{clicked}'}))
+        submitted = time.perf_counter()
+        recorder.add('submit', submitted - clicked)
+        result = response.get_json(silent=True) or {}
+        if response.status_code != 200 or not result.get('success'):
+            outcomes['rejected'] += 1
+            continue
+
+        task_id = result['task_id']
+        polls = 0
+        poll = {}
+        status = None
+        deadline = clicked + args.timeout
+        while time.perf_counter() < deadline:
+            time.sleep(args.poll_interval)
+            started = time.perf_counter()
+            poll = client.get(f'/api/task/{task_id}/status').get_json(silent=True) or {}
+            recorder.add('poll', time.perf_counter() - started)
+            polls += 1
+            status = poll.get('status')
+            if status in ('SUCCESS', 'FAILURE'):
+                break
+
+        recorder.add('polls_per_task', polls)
+        if status == 'SUCCESS' and (poll.get('result') or {}).get('success'):
+            outcomes['succeeded'] += 1
+            recorder.add('end_to_end', time.perf_counter() - clicked)
+            started = recorder.task_started.get(task_id)
+            finished = recorder.task_finished.get(task_id)
+            if started is not None:
+                recorder.add('queue_wait', started - submitted)
+            if started is not None and finished is not None:
+                recorder.add('task_run', finished - started)
+            recorder.add('task_db', recorder.task_db.get(task_id, 0.0))
+        else:
+            outcomes['failed' if status == 'FAILURE' else 'timeout'] += 1
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(result, baseline_path):
+    """与上次结果对比 p50 / p95"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n对比基线 {baseline.get('commit')} -> {result.get('commit')}", file=sys.stderr)
+    for name, current in result['metrics'].items():
+        previous = baseline.get('metrics', {}).get(name)
+        if not previous or not previous.get('count') or not current.get('count'):
+            continue
+        parts = []
+        for key in ('p50', 'p95'):
+            before, after = previous[key], current[key]
+            change = (after - before) / before * 100 if before else 0.0
+            parts.append(f'{key} {before:.1f} -> {after:.1f} ({change:+.1f}%)')
+        print(f'  {name:<16}' + '  '.join(parts), file=sys.stderr)
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='remix_benchmark_')
+    server, stub_url = start_stub_server(args)
+    configure_environment(args, stub_url, workdir)
+
+    from celery.contrib.testing.worker import start_worker
+    from celery_config import celery_app
+    from app import create_app
+    import app.tasks  # noqa: F401  注册任务
+
+    app = create_app()
+    users, material_ids = seed_data(app, args)
+    recorder = Recorder()
+    install_hooks(recorder)
+
+    per_client = [args.requests // len(users) + (1 if index < args.requests % len(users) else 0)
+                  for index in range(len(users))]
+    outcomes = defaultdict(int)
+
+    print(f'模拟接口 {stub_url}，{args.requests} 个请求，{args.concurrency} 个并发用户，'
+          f'{args.workers} 个 worker 线程', file=sys.stderr)
+    with start_worker(celery_app, pool='threads', concurrency=args.workers,
+                      perform_ping_check=False, loglevel='WARNING'):
+        started = time.perf_counter()
+        threads = [threading.Thread(target=run_client, args=(app, recorder, user_id, device_id, material_ids,
+                                                             count, args, random.Random(rng.random()), outcomes))
+                   for (user_id, device_id), count in zip(users, per_client)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    metrics = {name: summarize(recorder.samples[name])
+               for name in ('submit', 'queue_wait', 'llm', 'task_db', 'task_run', 'poll', 'end_to_end')}
+    polls = recorder.samples['polls_per_task']
+    result = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_per_second': round(outcomes['succeeded'] / elapsed, 2) if elapsed else 0,
+        'outcomes': dict(outcomes),
+        'polls': {'total': int(sum(polls)), 'per_task_mean': round(sum(polls) / len(polls), 2) if polls else 0,
+                  'per_second': round(sum(polls) / elapsed, 2) if elapsed else 0},
+        'metrics': metrics
+    }
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'结果已写入 {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        print_comparison(result, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
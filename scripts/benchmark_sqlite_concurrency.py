@@ -0,0 +1,196 @@
+# ============================================================
+# benchmark_sqlite_concurrency.py
+#
+# SQLite 并发读写基准测试脚本
+# 功能说明：
+# 1. 用项目模型建立独立的 SQLite 测试库（素材 + 用户）
+# 2. 多进程模拟线上负载：
+#    - 读进程：分页查询素材列表、素材详情（首页 / 详情页）
+#    - 计数进程：UPDATE materials SET view_count = view_count + 1（浏览计数）
+#    - 插入进程：INSERT user_materials（Celery 二创任务写入）
+# 3. 分别在默认配置（stock）和调优配置（tuned，WAL + busy_timeout 等）下运行
+# 4. 输出每种配置的读写吞吐量和 database is locked 错误数
+#
+# 使用方式：
+#   python scripts/benchmark_sqlite_concurrency.py --readers 8 --writers 4 --inserters 2 --duration 10
+# ============================================================
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import argparse
+import multiprocessing
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from app.utils.db_engine import sqlite_pragmas, apply_sqlite_pragmas
+
+MATERIAL_COUNT = 500
+
+# 默认 Config 中的 SQLite 调优参数
+TUNED_CONFIG = {
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'SQLITE_BUSY_TIMEOUT': 5000,
+    'SQLITE_CACHE_SIZE': -64000,
+    'SQLITE_MMAP_SIZE': 256 * 1024 * 1024
+}
+
+
+def prepare_database(db_path):
+    """用项目模型建表并写入测试数据"""
+    from app import create_app, db, Config
+    from app.models import User, Material
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='bench_user', email='bench@example.com', password_hash='x'))
+        db.session.add_all([
+            Material(title=f'基准测试素材 {i}', description='基准测试文案' * 20)
+            for i in range(MATERIAL_COUNT)
+        ])
+        db.session.commit()
+        db.engine.dispose()
+
+    # 恢复为默认日志模式，保证 stock 配置从 DELETE 模式开始
+    engine = create_engine(f'sqlite:///{db_path}')
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode=DELETE')
+    engine.dispose()
+
+
+def make_engine(db_path, mode, stock_timeout):
+    """创建引擎：stock 为驱动默认设置，tuned 为 db_engine 中的调优设置"""
+    if mode == 'stock':
+        return create_engine(f'sqlite:///{db_path}', connect_args={'timeout': stock_timeout})
+
+    engine = create_engine(f'sqlite:///{db_path}', connect_args={
+        'timeout': TUNED_CONFIG['SQLITE_BUSY_TIMEOUT'] / 1000
+    })
+    pragmas = sqlite_pragmas(TUNED_CONFIG)
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+def worker(role, db_path, mode, stock_timeout, duration, seed, result_queue):
+    """单个压测进程，返回 (角色, 成功次数, 锁错误次数, 其他错误次数)"""
+    engine = make_engine(db_path, mode, stock_timeout)
+    done = locked = failed = 0
+    i = seed
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        i += 1
+        material_id = i % MATERIAL_COUNT + 1
+        try:
+            with engine.begin() as conn:
+                if role == 'reader':
+                    conn.execute(text(
+                        'SELECT id, title, view_count FROM materials '
+                        'ORDER BY created_at DESC LIMIT 8 OFFSET :offset'
+                    ), {'offset': (i % 50) * 8}).fetchall()
+                    conn.execute(text('SELECT * FROM materials WHERE id = :id'), {'id': material_id}).fetchone()
+                elif role == 'writer':
+                    conn.execute(text(
+                        'UPDATE materials SET view_count = view_count + 1 WHERE id = :id'
+                    ), {'id': material_id})
+                else:
+                    now = datetime.utcnow()
+                    conn.execute(text(
+                        'INSERT INTO user_materials (user_id, original_material_id, title, description, '
+                        'view_count, download_count, created_at) VALUES (1, :mid, :title, :desc, 0, 0, :now)'
+                    ), {'mid': material_id, 'title': f'二创 {i}', 'desc': '二创文案' * 20, 'now': now})
+            done += 1
+        except OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                locked += 1
+            else:
+                failed += 1
+
+    engine.dispose()
+    result_queue.put((role, done, locked, failed))
+
+
+def run_mode(db_path, mode, args):
+    result_queue = multiprocessing.Queue()
+    roles = ['reader'] * args.readers + ['writer'] * args.writers + ['inserter'] * args.inserters
+    processes = [
+        multiprocessing.Process(
+            target=worker,
+            args=(role, db_path, mode, args.stock_timeout, args.duration, index * 7919, result_queue)
+        )
+        for index, role in enumerate(roles)
+    ]
+    for p in processes:
+        p.start()
+    results = [result_queue.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    summary = {}
+    for role, done, locked, failed in results:
+        item = summary.setdefault(role, [0, 0, 0])
+        item[0] += done
+        item[1] += locked
+        item[2] += failed
+    return summary
+
+
+def run_benchmark(args):
+    print('=' * 78)
+    print(f'SQLite 并发读写基准测试  读={args.readers} 计数={args.writers} 插入={args.inserters}  '
+          f'时长={args.duration}s')
+    print('=' * 78)
+
+    # Config 在导入时读取 DATABASE_URL，因此只建一次模板库，每种配置使用一份副本
+    work_dir = tempfile.mkdtemp(prefix='sqlite_bench_')
+    template_path = os.path.join(work_dir, 'template.db')
+    rows = []
+    try:
+        prepare_database(template_path)
+        for mode in ('stock', 'tuned'):
+            db_path = os.path.join(work_dir, f'{mode}.db')
+            shutil.copyfile(template_path, db_path)
+            print(f'\n运行 {mode} 配置...')
+            summary = run_mode(db_path, mode, args)
+
+            for role in ('reader', 'writer', 'inserter'):
+                if role in summary:
+                    done, locked, failed = summary[role]
+                    rows.append((mode, role, done, done / args.duration, locked, failed))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print('\n' + '=' * 78)
+    print(f'{"配置":<8} {"角色":<10} {"成功":>8} {"吞吐(次/s)":>12} {"locked":>8} {"其他错误":>8}')
+    for mode, role, done, rate, locked, failed in rows:
+        print(f'{mode:<8} {role:<10} {done:>8} {rate:>12.1f} {locked:>8} {failed:>8}')
+    print('=' * 78)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SQLite 并发读写基准测试')
+    parser.add_argument('--readers', type=int, default=8, help='读进程数')
+    parser.add_argument('--writers', type=int, default=4, help='计数更新进程数')
+    parser.add_argument('--inserters', type=int, default=2, help='插入进程数')
+    parser.add_argument('--duration', type=int, default=10, help='每种配置的压测时长（秒）')
+    parser.add_argument('--stock-timeout', type=float, default=5.0,
+                        help='stock 配置下 sqlite3 驱动的锁等待秒数（驱动默认 5 秒）')
+    args = parser.parse_args()
+
+    run_benchmark(args)
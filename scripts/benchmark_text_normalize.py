@@ -0,0 +1,131 @@
+# ============================================================
+# benchmark_text_normalize.py
+#
+# 文案清洗与敏感词扫描基准测试脚本
+# 功能说明：
+# 1. 构造 N 条带表情、全角字符和敏感词的文案（默认 10000 条）
+# 2. 对比旧版 sanitize_copy（每次调用内联正则）与 text_normalize.sanitize_copy 的耗时
+# 3. 对比逐词 in 查找 / 正则多选 / Aho-Corasick 三种敏感词扫描的耗时和结果
+# 4. 验证分块增量扫描与整段扫描的结果一致
+#
+# 使用方式：
+#   python scripts/benchmark_text_normalize.py --count 10000 --chunk 16
+# ============================================================
+
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.text_normalize import sanitize_copy, banned_word_scanner, BANNED_WORDS
+
+PHRASES = ['宝子们看过来', '这套资料真的绝了', '每天花半小时就能上手', '适合宝妈和上班族',
+           '跟着步骤做就行', '评论区扣1领取', '不限时间地点', '手机就能操作']
+NOISE = ['[火]', '[哈哈]', ':fire:', ':ok_hand:', '@EMOJI@', '@EMOJI@@VS@', 'ＡＢＣ１２３', '@IDSP@', '  ']
+EMOJI = [chr(0x1F525), chr(0x1F4AA), chr(0x2764) + chr(0xFE0F), chr(0x1F469) + chr(0x200D) + chr(0x1F4BB), chr(0x2B50)]
+
+
+def legacy_sanitize_copy(text):
+    """旧版实现（每次调用内联正则），作为对照"""
+    if not text:
+        return text
+    text = re.sub(r'\[(?:[A-Za-z0-9_\u4e00-\u9fff]{1,8})\]', '', text)
+    text = re.sub(r':[A-Za-z0-9_+\-]{1,30}:', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+([，。；；、,.!！?？])', r'\1', text)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    return text.strip()
+
+
+def build_texts(count):
+    """构造测试文案（约 200~300 字）"""
+    texts = []
+    for _ in range(count):
+        parts = []
+        while sum(len(part) for part in parts) < 220:
+            parts.append(random.choice(PHRASES))
+            roll = random.random()
+            if roll < 0.3:
+                parts.append(random.choice(BANNED_WORDS))
+            elif roll < 0.6:
+                noise = random.choice(NOISE)
+                noise = noise.replace('@EMOJI@', random.choice(EMOJI)).replace('@VS@', chr(0xFE0F))
+                parts.append(noise.replace('@IDSP@', chr(0x3000)))
+            parts.append(random.choice(['，', '。', '！', ' ,', '\n']))
+        texts.append(''.join(parts))
+    return texts
+
+
+def naive_scan(text):
+    result = []
+    for word in BANNED_WORDS:
+        start = text.find(word)
+        while start != -1:
+            result.append((start, word))
+            start = text.find(word, start + 1)
+    return sorted(result)
+
+
+_ALTERNATION_RE = re.compile('|'.join(map(re.escape, BANNED_WORDS)))
+
+
+def regex_scan(text):
+    return [(m.start(), m.group()) for m in _ALTERNATION_RE.finditer(text)]
+
+
+def stream_scan(text, chunk):
+    stream = banned_word_scanner.stream()
+    for start in range(0, len(text), chunk):
+        stream.feed(text[start:start + chunk])
+    return stream.matches
+
+
+def time_all(func, texts):
+    """返回 (总耗时毫秒, 结果列表)"""
+    start = time.perf_counter()
+    results = [func(text) for text in texts]
+    return (time.perf_counter() - start) * 1000, results
+
+
+def run_benchmark(count, chunk):
+    texts = build_texts(count)
+    total_chars = sum(len(text) for text in texts)
+
+    print('=' * 70)
+    print('文案清洗与敏感词扫描基准测试')
+    print(f'文案 {count} 条，共 {total_chars} 字，敏感词 {len(BANNED_WORDS)} 个')
+    print('=' * 70)
+
+    legacy_ms, _ = time_all(legacy_sanitize_copy, texts)
+    new_ms, cleaned = time_all(sanitize_copy, texts)
+    leftover = sum(1 for text in cleaned if any(ord(char) >= 0x1F000 or char == chr(0xFE0F) for char in text))
+    print(f'\n【清洗】')
+    print(f'旧版 sanitize_copy（不含 Unicode 表情）: {legacy_ms:8.1f} ms')
+    print(f'text_normalize.sanitize_copy:           {new_ms:8.1f} ms')
+    print(f'清洗后仍含 Unicode 表情的文案: {leftover} 条')
+
+    print(f'\n【敏感词扫描】')
+    naive_ms, naive = time_all(naive_scan, texts)
+    regex_ms, regex = time_all(regex_scan, texts)
+    ac_ms, ac = time_all(lambda text: sorted(banned_word_scanner.find(text)), texts)
+    stream_ms, streamed = time_all(lambda text: sorted(stream_scan(text, chunk)), texts)
+    print(f'逐词 str.find:                 {naive_ms:8.1f} ms')
+    print(f'正则多选:                      {regex_ms:8.1f} ms')
+    print(f'Aho-Corasick 整段:             {ac_ms:8.1f} ms')
+    print(f'Aho-Corasick 分块({chunk} 字/块):  {stream_ms:8.1f} ms')
+    hits = sum(len(result) for result in ac)
+    print(f'命中 {hits} 处；结果一致: 逐词={naive == ac} 正则={regex == ac} 分块={streamed == ac}')
+    print('\n' + '=' * 70)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='文案清洗与敏感词扫描基准测试')
+    parser.add_argument('--count', type=int, default=10000, help='文案条数')
+    parser.add_argument('--chunk', type=int, default=16, help='分块扫描时每块的字数（模拟流式输出）')
+    args = parser.parse_args()
+
+    random.seed(42)
+    run_benchmark(args.count, args.chunk)
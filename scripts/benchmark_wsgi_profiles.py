@@ -0,0 +1,246 @@
+# ============================================================
+# benchmark_wsgi_profiles.py
+#
+# Gunicorn 工作模式基准测试脚本
+# 功能说明：
+# 1. 准备独立的 SQLite 测试库（测试用户 + 素材数据）
+# 2. 依次以 sync / gthread / gevent 模式启动 gunicorn（gunicorn_config.py + wsgi:app）
+# 3. 登录后用多线程并发请求热点接口：
+#    - /api/latest-materials       首页素材列表
+#    - /material/<id>              素材详情页
+#    - /api/task/<id>/status       任务状态轮询（需要 Redis 结果后端）
+# 4. 输出每种模式的吞吐量（req/s）、P50 / P95 延迟和错误数
+#
+# 使用方式：
+#   python scripts/benchmark_wsgi_profiles.py --profiles sync,gthread,gevent --concurrency 32 --duration 15
+#   python scripts/benchmark_wsgi_profiles.py --endpoints latest,detail        # 没有 Redis 时跳过任务状态
+#
+# 注意：
+#   - gevent 模式需要先安装 gevent（pip install gevent）
+#   - 压测期间通过 RATELIMIT_ENABLED=False 关闭限流
+# ============================================================
+
+import sys
+import os
+import time
+import shutil
+import signal
+import tempfile
+import argparse
+import subprocess
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+TEST_USERNAME = 'bench_user'
+TEST_PASSWORD = 'Bench@123456'
+TEST_DEVICE_ID = 'bench-device-0001'
+MATERIAL_COUNT = 40
+
+
+def prepare_database(db_path):
+    """创建测试库并写入测试用户和素材"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from app import create_app, db
+    from app.models import User, Material, MaterialImage, MaterialType
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+        user = User(username=TEST_USERNAME, email='bench@example.com')
+        user.password = TEST_PASSWORD
+        db.session.add(user)
+
+        material_type = MaterialType(name='基准测试')
+        db.session.add(material_type)
+        db.session.flush()
+
+        for i in range(MATERIAL_COUNT):
+            material = Material(
+                title=f'基准测试素材 {i + 1}',
+                description='这是一段用于基准测试的素材文案。' * 10,
+                material_type_id=material_type.id,
+                is_published=True
+            )
+            db.session.add(material)
+            db.session.flush()
+            for j in range(4):
+                db.session.add(MaterialImage(
+                    material_id=material.id,
+                    image_url=f'/static/uploads/bench_{i}_{j}.jpg',
+                    is_cover=(j == 0),
+                    sort_order=j
+                ))
+
+        db.session.commit()
+        return [m.id for m in Material.query.order_by(Material.id).all()]
+
+
+def start_gunicorn(profile, port, env):
+    """以指定工作模式启动 gunicorn，等待端口可用"""
+    env = dict(env, GUNICORN_PROFILE=profile, GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_ACCESS_LOG='/dev/null', GUNICORN_LOG_LEVEL='warning')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', 'wsgi:app'],
+        cwd=PROJECT_ROOT, env=env
+    )
+
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn ({profile}) 启动失败，退出码 {process.returncode}')
+        try:
+            requests.get(f'{base_url}/auth/login', timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+
+    stop_gunicorn(process)
+    raise RuntimeError(f'gunicorn ({profile}) 启动超时')
+
+
+def stop_gunicorn(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def login(base_url):
+    """登录并绑定设备，返回带会话 Cookie 的 Session"""
+    session = requests.Session()
+    session.cookies.set('device_id', TEST_DEVICE_ID)
+    session.headers['X-Device-ID'] = TEST_DEVICE_ID
+    resp = session.post(f'{base_url}/auth/api/login', json={
+        'username_or_email': TEST_USERNAME,
+        'password': TEST_PASSWORD,
+        'device_id': TEST_DEVICE_ID
+    }, timeout=10)
+    if not resp.ok or not resp.json().get('success'):
+        raise RuntimeError(f'登录失败: {resp.status_code} {resp.text[:200]}')
+    return session
+
+
+def build_paths(endpoints, material_ids):
+    """生成热点接口路径（按轮询方式使用）"""
+    paths = []
+    if 'latest' in endpoints:
+        paths.extend(f'/api/latest-materials?page={p}&per_page=8' for p in range(1, 4))
+    if 'detail' in endpoints:
+        paths.extend(f'/material/{mid}' for mid in material_ids[:10])
+    if 'task' in endpoints:
+        paths.extend(f'/api/task/bench-task-{i}/status' for i in range(5))
+    return paths
+
+
+def run_load(base_url, cookies, paths, concurrency, duration):
+    """并发压测，返回延迟列表（毫秒）、错误数和实际耗时"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        session = requests.Session()
+        session.cookies.update(cookies)
+        session.headers['X-Device-ID'] = TEST_DEVICE_ID
+        local_latencies = []
+        local_errors = 0
+        i = index
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                resp = session.get(base_url + path, timeout=30, allow_redirects=False)
+                if resp.status_code != 200:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def run_benchmark(args):
+    work_dir = tempfile.mkdtemp(prefix='wsgi_bench_')
+    db_path = os.path.join(work_dir, 'bench.db')
+    material_ids = prepare_database(db_path)
+
+    # 压测时关闭限流，否则默认限额会让大部分请求返回 429
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', RATELIMIT_ENABLED='False')
+    paths = build_paths(args.endpoints.split(','), material_ids)
+    results = []
+
+    print('=' * 78)
+    print(f'Gunicorn 工作模式基准测试  并发={args.concurrency}  时长={args.duration}s  接口数={len(paths)}')
+    print('=' * 78)
+
+    try:
+        for offset, profile in enumerate(args.profiles.split(',')):
+            print(f'\n启动 {profile} 模式...')
+            try:
+                process, base_url = start_gunicorn(profile, args.port + offset, env)
+            except RuntimeError as e:
+                print(f'  跳过: {e}')
+                continue
+
+            try:
+                cookies = login(base_url).cookies
+                # 预热
+                run_load(base_url, cookies, paths, min(args.concurrency, 4), 2)
+                latencies, errors, elapsed = run_load(base_url, cookies, paths, args.concurrency, args.duration)
+            finally:
+                stop_gunicorn(process)
+
+            results.append({
+                'profile': profile,
+                'requests': len(latencies),
+                'rps': len(latencies) / elapsed if elapsed else 0,
+                'p50': statistics.median(latencies) if latencies else 0,
+                'p95': percentile(latencies, 95),
+                'errors': errors
+            })
+            print(f'  完成: {len(latencies)} 个请求，{errors} 个错误')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print('\n' + '=' * 78)
+    print(f'{"模式":<10} {"请求数":>8} {"吞吐(req/s)":>12} {"P50(ms)":>10} {"P95(ms)":>10} {"错误":>6}')
+    for r in results:
+        print(f'{r["profile"]:<10} {r["requests"]:>8} {r["rps"]:>12.1f} '
+              f'{r["p50"]:>10.1f} {r["p95"]:>10.1f} {r["errors"]:>6}')
+    print('=' * 78)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gunicorn 工作模式基准测试')
+    parser.add_argument('--profiles', default='sync,gthread,gevent', help='工作模式，逗号分隔')
+    parser.add_argument('--endpoints', default='latest,detail,task', help='压测接口：latest,detail,task')
+    parser.add_argument('--concurrency', type=int, default=32, help='并发线程数')
+    parser.add_argument('--duration', type=int, default=15, help='每种模式的压测时长（秒）')
+    parser.add_argument('--port', type=int, default=5100, help='起始端口（每种模式依次 +1）')
+    args = parser.parse_args()
+
+    run_benchmark(args)
@@ -0,0 +1,89 @@
+# ============================================================
+# migrate_add_indexes.py
+#
+# 补充数据库索引迁移脚本
+# 功能说明：
+# 1. 为高频过滤字段添加索引：
+#    - user_materials.user_id / user_material_images.user_material_id
+#    - user_downloads.user_id / material_id / user_material_id
+#    - material_images.material_id
+#    - register_secrets.user_id / terminal_secrets.user_id
+#    - materials.is_published / users.created_at
+# 2. 索引定义以模型为准（index=True），已存在的索引自动跳过
+# 3. 创建完成后执行 ANALYZE，让查询优化器使用新索引
+#
+# 注意：user_favorites.user_id 已由 (user_id, material_id) 唯一约束的最左前缀覆盖，无需单独建索引
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+import app.models  # noqa: F401  确保所有模型已注册到 metadata
+
+# 本次迁移新增的索引（名称与 SQLAlchemy 默认命名 ix_<表名>_<字段名> 一致）
+NEW_INDEXES = [
+    'ix_user_materials_user_id',
+    'ix_user_material_images_user_material_id',
+    'ix_user_downloads_user_id',
+    'ix_user_downloads_material_id',
+    'ix_user_downloads_user_material_id',
+    'ix_material_images_material_id',
+    'ix_register_secrets_user_id',
+    'ix_terminal_secrets_user_id',
+    'ix_materials_is_published',
+    'ix_users_created_at'
+]
+
+
+def migrate_add_indexes():
+    """根据模型定义创建缺失的索引"""
+    app = create_app()
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            indexes = {
+                index.name: index
+                for table in db.metadata.sorted_tables
+                for index in table.indexes
+            }
+
+            created = 0
+            for name in NEW_INDEXES:
+                index = indexes.get(name)
+                if index is None:
+                    print(f'⚠️ 模型中未定义索引 {name}，跳过')
+                    continue
+
+                table_name = index.table.name
+                if not inspector.has_table(table_name):
+                    print(f'ℹ️ 表 {table_name} 不存在，跳过 {name}')
+                    continue
+
+                existing = {ix['name'] for ix in inspector.get_indexes(table_name)}
+                if name in existing:
+                    print(f'ℹ️ 索引 {name} 已存在，无需添加')
+                    continue
+
+                index.create(bind=db.engine)
+                created += 1
+                print(f'✅ 索引 {name} 创建成功（{table_name}.{", ".join(c.name for c in index.columns)}）')
+
+            if created and db.engine.dialect.name in ('sqlite', 'postgresql'):
+                with db.engine.connect() as conn:
+                    conn.execute(db.text('ANALYZE'))
+                    conn.commit()
+                print('✅ 已更新统计信息（ANALYZE）')
+
+            print(f'🎉 索引迁移完成！新增 {created} 个索引')
+
+        except Exception as e:
+            print(f'❌ 迁移失败: {str(e)}')
+            import traceback
+            traceback.print_exc()
+
+
+if __name__ == '__main__':
+    migrate_add_indexes()
@@ -0,0 +1,55 @@
+# ============================================================
+# migrate_material_content_hash.py
+#
+# 素材内容哈希迁移脚本
+# 功能说明：
+# 1. 为 materials 添加 content_hash 字段（批量导入时图片 + 文案的 SHA-256）
+# 2. 创建 content_hash 唯一索引（导入时跳过内容相同的目录）
+# 3. 已存在的字段和索引自动跳过，历史素材的 content_hash 为空
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Material
+
+
+def migrate_material_content_hash():
+    """添加素材内容哈希字段和唯一索引"""
+    app = create_app()
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            table_name = Material.__tablename__
+
+            columns = [col['name'] for col in inspector.get_columns(table_name)]
+            if 'content_hash' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN content_hash VARCHAR(64)'))
+                    conn.commit()
+                print(f'✅ {table_name}.content_hash 字段添加成功！')
+            else:
+                print(f'ℹ️ {table_name}.content_hash 字段已存在，无需添加')
+
+            index_name = f'ix_{table_name}_content_hash'
+            existing = {ix['name'] for ix in db.inspect(db.engine).get_indexes(table_name)}
+            if index_name not in existing:
+                index = next(ix for ix in Material.__table__.indexes if ix.name == index_name)
+                index.create(bind=db.engine)
+                print(f'✅ 唯一索引 {index_name} 创建成功！')
+            else:
+                print(f'ℹ️ 索引 {index_name} 已存在，无需添加')
+
+            print('🎉 素材内容哈希迁移完成！')
+
+        except Exception as e:
+            print(f'❌ 迁移失败: {str(e)}')
+            import traceback
+            traceback.print_exc()
+
+
+if __name__ == '__main__':
+    migrate_material_content_hash()
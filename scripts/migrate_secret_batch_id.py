@@ -0,0 +1,60 @@
+# ============================================================
+# migrate_secret_batch_id.py
+#
+# 卡密批次号迁移脚本
+# 功能说明：
+# 1. 为 register_secrets / terminal_secrets 添加 batch_id 字段（批量生成的批次号）
+# 2. 创建 batch_id 索引（按批次导出卡密时使用）
+# 3. 已存在的字段和索引自动跳过，历史卡密的 batch_id 为空
+# ============================================================
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import RegisterSecret, TerminalSecret
+
+
+def migrate_secret_batch_id():
+    """添加卡密批次号字段和索引"""
+    app = create_app()
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+
+            for model in (RegisterSecret, TerminalSecret):
+                table_name = model.__tablename__
+                if not inspector.has_table(table_name):
+                    print(f'ℹ️ 表 {table_name} 不存在，跳过')
+                    continue
+
+                columns = [col['name'] for col in inspector.get_columns(table_name)]
+                if 'batch_id' not in columns:
+                    with db.engine.connect() as conn:
+                        conn.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN batch_id VARCHAR(32)'))
+                        conn.commit()
+                    print(f'✅ {table_name}.batch_id 字段添加成功！')
+                else:
+                    print(f'ℹ️ {table_name}.batch_id 字段已存在，无需添加')
+
+                index_name = f'ix_{table_name}_batch_id'
+                existing = {ix['name'] for ix in db.inspect(db.engine).get_indexes(table_name)}
+                if index_name not in existing:
+                    index = next(ix for ix in model.__table__.indexes if ix.name == index_name)
+                    index.create(bind=db.engine)
+                    print(f'✅ 索引 {index_name} 创建成功！')
+                else:
+                    print(f'ℹ️ 索引 {index_name} 已存在，无需添加')
+
+            print('🎉 卡密批次号迁移完成！')
+
+        except Exception as e:
+            print(f'❌ 迁移失败: {str(e)}')
+            import traceback
+            traceback.print_exc()
+
+
+if __name__ == '__main__':
+    migrate_secret_batch_id()
@@ -5,6 +5,8 @@
 # 功能说明：
 # 1. 初始化统计相关配置（总创作数、总下载数）
 # 2. 可以从现有数据中统计历史数据
+# 3. 创建每日统计汇总表 daily_stats，并从现有数据回填历史
+#    （之后由 celery beat 定时任务 rollup_daily_stats 增量维护）
 # ============================================================
 
 import sys
@@ -14,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
 from app.models import Config
+from app.utils.statistics import backfill
 
 
 def init_statistics_config():
@@ -50,12 +53,18 @@ def init_statistics_config():
         )
         print(f'   ✓ 已设置 total_download_count = 0')
         
+        # 3. 回填每日统计汇总表（db.create_all 已创建 daily_stats 表）
+        print('\n3. 回填每日统计 daily_stats:')
+        days = backfill(echo=lambda message: print(f'   {message}'))
+        print(f'   ✓ 共汇总 {days} 天')
+        
         print('\n' + '=' * 60)
         print('统计配置初始化完成！')
         print('=' * 60)
         print(f'\n配置项:')
         print(f'  - total_remix_count: 0')
         print(f'  - total_download_count: 0')
+        print(f'  - daily_stats: {days} 天')
 
 
 if __name__ == '__main__':
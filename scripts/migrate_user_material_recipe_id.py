@@ -0,0 +1,89 @@
+# ============================================================
+# migrate_user_material_recipe_id.py
+#
+# 二创图片 CSS 配方迁移脚本
+# 功能说明：
+# 1. 为 user_material_images 添加 css_recipe_id 字段（代码内配方表的编号）
+# 2. 把旧数据 css_recipe 中的 JSON 转换为配方 ID，转换成功后清空 css_recipe
+#    - 按主键分批处理（每批一条 executemany UPDATE），可重复执行
+#    - 不在配方表中的配方保留 JSON，页面照常渲染
+# 3. 已存在的字段自动跳过
+# ============================================================
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import UserMaterialImage
+from app.utils.recipe_engine import recipe_to_id
+
+# 每批处理的行数
+BATCH_SIZE = 1000
+
+
+def migrate_user_material_recipe_id():
+    """添加配方ID字段并转换旧数据"""
+    app = create_app()
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            table_name = UserMaterialImage.__tablename__
+
+            columns = [col['name'] for col in inspector.get_columns(table_name)]
+            if 'css_recipe_id' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN css_recipe_id BIGINT'))
+                    conn.commit()
+                print(f'✅ {table_name}.css_recipe_id 字段添加成功！')
+            else:
+                print(f'ℹ️ {table_name}.css_recipe_id 字段已存在，无需添加')
+
+            table = UserMaterialImage.__table__
+            update = table.update().where(table.c.id == db.bindparam('row_id')).values(
+                css_recipe_id=db.bindparam('recipe_id'), css_recipe=None
+            )
+
+            converted = kept = 0
+            last_id = 0
+            while True:
+                rows = db.session.execute(
+                    db.select(table.c.id, table.c.css_recipe)
+                    .where(table.c.id > last_id, table.c.css_recipe.isnot(None), table.c.css_recipe_id.is_(None))
+                    .order_by(table.c.id)
+                    .limit(BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                params = []
+                for row in rows:
+                    try:
+                        recipe_id = recipe_to_id(json.loads(row.css_recipe))
+                    except ValueError:
+                        recipe_id = None
+                    if recipe_id is None:
+                        kept += 1
+                    else:
+                        params.append({'row_id': row.id, 'recipe_id': recipe_id})
+
+                if params:
+                    db.session.execute(update, params)
+                db.session.commit()
+                converted += len(params)
+                print(f'  已处理到 ID {last_id}：转换 {converted} 行，保留 JSON {kept} 行')
+
+            print(f'🎉 配方迁移完成！转换 {converted} 行，不在配方表中保留 JSON {kept} 行')
+
+        except Exception as e:
+            db.session.rollback()
+            print(f'❌ 迁移失败: {str(e)}')
+            import traceback
+            traceback.print_exc()
+
+
+if __name__ == '__main__':
+    migrate_user_material_recipe_id()
@@ -76,10 +76,9 @@ class SecurityPenetrationTester:
 
             # 创建测试素材
             self.test_material = create_test_material(
-                name='渗透测试素材',
-                user_id=self.normal_user1.id
+                title='渗透测试素材'
             )
-            print(f'✓ 创建测试素材: {self.test_material.name}')
+            print(f'✓ 创建测试素材: {self.test_material.title}')
 
     def login(self, session, username, password):
         """登录用户"""
@@ -0,0 +1,132 @@
+# ============================================================
+# test_db_routing.py
+#
+# 测试读写分离脚本
+# 功能说明：
+# 1. 用两个临时 SQLite 文件分别充当主库和从库
+#    （两个库写入不同的素材标题，通过标题判断查询落在哪个库）
+# 2. 验证普通查询走主库、use_replica 代码块走从库
+# 3. 验证写入（flush）之后同一会话的读取回到主库
+# 4. 验证只读路由读从库，写入后的短时间内同一用户回到主库
+#
+# 使用方式：
+#   python scripts/test_db_routing.py
+#
+# 连接两个本地 Postgres 实例测试时，设置 DATABASE_URL 和 DATABASE_REPLICA_URLS 后
+# 用 python scripts/test_db_routing.py --use-env 运行
+# 注意：脚本会清空主库和从库的 materials / users 表，只能连接测试库
+# ============================================================
+
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORK_DIR = None
+if '--use-env' not in sys.argv:
+    # Config 在导入时读取环境变量，需要在导入 app 之前设置
+    WORK_DIR = tempfile.mkdtemp(prefix='db_routing_')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(WORK_DIR, "primary.db")}'
+    os.environ['DATABASE_REPLICA_URLS'] = f'sqlite:///{os.path.join(WORK_DIR, "replica.db")}'
+
+from app import create_app, db
+from app.models import User, Material
+from app.utils.db_routing import use_replica
+
+
+def seed(app):
+    """主库和从库写入同样结构、不同标题的数据"""
+    with app.app_context():
+        for bind_key, label in ((None, 'primary'), ('replica_0', 'replica')):
+            engine = db.engines[bind_key]
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(Material.__table__.delete())
+                conn.execute(User.__table__.delete())
+                conn.execute(Material.__table__.insert(), [
+                    {'id': 1, 'title': label, 'view_count': 0, 'favorite_count': 0, 'download_count': 0,
+                     'is_published': True, 'sort_order': 0}
+                ])
+
+        user = User(username='routing_user', email='routing@example.com')
+        user.password = 'Routing@123'
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        # 用户同时写入从库，模拟复制
+        with db.engines['replica_0'].begin() as conn:
+            conn.execute(User.__table__.insert(), [{
+                'id': user_id, 'username': user.username, 'email': user.email,
+                'password_hash': user.password_hash, 'is_admin': False, 'is_super_admin': False,
+                'created_at': user.created_at, 'device_unbind_status': 0
+            }])
+        return user_id
+
+
+def check(name, actual, expected):
+    result = '通过' if actual == expected else '失败'
+    print(f'   [{result}] {name}: {actual}（期望 {expected}）')
+    return actual == expected
+
+
+def test_db_routing():
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['RATELIMIT_ENABLED'] = False
+
+    print('=' * 60)
+    print('测试读写分离')
+    print('=' * 60)
+    print(f'   binds: {list(app.config.get("SQLALCHEMY_BINDS", {}))}')
+
+    user_id = seed(app)
+    ok = True
+
+    print('\n1. 会话级路由:')
+    with app.app_context():
+        ok &= check('普通查询', db.session.get(Material, 1).title, 'primary')
+        db.session.remove()
+
+        with use_replica(db.session):
+            ok &= check('use_replica 查询', Material.query.filter_by(id=1).first().title, 'replica')
+            db.session.expunge_all()
+
+            db.session.add(Material(title='new'))
+            db.session.flush()
+            ok &= check('写入后查询', Material.query.filter_by(id=1).first().title, 'primary')
+            db.session.rollback()
+        db.session.remove()
+
+    print('\n2. 请求级路由:')
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+
+    resp = client.get('/api/latest-materials')
+    titles = [m['title'] for m in resp.get_json()['data']]
+    ok &= check('只读路由', titles, ['replica'])
+
+    resp = client.post('/api/material/1/favorite', headers={'X-Device-ID': 'routing-device'})
+    print(f'   收藏接口返回: {resp.status_code}')
+
+    resp = client.get('/api/latest-materials')
+    titles = [m['title'] for m in resp.get_json()['data']]
+    ok &= check('写入后的只读路由', titles, ['primary'])
+
+    print('\n' + '=' * 60)
+    print('全部通过' if ok else '存在失败项')
+    print('=' * 60)
+    return ok
+
+
+if __name__ == '__main__':
+    try:
+        success = test_db_routing()
+    finally:
+        if WORK_DIR:
+            shutil.rmtree(WORK_DIR, ignore_errors=True)
+    sys.exit(0 if success else 1)
@@ -3,6 +3,8 @@
 """
 测试辅助函数模块
 提供创建测试数据的辅助函数
+- create_test_*：逐条创建单个测试对象
+- seed_load_dataset：按规模批量生成压测数据（用户、卡密、素材及图片、收藏、下载、二创）
 """
 
 import os
@@ -14,7 +16,9 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
-from app.models import User, RegisterSecret, Material, UserMaterial
+from app.models import (User, RegisterSecret, MaterialType, Material, MaterialImage,
+                        UserMaterial, UserMaterialImage, UserFavorite, UserDownload)
+from app.utils.secret_generator import bulk_create_secrets, new_batch_id
 from werkzeug.security import generate_password_hash
 
 
@@ -93,54 +97,64 @@ def create_test_secret(secret=None, expires_at=None, is_used=False, user_id=None
     return register_secret
 
 
-def create_test_material(name=None, description='测试素材描述', user_id=None):
+def create_test_material(title=None, description='测试素材描述', material_type_id=None, image_count=0):
     """
     创建测试素材
     
     Args:
-        name: 素材名称（可选，自动生成）
-        description: 素材描述
-        user_id: 创建者用户ID
+        title: 素材标题（可选，自动生成）
+        description: 素材描述（文案）
+        material_type_id: 素材分类ID
+        image_count: 图片数量（第一张为封面）
     
     Returns:
         Material对象
     """
-    if not name:
-        name = f'测试素材_{generate_random_string(6)}'
+    if not title:
+        title = f'测试素材_{generate_random_string(6)}'
     
     material = Material(
-        name=name,
+        title=title,
         description=description,
-        user_id=user_id,
+        material_type_id=material_type_id,
         view_count=0,
         download_count=0
     )
     
     db.session.add(material)
+    db.session.flush()
+    
+    for order in range(image_count):
+        db.session.add(MaterialImage(
+            material_id=material.id,
+            image_url=f'/static/uploads/test/{material.id}_{order}.jpg',
+            sort_order=order,
+            is_cover=order == 0
+        ))
     db.session.commit()
     
     return material
 
 
-def create_test_user_material(user_id, material_id, name=None):
+def create_test_user_material(user_id, material_id, title=None):
     """
     创建测试用户素材
     
     Args:
         user_id: 用户ID
         material_id: 原始素材ID
-        name: 素材名称（可选）
+        title: 素材标题（可选）
     
     Returns:
         UserMaterial对象
     """
-    if not name:
-        name = f'用户素材_{generate_random_string(6)}'
+    if not title:
+        title = f'用户素材_{generate_random_string(6)}'
     
     user_material = UserMaterial(
         user_id=user_id,
-        material_id=material_id,
-        name=name
+        original_material_id=material_id,
+        title=title
     )
     
     db.session.add(user_material)
@@ -149,6 +163,206 @@ def create_test_user_material(user_id, material_id, name=None):
     return user_material
 
 
+# 压测素材标题中的关键词（搜索压测使用）
+LOAD_KEYWORDS = ['副业', '宝妈', '穿搭', '美食', '旅行', '数码', '家居', '读书', '健身', '摄影']
+
+# 压测数据每次 executemany 的行数
+LOAD_CHUNK_SIZE = 1000
+
+
+def _bulk_insert(model, rows):
+    """分块 executemany 插入（不经过 ORM 对象）"""
+    for start in range(0, len(rows), LOAD_CHUNK_SIZE):
+        db.session.execute(model.__table__.insert(), rows[start:start + LOAD_CHUNK_SIZE])
+
+
+def _ids_by(column, values, key_column):
+    """按唯一列查询 ID，返回 {唯一列值: ID}"""
+    result = {}
+    values = list(values)
+    for start in range(0, len(values), LOAD_CHUNK_SIZE):
+        chunk = values[start:start + LOAD_CHUNK_SIZE]
+        result.update(db.session.execute(
+            db.select(column, key_column).where(column.in_(chunk))
+        ).all())
+    return result
+
+
+def seed_load_dataset(users=50, secrets=None, materials=200, images_per_material=9,
+                      favorites_per_user=10, downloads_per_user=10, remixes_per_user=2,
+                      material_types=8, prefix='load', password='Test123!', seed=1):
+    """
+    按规模批量生成压测数据（需在应用上下文中调用，已存在同前缀的用户时直接返回已有数据）
+    
+    - 用户：绑定设备ID {prefix}-device-{序号}，注册时间分布在最近 180 天
+    - 卡密：每个用户使用一张（永久卡 / 月卡 / 已过期月卡混合），其余未使用
+    - 素材：标题带 LOAD_KEYWORDS 中的关键词，浏览 / 收藏 / 下载数随机，约 5% 未上架
+    - 收藏、下载、二创：每个用户随机选择素材
+    - 另建一个超级管理员 {prefix}_admin（用于后台列表页）
+    
+    Args:
+        users: 普通用户数
+        secrets: 注册卡密数（默认为用户数的 2 倍，不少于用户数）
+        materials: 素材数
+        images_per_material: 每个素材的图片数
+        favorites_per_user: 每个用户的收藏数
+        downloads_per_user: 每个用户的下载记录数
+        remixes_per_user: 每个用户的二创作品数（每个作品复制原素材图片）
+        material_types: 素材分类数
+        prefix: 用户名 / 分类名前缀
+        password: 所有压测用户的密码
+        seed: 随机种子
+    
+    Returns:
+        dict: {
+            'users': [(用户ID, 用户名, 设备ID)],
+            'admin': (用户ID, 用户名),
+            'material_ids': [已上架素材ID],
+            'counts': {数据类型: 条数}
+        }
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    admin_name = f'{prefix}_admin'
+    usernames = [f'{prefix}_user_{index}' for index in range(users)]
+
+    existing = User.query.filter_by(username=admin_name).first()
+    if existing is None:
+        # 密码哈希较慢，所有压测用户共用一个
+        password_hash = generate_password_hash(password)
+
+        type_names = [f'{prefix}_分类_{index}' for index in range(material_types)]
+        _bulk_insert(MaterialType, [{
+            'name': name, 'sort_order': index, 'is_active': True, 'created_at': now
+        } for index, name in enumerate(type_names)])
+
+        _bulk_insert(User, [{
+            'username': admin_name, 'email': f'{admin_name}@test.com', 'password_hash': password_hash,
+            'is_admin': True, 'is_super_admin': True, 'created_at': now, 'device_unbind_status': 0
+        }] + [{
+            'username': username,
+            'email': f'{username}@test.com',
+            'password_hash': password_hash,
+            'is_admin': False,
+            'is_super_admin': False,
+            'bound_device_id': f'{prefix}-device-{index}',
+            'device_unbind_status': 0,
+            'created_at': now - timedelta(days=rng.uniform(0, 180))
+        } for index, username in enumerate(usernames)])
+
+        type_ids = list(_ids_by(MaterialType.name, type_names, MaterialType.id).values())
+        user_ids = _ids_by(User.username, usernames, User.id)
+
+        # 素材：content_hash 唯一，用于回查ID
+        hashes = [f'{prefix}-{seed}-{index}' for index in range(materials)]
+        _bulk_insert(Material, [{
+            'title': f'{rng.choice(LOAD_KEYWORDS)}素材{index}｜{rng.choice(LOAD_KEYWORDS)}干货分享',
+            'description': f'{rng.choice(LOAD_KEYWORDS)}相关的图文素材，第 {index} 期，适合直接发布。' * 3,
+            'material_type_id': rng.choice(type_ids) if type_ids else None,
+            'view_count': rng.randint(0, 5000),
+            'favorite_count': rng.randint(0, 500),
+            'download_count': rng.randint(0, 1000),
+            'is_published': rng.random() >= 0.05,
+            'sort_order': 0,
+            'content_hash': content_hash,
+            'created_at': now - timedelta(minutes=materials - index),
+            'updated_at': now
+        } for index, content_hash in enumerate(hashes)])
+        material_ids = list(_ids_by(Material.content_hash, hashes, Material.id).values())
+
+        _bulk_insert(MaterialImage, [{
+            'material_id': material_id,
+            'image_url': f'/static/uploads/{prefix}/{material_id}_{order}.jpg',
+            'sort_order': order,
+            'is_cover': order == 0,
+            'created_at': now
+        } for material_id in material_ids for order in range(images_per_material)])
+
+        # 卡密：前 users 张分配给用户
+        secret_count = max(users * 2 if secrets is None else secrets, users)
+        keys = bulk_create_secrets('register', secret_count, 'permanent', batch_id=new_batch_id())
+        secret_ids = _ids_by(RegisterSecret.secret, keys[:users], RegisterSecret.id)
+        assignments = []
+        for key, username in zip(keys, usernames):
+            used_at = now - timedelta(days=rng.uniform(0, 60))
+            duration_type = rng.choice(['permanent', '1month', '1month'])
+            assignments.append({
+                'row_id': secret_ids[key],
+                'user_id': user_ids[username],
+                'used_at': used_at,
+                'duration_type': duration_type,
+                'expires_at': None if duration_type == 'permanent' else used_at + timedelta(days=30)
+            })
+        table = RegisterSecret.__table__
+        db.session.execute(table.update().where(table.c.id == db.bindparam('row_id')).values(
+            is_used=True, user_id=db.bindparam('user_id'), used_at=db.bindparam('used_at'),
+            duration_type=db.bindparam('duration_type'), expires_at=db.bindparam('expires_at')
+        ), assignments)
+
+        favorites, downloads, remixes = [], [], []
+        for username in usernames:
+            user_id = user_ids[username]
+            for material_id in rng.sample(material_ids, min(favorites_per_user, len(material_ids))):
+                favorites.append({'user_id': user_id, 'material_id': material_id,
+                                  'created_at': now - timedelta(minutes=rng.uniform(0, 43200))})
+            for _ in range(downloads_per_user if material_ids else 0):
+                downloads.append({'user_id': user_id, 'material_id': rng.choice(material_ids),
+                                  'created_at': now - timedelta(minutes=rng.uniform(0, 43200))})
+            for _ in range(remixes_per_user if material_ids else 0):
+                material_id = rng.choice(material_ids)
+                remixes.append({'user_id': user_id, 'original_material_id': material_id,
+                                'title': f'我的二创_{material_id}_{generate_random_string(4)}',
+                                'description': '二创文案', 'view_count': 0, 'download_count': 0,
+                                'created_at': now - timedelta(minutes=rng.uniform(0, 43200))})
+        _bulk_insert(UserFavorite, favorites)
+        _bulk_insert(UserDownload, downloads)
+        _bulk_insert(UserMaterial, remixes)
+
+        # 二创图片：从原素材图片 INSERT ... SELECT 复制
+        if remixes:
+            user_material_table = UserMaterial.__table__
+            image_table = UserMaterialImage.__table__
+            source = MaterialImage.__table__
+            db.session.execute(image_table.insert().from_select(
+                ['user_material_id', 'original_image_url', 'image_url', 'is_cover', 'sort_order', 'created_at'],
+                db.select(user_material_table.c.id, source.c.image_url, source.c.image_url,
+                          source.c.is_cover, source.c.sort_order, db.literal(now, db.DateTime))
+                .join(source, source.c.material_id == user_material_table.c.original_material_id)
+                .where(user_material_table.c.user_id.in_(list(user_ids.values())))
+            ))
+        db.session.commit()
+
+    admin = User.query.filter_by(username=admin_name).first()
+    user_rows = db.session.execute(
+        db.select(User.id, User.username, User.bound_device_id)
+        .where(User.username.in_(usernames)).order_by(User.id)
+    ).all()
+    user_ids = [row.id for row in user_rows]
+    published_ids = db.session.execute(
+        db.select(Material.id).where(Material.is_published.is_(True),
+                                     Material.content_hash.like(f'{prefix}-%')).order_by(Material.id)
+    ).scalars().all()
+
+    def count(model, *criteria):
+        return db.session.execute(db.select(db.func.count()).select_from(model).where(*criteria)).scalar()
+
+    return {
+        'users': [(row.id, row.username, row.bound_device_id) for row in user_rows],
+        'admin': (admin.id, admin.username),
+        'material_ids': published_ids,
+        'counts': {
+            'users': len(user_rows),
+            'materials': count(Material, Material.content_hash.like(f'{prefix}-%')),
+            'material_images': count(MaterialImage, MaterialImage.material_id.in_(
+                db.select(Material.id).where(Material.content_hash.like(f'{prefix}-%')))),
+            'secrets_used': count(RegisterSecret, RegisterSecret.user_id.in_(user_ids)),
+            'favorites': count(UserFavorite, UserFavorite.user_id.in_(user_ids)),
+            'downloads': count(UserDownload, UserDownload.user_id.in_(user_ids)),
+            'user_materials': count(UserMaterial, UserMaterial.user_id.in_(user_ids))
+        }
+    }
+
+
 def init_test_db():
     """初始化测试数据库"""
     app = create_app()
@@ -176,7 +390,7 @@ def init_test_db():
         create_test_secret(user_id=test_user.id)
         
         # 创建测试素材
-        create_test_material(user_id=admin_user.id)
+        create_test_material(image_count=3)
         
         print('测试数据库初始化完成！')
         print(f'测试用户: demo_user / Demo123!')
@@ -5,6 +5,8 @@
 # 功能说明：
 # 1. 测试统计配置的读取和写入
 # 2. 验证新功能是否正常工作
+# 3. 测试每日统计汇总：汇总结果与直接计数一致、重复汇总结果不变
+# 4. 测试后台首页读取：最近 7 天的趋势数据和总数
 # ============================================================
 
 import sys
@@ -12,8 +14,10 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from datetime import datetime, timedelta
 from app import create_app, db
-from app.models import Config
+from app.models import Config, DailyStat, User, UserMaterial, UserDownload, UserFavorite, RegisterSecret, TerminalSecret
+from app.utils.statistics import rollup_range, get_daily_stats, get_dashboard_totals
 
 
 def test_statistics_config():
@@ -68,5 +72,67 @@ def test_statistics_config():
         print('  ✓ 数据验证通过')
 
 
+def count_between(column, start, end):
+    """直接统计 [start, end) 之间的记录数"""
+    return db.session.query(db.func.count()).filter(column >= start, column < end).scalar()
+
+
+def test_daily_stats():
+    """测试每日统计汇总"""
+    app = create_app()
+    
+    with app.app_context():
+        print('\n' + '=' * 60)
+        print('测试每日统计汇总')
+        print('=' * 60)
+        
+        DailyStat.__table__.create(bind=db.engine, checkfirst=True)
+        
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=6)
+        
+        # 1. 汇总最近 7 天
+        print('\n1. 汇总最近 7 天:')
+        rollup_range(start, today)
+        stats = get_daily_stats(7)
+        print(f'   读取到 {len(stats)} 天')
+        
+        # 2. 与直接计数对比
+        print('\n2. 与直接计数对比:')
+        all_match = True
+        for stat in stats:
+            day_start = datetime.strptime(stat['date'], '%Y-%m-%d')
+            day_end = day_start + timedelta(days=1)
+            expected = {
+                'new_users': count_between(User.created_at, day_start, day_end),
+                'remixes': count_between(UserMaterial.created_at, day_start, day_end),
+                'downloads': count_between(UserDownload.created_at, day_start, day_end),
+                'favorites': count_between(UserFavorite.created_at, day_start, day_end),
+                'secrets_activated': count_between(RegisterSecret.used_at, day_start, day_end) +
+                                     count_between(TerminalSecret.used_at, day_start, day_end)
+            }
+            actual = {key: stat[key] for key in expected}
+            match = actual == expected
+            all_match &= match
+            print(f'   {"✓" if match else "✗"} {stat["date"]}: {actual}')
+        
+        # 3. 重复汇总结果不变
+        print('\n3. 重复汇总:')
+        rollup_range(start, today)
+        repeated = get_daily_stats(7)
+        print(f'   {"✓" if repeated == stats else "✗"} 两次汇总结果{"一致" if repeated == stats else "不一致"}')
+        
+        # 4. 后台首页总数
+        print('\n4. 后台首页总数:')
+        totals = get_dashboard_totals()
+        for key, value in totals.items():
+            print(f'   {key}: {value}')
+        
+        print('\n' + '=' * 60)
+        print('每日统计测试完成！' if all_match and repeated == stats else '每日统计测试存在失败项！')
+        print('=' * 60)
+
+
 if __name__ == '__main__':
     test_statistics_config()
+    test_daily_stats()
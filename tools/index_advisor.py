@@ -0,0 +1,235 @@
+# ============================================================
+# index_advisor.py
+#
+# 索引顾问工具（SQLite）
+# 功能说明：
+# 1. 复制当前 SQLite 数据库到临时目录（不修改线上数据）
+# 2. 用测试客户端以管理员身份访问热点页面和接口
+# 3. 通过 SQLAlchemy before_cursor_execute 事件捕获路由实际执行的 SQL
+# 4. 对每条 SELECT 执行 EXPLAIN QUERY PLAN
+# 5. 标记全表扫描（SCAN 表名 且未使用索引）和临时自动索引（AUTOMATIC INDEX）
+#    --sort 时同时标记 ORDER BY 临时排序（USE TEMP B-TREE）
+#
+# 使用方式：
+#   python tools/index_advisor.py                       # 使用 DATABASE_URL / app.db
+#   python tools/index_advisor.py --db path/to/app.db   # 指定数据库文件
+#   python tools/index_advisor.py --path /admin/api/materials?page=2   # 追加自定义路径
+#   python tools/index_advisor.py --all                 # 同时打印未发现问题的查询
+#   python tools/index_advisor.py --sort                # 同时标记临时排序
+# ============================================================
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import argparse
+from collections import OrderedDict
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(project_root, '.env'))
+os.environ.setdefault('SECRET_KEY', 'index-advisor')
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# 默认检查的路由（{material_id} / {user_material_id} 运行时替换为库中的真实 ID）
+DEFAULT_PATHS = [
+    '/',
+    '/my-materials',
+    '/api/latest-materials',
+    '/api/latest-materials?sort=view_count',
+    '/material/{material_id}',
+    '/my-material/{user_material_id}',
+    '/profile',
+    '/admin/',
+    '/admin/materials',
+    '/admin/api/materials',
+    '/admin/secrets',
+    '/admin/api/secrets?status=used',
+    '/admin/users',
+    '/admin/api/users?filter=unbind',
+    '/admin/announcements'
+]
+
+
+def resolve_db_path(db_arg):
+    """确定要分析的 SQLite 文件"""
+    if db_arg:
+        return os.path.abspath(db_arg)
+
+    from app import Config
+    url = make_url(Config.SQLALCHEMY_DATABASE_URI)
+    if url.get_backend_name() != 'sqlite':
+        raise SystemExit('❌ 索引顾问只支持 SQLite（EXPLAIN QUERY PLAN），请用 --db 指定 SQLite 文件')
+    return os.path.abspath(url.database)
+
+
+def create_advisor_app(db_path):
+    from app import create_app, Config
+
+    class AdvisorConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        DATABASE_REPLICA_URLS = ''
+        WTF_CSRF_ENABLED = False
+        RATELIMIT_ENABLED = False
+
+    return create_app(AdvisorConfig)
+
+
+def pick_context(db):
+    """选择访问用户（优先超级管理员）和示例 ID"""
+    from app.models import User, Material, UserMaterial
+
+    user = User.query.filter_by(is_super_admin=True).first() or User.query.filter_by(is_admin=True).first()
+    if user is None:
+        raise SystemExit('❌ 数据库中没有管理员用户，请先运行 scripts/create_admin.py')
+
+    material = Material.query.order_by(Material.id.desc()).first()
+    user_material = UserMaterial.query.filter_by(user_id=user.id).first() or UserMaterial.query.first()
+    return user, {
+        'material_id': material.id if material else 0,
+        'user_material_id': user_material.id if user_material else 0
+    }
+
+
+def capture_queries(app, db, user, paths):
+    """访问每个路径并记录执行的 SELECT，返回 {sql: (参数, 来源路径集合)}"""
+    captured = OrderedDict()
+    current = {'path': None}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current['path'] and not executemany and statement.lstrip().upper().startswith('SELECT'):
+            entry = captured.setdefault(statement, [parameters, set()])
+            entry[1].add(current['path'])
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+        if user.bound_device_id:
+            sess['device_id'] = user.bound_device_id
+
+    try:
+        for path in paths:
+            current['path'] = path
+            resp = client.get(path)
+            print(f'   {resp.status_code}  {path}')
+    finally:
+        current['path'] = None
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return captured
+
+
+def explain(db, statement, parameters):
+    """执行 EXPLAIN QUERY PLAN，返回计划明细列表"""
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def classify(plan, tables, include_sort=False):
+    """找出全表扫描、临时自动索引和（可选）临时排序"""
+    problems = []
+    for detail in plan:
+        words = detail.split()
+        if detail.startswith('SCAN ') and 'USING' not in detail and len(words) > 1 and words[1] in tables:
+            problems.append(f'全表扫描: {detail}')
+        elif 'AUTOMATIC' in detail and 'INDEX' in detail:
+            # SQLite 每次查询临时建索引，说明缺少该字段的索引
+            problems.append(f'临时索引: {detail}')
+        elif include_sort and 'USE TEMP B-TREE' in detail:
+            problems.append(f'临时排序: {detail}')
+    return problems
+
+
+def table_sizes(db):
+    with db.engine.connect() as conn:
+        names = [r[0] for r in conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        return {name: conn.exec_driver_sql(f'SELECT COUNT(*) FROM "{name}"').scalar() for name in names}
+
+
+def run_advisor(args):
+    source = resolve_db_path(args.db)
+    if not os.path.exists(source):
+        raise SystemExit(f'❌ 数据库文件不存在: {source}')
+
+    work_dir = tempfile.mkdtemp(prefix='index_advisor_')
+    db_path = os.path.join(work_dir, 'advisor.db')
+    # 使用 backup API 复制（WAL 模式下未 checkpoint 的数据也会一并复制）
+    src, dst = sqlite3.connect(source), sqlite3.connect(db_path)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+    try:
+        app = create_advisor_app(db_path)
+        from app import db
+
+        print('=' * 70)
+        print('索引顾问（EXPLAIN QUERY PLAN）')
+        print(f'数据库: {source}（已复制到临时目录分析）')
+        print('=' * 70)
+
+        with app.app_context():
+            user, ids = pick_context(db)
+            sizes = table_sizes(db)
+        paths = [p.format(**ids) for p in DEFAULT_PATHS + (args.path or [])]
+
+        print(f'\n[1/2] 以 {user.username} 身份访问 {len(paths)} 个路径...')
+        captured = capture_queries(app, db, user, paths)
+
+        print(f'\n[2/2] 分析 {len(captured)} 条不同的 SELECT...')
+        flagged = 0
+        with app.app_context():
+            for statement, (parameters, sources) in captured.items():
+                try:
+                    plan = explain(db, statement, parameters)
+                except Exception as e:
+                    print(f'\n⚠️ 无法分析: {e}')
+                    continue
+
+                problems = classify(plan, sizes, include_sort=args.sort)
+                if not problems and not args.all:
+                    continue
+                flagged += bool(problems)
+
+                sql = ' '.join(statement.split())
+                print('\n' + '-' * 70)
+                print(f'{"❌" if problems else "✅"} {sql[:args.width]}{"..." if len(sql) > args.width else ""}')
+                print(f'   来源: {", ".join(sorted(sources))}')
+                for detail in plan:
+                    print(f'   计划: {detail}')
+                for problem in problems:
+                    table = problem.split()[2] if problem.startswith('全表扫描') else None
+                    rows = f'（{sizes[table]} 行）' if table in sizes else ''
+                    print(f'   问题: {problem}{rows}')
+
+        print('\n' + '=' * 70)
+        print(f'共 {len(captured)} 条查询，{flagged} 条存在全表扫描或临时索引')
+        print('小表（几百行以内）的全表扫描通常可以接受；大表请考虑为 WHERE / ORDER BY 字段添加索引')
+        print('=' * 70)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='索引顾问（SQLite）')
+    parser.add_argument('--db', help='SQLite 数据库文件路径（默认读取 DATABASE_URL）')
+    parser.add_argument('--path', action='append', help='追加检查的路径，可重复')
+    parser.add_argument('--all', action='store_true', help='同时显示没有问题的查询')
+    parser.add_argument('--sort', action='store_true', help='同时标记 ORDER BY 临时排序')
+    parser.add_argument('--width', type=int, default=160, help='SQL 显示宽度')
+    run_advisor(parser.parse_args())
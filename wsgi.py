@@ -0,0 +1,22 @@
+# ============================================================
+# wsgi.py
+#
+# 生产环境 WSGI 入口
+# 功能说明：
+# 1. 供 gunicorn 等 WSGI 服务器加载：gunicorn -c gunicorn_config.py wsgi:app
+# 2. gevent 模式下在导入应用之前打 monkey patch（preload_app 时主进程就会导入应用）
+#
+# 开发环境仍然使用 python run.py
+# ============================================================
+
+import os
+
+# gevent 模式必须在导入任何网络相关模块之前打补丁
+if os.environ.get('GUNICORN_PROFILE', '').lower() == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import create_app
+
+# 创建 Flask 应用实例
+app = create_app()